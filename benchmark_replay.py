@@ -0,0 +1,377 @@
+"""
+오프라인 리플레이 벤치마크
+- 녹화 영상(또는 합성 클립)을 RealtimeDetector.process_frame()에 최대 속도로 입력
+- 처리 FPS, 단계별 지연 시간 백분위수, 최대 메모리(RSS), 발생 이벤트 수 측정
+- 결과를 JSON으로 저장해서 커밋 간 비교
+- --stub-model: YOLO 대신 고정 패턴 검출을 반환하는 스텁 모델 (CPU 전용 CI에서 파이프라인만 측정)
+- ROI 상태/검출 간격은 영상 타임스탬프 기준 (ReplayClock) - 최대 속도로 재생해도 실시간과 같은 이벤트 발생
+
+사용법:
+    python benchmark_replay.py --video recording.mp4 --output bench.json
+    python benchmark_replay.py --synthetic --stub-model --frames 600 --output bench.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False  # Windows
+
+from roi_utils import create_left_right_rois, normalize_roi_format
+from realtime_detector import RealtimeDetector
+from clock import ReplayClock
+
+
+class SyntheticClip:
+    """
+    합성 영상 소스 (cv2.VideoCapture 호환 read())
+    
+    노이즈 배경 위를 사람 크기 사각형이 좌우로 왕복하는 프레임을 미리 만들어 두고 반복 재생한다.
+    """
+    
+    def __init__(self, width=1280, height=720, num_frames=300, cycle=60, hold=10, seed=0):
+        """
+        Args:
+            width, height: 프레임 크기
+            num_frames: 총 프레임 수
+            cycle: 미리 생성할 고유 프레임 수 (왕복 단계 수)
+            hold: 같은 위치를 유지할 프레임 수 (왕복 주기 = cycle * hold 프레임, 기본 20초 -
+                  검출 간격마다 샘플링해도 ROI 체류 시간이 존재/부재 임계 시간을 넘도록)
+            seed: 배경 노이즈 시드
+        """
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self.hold = hold
+        self.position = 0
+        
+        rng = np.random.default_rng(seed)
+        background = rng.integers(0, 64, size=(height, width, 3), dtype=np.uint8)
+        box_w, box_h = width // 10, height // 2
+        self.frames = []
+        for i in range(cycle):
+            frame = background.copy()
+            x = StubPersonModel.walk_position(i, cycle, width - box_w)
+            y = height // 4
+            cv2.rectangle(frame, (x, y), (x + box_w, y + box_h), (200, 180, 160), -1)
+            self.frames.append(frame)
+    
+    def isOpened(self):
+        return True
+    
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return 30.0
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.num_frames)
+        return 0.0
+    
+    def read(self, image=None):
+        """cv2.VideoCapture.read()와 동일 - image가 주어지고 크기가 맞으면 그 버퍼에 복사"""
+        if self.position >= self.num_frames:
+            return False, None
+        
+        frame = self.frames[(self.position // self.hold) % len(self.frames)]
+        self.position += 1
+        
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame.copy()
+    
+    def release(self):
+        pass
+
+
+class StubResult:
+    """ultralytics Results 최소 호환 객체 (boxes.xyxy / boxes.conf / boxes.cls)"""
+    
+    class Boxes:
+        def __init__(self, data):
+            self.data = data
+            self.xyxy = data[:, :4]
+            self.conf = data[:, 4]
+            self.cls = data[:, 5]
+        
+        def __len__(self):
+            return len(self.data)
+    
+    def __init__(self, data):
+        self.boxes = self.Boxes(data)
+
+
+class StubPersonModel:
+    """
+    YOLO 스텁 모델 (추론 없이 고정 패턴 검출 반환)
+    
+    사람 1명이 프레임을 좌우로 왕복하고 (ROI 진입/이탈 → 이벤트 발생),
+    ROI와 무관한 위치에 다른 클래스 박스 1개를 함께 반환한다.
+    위치는 리플레이 루프가 추론 전에 기록한 프레임 번호(frame_index) 기준이므로
+    모션 게이트/검출 간격으로 프레임을 건너뛰어도 SyntheticClip 프레임과 박스가 일치한다
+    (cycle/hold는 SyntheticClip과 같은 값).
+    """
+    
+    def __init__(self, cycle=60, hold=10):
+        self.cycle = cycle
+        self.hold = hold
+        self.calls = 0
+        self.frame_index = 0  # 현재 처리 중인 프레임 번호 (0부터, FrameInfo.seq - 1)
+    
+    @staticmethod
+    def walk_position(index, cycle, max_x):
+        """왕복 운동 x 좌표 (0 → max_x → 0)"""
+        phase = (index % cycle) / cycle
+        return int(max_x * (1 - abs(2 * phase - 1)))
+    
+    def _predict(self, image):
+        height, width = image.shape[:2]
+        box_w, box_h = width // 10, height // 2
+        x = self.walk_position(self.frame_index // self.hold, self.cycle, width - box_w)
+        y = height // 4
+        data = np.array([
+            [x, y, x + box_w, y + box_h, 0.9, 0],  # 사람
+            [5, 5, 25, 25, 0.9, 56],               # 의자 (사람 아님)
+        ], dtype=np.float32)
+        return StubResult(data)
+    
+    def __call__(self, source, verbose=False, **kwargs):
+        self.calls += 1
+        if isinstance(source, list):
+            return [self._predict(image) for image in source]
+        return [self._predict(source)]
+
+
+def get_peak_rss_mb():
+    """프로세스 최대 RSS (MB, 측정 불가 시 None)"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def get_git_commit():
+    """현재 git 커밋 (없으면 None)"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=Path(__file__).resolve().parent, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_config(args):
+    """벤치마크용 설정 (config 파일 + 명령행 옵션)"""
+    config = {}
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    
+    # 처리 루프를 직접 돌리므로 캡처 스레드/비동기 추론은 사용하지 않음 (결정적 실행)
+    config['use_capture_thread'] = False
+    config['async_inference'] = False
+    
+    # 뷰어가 없어도 시각화 비용을 측정 (--no-render 시 생략)
+    config['enable_rendering'] = not args.no_render
+    config['render_on_demand'] = False
+    
+    # 외부 API 호출 금지 (--keep-api 시 유지)
+    if not args.keep_api:
+        config['api_endpoint'] = ''
+    
+    if args.no_face:
+        config['enable_face_analysis'] = False
+    if args.detection_interval is not None:
+        config['detection_interval_seconds'] = args.detection_interval
+    
+    return config
+
+
+def open_source(args):
+    """영상 소스 열기 → (source, 이름, width, height)"""
+    if args.synthetic:
+        width, height = args.resolution
+        source = SyntheticClip(width, height, num_frames=args.frames + args.warmup)
+        return source, f"synthetic:{width}x{height}", width, height
+    
+    source = cv2.VideoCapture(args.video)
+    if not source.isOpened():
+        raise FileNotFoundError(f"영상을 열 수 없습니다: {args.video}")
+    width = int(source.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(source.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    return source, args.video, width, height
+
+
+def run_benchmark(args):
+    """
+    벤치마크 실행
+    
+    Returns:
+        dict: 벤치마크 결과
+    """
+    config = build_config(args)
+    source, source_name, width, height = open_source(args)
+    
+    roi_regions = [normalize_roi_format(roi) for roi in config.get('roi_regions', [])]
+    if not roi_regions:
+        roi_regions = create_left_right_rois(width, height)
+    config['roi_regions'] = roi_regions
+    
+    model = StubPersonModel() if args.stub_model else None
+    clock = None if args.realtime_clock else ReplayClock(fps=source.get(cv2.CAP_PROP_FPS) or 30.0)
+    detector = RealtimeDetector(config, roi_regions, model=model, clock=clock)
+    detector.cap = source
+    detector.running = True
+    
+    events = 0
+    frames = 0
+    start_time = None
+    
+    print(f"[Benchmark] 소스: {source_name} ({width}x{height}), 모델: {'stub' if args.stub_model else config.get('yolo_model', 'yolov8n.pt')}")
+    
+    while args.frames is None or frames < args.frames + args.warmup:
+        # 워밍업 프레임 이후부터 측정 (모델 로딩/첫 추론 제외)
+        if frames == args.warmup:
+            detector.pipeline_stats.reset()
+            detector.alert_latency.reset()
+            inferences_at_start = detector.inferences_run
+            clock_at_start = detector.clock.now()
+            start_time = time.perf_counter()
+        
+        buffer = detector.read_frame()
+        if buffer is None:
+            break
+        
+        # 스텁 모델 박스 위치를 이 프레임에 맞춤 (추론은 동기 실행 - 같은 프레임)
+        if model is not None:
+            model.frame_index = buffer.info.seq - 1
+        
+        annotated_frame = detector.process_frame(buffer)
+        buffer.release()
+        if annotated_frame is not None:
+            annotated_frame.release()
+        
+        if frames >= args.warmup:
+            events += len(detector.get_latest_events())
+        else:
+            detector.get_latest_events()
+        detector.get_latest_stats()
+        frames += 1
+    
+    detector.running = False
+    source.release()
+    
+    if start_time is None:
+        raise RuntimeError(f"워밍업({args.warmup}프레임)보다 프레임이 적습니다: {frames}프레임")
+    
+    elapsed = time.perf_counter() - start_time
+    measured_frames = frames - args.warmup
+    media_seconds = detector.clock.now() - clock_at_start
+    pipeline = detector.get_pipeline_stats()
+    
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': get_git_commit(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'source': source_name,
+        'resolution': [width, height],
+        'model': 'stub' if args.stub_model else config.get('yolo_model', 'yolov8n.pt'),
+        'backend': detector.backend.name,
+        'frames': measured_frames,
+        'warmup_frames': args.warmup,
+        'elapsed_seconds': elapsed,
+        'fps': measured_frames / elapsed if elapsed > 0 else 0.0,
+        'clock': 'wall' if args.realtime_clock else 'replay',
+        'media_seconds': media_seconds,
+        'realtime_factor': media_seconds / elapsed if elapsed > 0 else 0.0,
+        'inferences': detector.inferences_run - inferences_at_start,
+        'events': events,
+        'events_dropped': detector.events_dropped,
+        'peak_rss_mb': get_peak_rss_mb(),
+        'stages': pipeline['stages'],
+        'alert_latency': pipeline['alert_latency'],
+        'frame_buffers': pipeline['frame_buffers'],
+        'config': {
+            key: config.get(key) for key in (
+                'detection_interval_seconds', 'enable_face_analysis', 'enable_rendering',
+                'enable_tracking', 'enable_motion_gate', 'roi_crop_inference',
+                'inference_backend', 'inference_threads'
+            )
+        }
+    }
+
+
+def print_report(result):
+    """결과 요약 출력"""
+    print("\n" + "=" * 60)
+    print(f"📊 벤치마크 결과 ({result['source']}, {result['model']}, {result['backend']})")
+    print("=" * 60)
+    print(f"프레임: {result['frames']} / {result['elapsed_seconds']:.2f}초 → {result['fps']:.1f} FPS")
+    if result['clock'] == 'replay':
+        print(f"영상 시간: {result['media_seconds']:.1f}초 (실시간 대비 {result['realtime_factor']:.1f}배속)")
+    print(f"추론: {result['inferences']}회, 이벤트: {result['events']}건")
+    if result['peak_rss_mb'] is not None:
+        print(f"최대 RSS: {result['peak_rss_mb']:.1f} MB")
+    print(f"\n{'단계':<12}{'횟수':>8}{'p50':>10}{'p95':>10}{'p99':>10} (ms)")
+    for stage, stats in result['stages'].items():
+        if stats['p50_ms'] is None:
+            continue
+        print(f"{stage:<12}{stats['count']:>8}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='녹화 영상 리플레이 벤치마크')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--video', help='녹화 영상 파일 경로')
+    source.add_argument('--synthetic', action='store_true', help='합성 클립 사용')
+    parser.add_argument('--resolution', type=int, nargs=2, default=[1280, 720],
+                        metavar=('WIDTH', 'HEIGHT'), help='합성 클립 해상도 (기본: 1280 720)')
+    parser.add_argument('--frames', type=int, default=None,
+                        help='측정할 프레임 수 (기본: 영상 끝까지, 합성 클립은 300)')
+    parser.add_argument('--warmup', type=int, default=10, help='측정에서 제외할 워밍업 프레임 수')
+    parser.add_argument('--config', default=None, help='설정 파일 (ROI/검출 옵션, 기본: 없음)')
+    parser.add_argument('--stub-model', action='store_true', help='YOLO 대신 스텁 모델 사용')
+    parser.add_argument('--detection-interval', type=float, default=None,
+                        help='YOLO 검출 간격(초) 덮어쓰기 (0이면 매 프레임)')
+    parser.add_argument('--no-render', action='store_true', help='시각화 생략')
+    parser.add_argument('--no-face', action='store_true', help='얼굴 분석 비활성화')
+    parser.add_argument('--realtime-clock', action='store_true',
+                        help='영상 타임스탬프 대신 실제 시각으로 ROI 상태/검출 간격 판정')
+    parser.add_argument('--keep-api', action='store_true', help='설정의 API 엔드포인트로 실제 전송')
+    parser.add_argument('--output', default=None, help='결과 JSON 저장 경로')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """메인 함수"""
+    args = parse_args(argv)
+    if args.synthetic and args.frames is None:
+        args.frames = 300
+    
+    result = run_benchmark(args)
+    print_report(result)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ 결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+검출기 시계
+- WallClock: 실제 시각 (실시간 카메라)
+- ReplayClock: 녹화 영상의 프레임 타임스탬프로 진행하는 시계 (실시간보다 빠른 리플레이)
+
+ROI 존재/부재 타이머, 검출 간격, SAD 재전송 대기 등 이벤트 판정에 쓰이는 시각은
+모두 시계에서 가져오므로, ReplayClock을 쓰면 1시간 분량 영상을 최대 속도로 처리해도
+실시간과 같은 이벤트가 발생한다.
+"""
+
+import time
+import threading
+
+import cv2
+
+
+class WallClock:
+    """실제 시각 (time.time())"""
+    
+    def now(self):
+        """현재 시각 (epoch 초)"""
+        return time.time()
+    
+    def frame_timestamp(self, cap=None):
+        """방금 읽은 프레임의 캡처 시각 (실시간 소스는 현재 시각)"""
+        return time.time()
+
+
+class ReplayClock:
+    """
+    리플레이 시계
+    
+    프레임을 읽을 때마다 frame_timestamp()로 영상 내 시각까지 진행하고,
+    그 사이에는 멈춰 있다 (처리 속도와 무관하게 영상 시간 기준으로 판정).
+    now()는 start_time + 영상 내 시각이므로 이벤트 시각 표시도 자연스럽다.
+    """
+    
+    def __init__(self, fps=30.0, start_time=None):
+        """
+        Args:
+            fps: 컨테이너 타임스탬프가 없을 때 사용할 프레임 속도
+            start_time: 영상 시작 시점에 해당하는 epoch 시각 (None이면 현재 시각)
+        """
+        self.frame_period = 1.0 / fps if fps and fps > 0 else 1.0 / 30.0
+        self.start_time = time.time() if start_time is None else start_time
+        
+        self._lock = threading.Lock()
+        self._media_time = 0.0
+        self._frames = 0
+    
+    def now(self):
+        """현재 리플레이 시각 (epoch 초)"""
+        with self._lock:
+            return self.start_time + self._media_time
+    
+    def advance_to(self, media_seconds):
+        """영상 내 시각으로 진행 (뒤로 가지는 않음)"""
+        with self._lock:
+            self._media_time = max(self._media_time, media_seconds)
+    
+    def frame_timestamp(self, cap=None):
+        """
+        방금 읽은 프레임의 타임스탬프로 시계를 진행하고 그 시각을 반환
+        
+        cap의 CAP_PROP_POS_MSEC(컨테이너 타임스탬프)를 우선 사용하고,
+        없으면 프레임 번호 / fps로 계산한다.
+        """
+        with self._lock:
+            media_seconds = self._frames * self.frame_period
+            self._frames += 1
+        
+        if cap is not None and media_seconds > 0:
+            position_msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+            if position_msec and position_msec > 0:
+                media_seconds = position_msec / 1000.0
+        
+        self.advance_to(media_seconds)
+        return self.now()
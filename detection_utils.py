@@ -0,0 +1,111 @@
+"""
+YOLO 검출 결과 디코딩 유틸리티
+- ultralytics Results → 원시 검출 배열 [x1, y1, x2, y2, conf, cls] (추론 백엔드 공통 출력)
+- ultralytics Results → 사람 검출 NumPy 배열 [x1, y1, x2, y2, conf] (사람 클래스로 제한한 추론)
+- 트래킹 사용 시 [x1, y1, x2, y2, conf, track_id]
+"""
+
+import numpy as np
+
+
+# 검출 배열 열 인덱스
+BBOX_COLUMNS = slice(0, 4)
+CONF_COLUMN = 4
+TRACK_ID_COLUMN = 5
+CLASS_COLUMN = 5  # 원시 검출 배열 (추론 백엔드 출력)의 클래스 열
+
+
+def to_numpy(value):
+    """torch 텐서 / NumPy 배열을 NumPy 배열로 변환 (GPU 텐서는 CPU로 복사)"""
+    if hasattr(value, 'cpu'):
+        value = value.cpu()
+    if hasattr(value, 'numpy'):
+        return value.numpy()
+    return np.asarray(value)
+
+
+def empty_detections():
+    """빈 검출 배열 (0, 5)"""
+    return np.zeros((0, 5), dtype=np.float32)
+
+
+def empty_raw_detections():
+    """빈 원시 검출 배열 (0, 6)"""
+    return np.zeros((0, 6), dtype=np.float32)
+
+
+def decode_boxes(result):
+    """
+    ultralytics Results 1개 → 원시 검출 배열
+    
+    박스별 .cpu().numpy() 변환 대신 boxes.xyxy / boxes.conf / boxes.cls 전체를 한 번씩만 변환한다.
+    
+    Returns:
+        numpy.ndarray: (N, 6) float32 배열 [x1, y1, x2, y2, conf, cls]
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return empty_raw_detections()
+    
+    xyxy = to_numpy(boxes.xyxy).reshape(-1, 4)
+    raw = np.empty((len(xyxy), 6), dtype=np.float32)
+    raw[:, BBOX_COLUMNS] = xyxy
+    raw[:, CONF_COLUMN] = to_numpy(boxes.conf).reshape(-1)
+    raw[:, CLASS_COLUMN] = to_numpy(boxes.cls).reshape(-1)
+    return raw
+
+
+def decode_person_boxes(result, person_class_id=0, confidence_threshold=0.5):
+    """
+    사람 클래스로 제한해서 추론한 ultralytics Results 1개 → 사람 검출 배열
+    
+    boxes.data ([x1, y1, x2, y2, conf, cls])를 한 번만 변환한다.
+    classes/conf 인자를 무시하는 모델도 있으므로 클래스/신뢰도 마스크는 한 번 더 적용.
+    
+    Returns:
+        numpy.ndarray: (N, 5) float32 배열 [x1, y1, x2, y2, conf]
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return empty_detections()
+    
+    data = to_numpy(boxes.data).reshape(-1, 6)
+    mask = (data[:, CLASS_COLUMN] == person_class_id) & (data[:, CONF_COLUMN] >= confidence_threshold)
+    return np.ascontiguousarray(data[mask, :5], dtype=np.float32)
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    박스 간 IoU 행렬 계산 (벡터화)
+    
+    Args:
+        boxes_a: (N, 4) 배열 [x1, y1, x2, y2]
+        boxes_b: (M, 4) 배열 [x1, y1, x2, y2]
+    
+    Returns:
+        numpy.ndarray: (N, M) IoU 행렬
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    
+    inter_x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    inter_y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    inter_x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    inter_y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    
+    inter = np.clip(inter_x2 - inter_x1, 0, None) * np.clip(inter_y2 - inter_y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-6)
+
+
+def detection_key(detection):
+    """
+    검출 1건의 식별 키 (얼굴 분석 결과 매핑용)
+    
+    트래킹 사용 시 트랙 ID, 아니면 bbox 좌표 튜플
+    """
+    if len(detection) > TRACK_ID_COLUMN:
+        return int(detection[TRACK_ID_COLUMN])
+    return tuple(detection[BBOX_COLUMNS])
@@ -0,0 +1,227 @@
+"""
+멀티 카메라 검출기 풀
+- 여러 카메라 소스를 하나의 추론 백엔드(YOLO 모델) 인스턴스로 처리
+- 검출 시점이 된 카메라 프레임을 모아 배치 추론 1회로 실행
+- 결과를 카메라별 RealtimeDetector(ROI 상태)로 전달
+"""
+
+import time
+import threading
+
+from realtime_detector import RealtimeDetector
+from model_registry import model_registry
+
+
+class DetectorPool:
+    """
+    카메라 설정 리스트를 받아 공유 모델 1개로 동작하는 검출기 풀
+    
+    카메라별 캡처는 각 RealtimeDetector의 캡처 스레드가 담당하고,
+    풀 스레드 1개가 추론(배치), ROI 상태 업데이트, 시각화를 모두 처리한다.
+    """
+    
+    def __init__(self, camera_configs, base_config=None):
+        """
+        Args:
+            camera_configs: 카메라 설정 리스트
+                [{'id': 'cam1', 'camera_source': 0, 'roi_regions': [...], ...}, ...]
+                공통 설정(base_config)을 카메라별 키가 덮어씀
+            base_config: 공통 설정 딕셔너리 (yolo_model, 임계값 등)
+        """
+        self.base_config = base_config or {}
+        
+        # 공유 추론 백엔드 로드 (카메라 수와 무관하게 1회)
+        print(f"[DetectorPool] 공유 추론 백엔드 로딩: {self.base_config.get('yolo_model', 'yolov8n.pt')}")
+        self.backend = model_registry.get_backend(self.base_config)
+        
+        # 배치 크기 상한 (GPU/CPU 메모리에 맞게 조정)
+        self.max_batch_size = self.base_config.get('pool_max_batch_size', 16)
+        
+        # 배치 윈도우: 곧 검출 시점이 될 카메라도 이번 배치에 함께 포함 (카메라 간 타이밍 정렬)
+        self.batch_window = self.base_config.get('pool_batch_window_seconds', 0.1)
+        
+        # 카메라별 검출기 생성 (모델 공유, 추론은 풀이 직접 수행)
+        self.detectors = {}
+        for index, camera_config in enumerate(camera_configs):
+            camera_id = camera_config.get('id', f'camera_{index}')
+            
+            config = dict(self.base_config)
+            config.update(camera_config)
+            config['async_inference'] = False
+            
+            roi_regions = camera_config.get('roi_regions', self.base_config.get('roi_regions', []))
+            self.detectors[camera_id] = RealtimeDetector(config, roi_regions, model=self.backend)
+        
+        # 통계
+        self.batches_run = 0
+        self.frames_inferred = 0
+        self.last_batch_size = 0
+        
+        # 스레드 제어
+        self.running = False
+        self.thread = None
+        
+        print(f"[DetectorPool] 초기화 완료 ({len(self.detectors)}개 카메라, 최대 배치 {self.max_batch_size})")
+    
+    def start(self):
+        """모든 카메라 캡처 및 풀 스레드 시작"""
+        if self.running:
+            return
+        
+        for camera_id, detector in self.detectors.items():
+            if detector.open_capture():
+                detector.start_capture()
+                detector.running = True
+            else:
+                print(f"[DetectorPool] ⚠️  {camera_id} 카메라 열기 실패 - 제외")
+        
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        print("[DetectorPool] 풀 스레드 시작됨")
+    
+    def stop(self):
+        """풀 스레드 및 모든 카메라 중지"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=5)
+        
+        for detector in self.detectors.values():
+            detector.running = False
+            detector.close_capture()
+            detector.release_face_analyzer()
+        print("[DetectorPool] 중지됨")
+    
+    def run_batch(self, batch):
+        """
+        배치 추론 1회 실행 후 카메라별로 결과 전달
+        
+        Args:
+            batch: [(detector, PooledFrame, current_time, frame_info), ...]
+        """
+        preprocess_start = time.perf_counter()
+        inputs = [detector.get_inference_input(frame.array) for detector, frame, _, _ in batch]
+        inference_start = time.perf_counter()
+        # 사람 클래스만 추론 (카메라별 임계값이 다르면 가장 낮은 값으로 추론 후 카메라별로 다시 거름)
+        results = self.backend.detect_persons(
+            [image for image, _ in inputs],
+            confidence_threshold=min(detector.confidence_threshold for detector, _, _, _ in batch),
+            person_class_id=batch[0][0].person_class_id
+        )
+        inference_end = time.perf_counter()
+        
+        # 카메라 하나의 결과 처리가 실패해도 같은 배치의 다른 카메라는 계속 처리
+        for (detector, frame, current_time, frame_info), (_, offset), detections in zip(batch, inputs, results):
+            try:
+                detections = detector.decode_results(detections, offset)
+                
+                # 배치 전체 시간을 각 카메라의 단계 지연으로 기록 (프레임이 실제로 기다린 시간)
+                detector.pipeline_stats.record('preprocess', inference_start - preprocess_start)
+                detector.pipeline_stats.record('inference', inference_end - inference_start)
+                
+                detector.handle_results(frame.array, detections, current_time, frame_info, frame)
+            except Exception as e:
+                print(f"[DetectorPool] ⚠️  {self.camera_id(detector)} 결과 처리 실패: {e}")
+        
+        self.batches_run += 1
+        self.frames_inferred += len(batch)
+        self.last_batch_size = len(batch)
+    
+    def run(self):
+        """풀 루프: 새 프레임 수집 → 배치 추론 → 카메라별 시각화/큐 전송"""
+        latest_frames = {}  # 카메라별 최신 프레임 (PooledFrame 참조 보유)
+        checked_seqs = {}   # 카메라별 마지막으로 검출(모션 게이트 포함)에 사용한 프레임 시퀀스
+        
+        while self.running:
+            # 종료된 카메라 정리 (새 프레임 유무와 관계없이 매 반복 확인)
+            for detector in self.detectors.values():
+                if detector.grabber is not None and detector.grabber.slot.closed:
+                    detector.close_capture()
+                    checked_seqs.pop(detector, None)
+                    previous = latest_frames.pop(detector, None)
+                    if previous is not None:
+                        previous.release()
+            
+            active = [d for d in self.detectors.values() if d.grabber is not None]
+            if not active:
+                print("[DetectorPool] 활성 카메라 없음 - 종료")
+                break
+            
+            new_frames = []
+            for detector in active:
+                frame = detector.poll_frame()
+                if frame is not None:
+                    previous = latest_frames.get(detector)
+                    if previous is not None:
+                        previous.release()
+                    latest_frames[detector] = frame
+                    new_frames.append((detector, frame))
+            
+            # 검출 시점이 된 카메라 수집 (배치 윈도우 내 카메라 포함, 각 카메라의 최신 프레임 사용)
+            # 이미 검출에 사용한 프레임(시퀀스가 그대로인 정지/끊긴 카메라)은 다시 추론하지 않음
+            due = []
+            if any(detector.is_detection_due(detector.clock.now()) for detector in latest_frames):
+                for detector, frame in latest_frames.items():
+                    if checked_seqs.get(detector) == frame.info.seq:
+                        continue
+                    current_time = detector.clock.now()
+                    if detector.is_detection_due(current_time + self.batch_window):
+                        detector.last_detection_time = current_time
+                        checked_seqs[detector] = frame.info.seq
+                        if detector.check_motion_gate(frame.array, current_time, frame.info):
+                            due.append((detector, frame, current_time, frame.info))
+            
+            # 검출 시점이 된 카메라 프레임을 모아 배치 추론
+            for i in range(0, len(due), self.max_batch_size):
+                try:
+                    self.run_batch(due[i:i + self.max_batch_size])
+                except Exception as e:
+                    print(f"[DetectorPool] ⚠️  배치 추론 실패: {e}")
+            
+            if not new_frames:
+                time.sleep(0.005)
+                continue
+            
+            # 카메라별 시각화 및 큐 전송
+            for detector, frame in new_frames:
+                annotated_frame = detector.render_frame(frame.array)
+                detector.publish_frames(frame.retain(), annotated_frame)
+        
+        for frame in latest_frames.values():
+            frame.release()
+        self.running = False
+    
+    def camera_id(self, detector):
+        """검출기의 카메라 ID (로그용)"""
+        for camera_id, other in self.detectors.items():
+            if other is detector:
+                return camera_id
+        return None
+    
+    def get_detector(self, camera_id):
+        """카메라 ID로 검출기 가져오기"""
+        return self.detectors.get(camera_id)
+    
+    def get_latest_frame(self, camera_id, original=False):
+        """카메라별 최신 프레임 가져오기 (논블로킹, PooledFrame - 호출자가 release)"""
+        detector = self.detectors.get(camera_id)
+        if detector is None:
+            return None
+        return detector.get_latest_frame(original=original)
+    
+    def get_pool_stats(self):
+        """풀 통계 (배치 수, 평균 배치 크기, 카메라별 FPS/드롭 프레임)"""
+        return {
+            'batches_run': self.batches_run,
+            'frames_inferred': self.frames_inferred,
+            'avg_batch_size': self.frames_inferred / self.batches_run if self.batches_run else 0.0,
+            'last_batch_size': self.last_batch_size,
+            'cameras': {
+                camera_id: {
+                    'fps': detector.fps,
+                    'frames_dropped': detector.frames_dropped,
+                    'frame_buffers': detector.frame_pool.get_stats()
+                }
+                for camera_id, detector in self.detectors.items()
+            }
+        }
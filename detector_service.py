@@ -0,0 +1,230 @@
+"""
+헤드리스 검출 서비스
+- config.json으로 RealtimeDetector 실행 (Streamlit/브라우저/X11 불필요)
+- config에 cameras 리스트가 있으면 DetectorPool로 여러 카메라를 공유 모델 1개로 실행
+- 시각화 비활성화 (ROI/바운딩박스 그리기 없음)
+- SIGTERM/SIGINT: 정상 종료, SIGHUP: config.json 다시 읽고 검출기 재시작
+- 주기적으로 처리량 로그 출력
+
+사용법:
+    python detector_service.py [config.json]
+"""
+
+import sys
+import json
+import time
+import signal
+import threading
+from pathlib import Path
+
+from roi_utils import normalize_roi_format
+from realtime_detector import RealtimeDetector
+from detector_pool import DetectorPool
+
+
+class DetectorService:
+    """
+    RealtimeDetector 헤드리스 실행기
+    
+    메인 스레드는 시그널 처리, 이벤트 로그, 처리량 로그만 담당하고
+    캡처/추론은 RealtimeDetector(멀티 카메라는 DetectorPool)의 백그라운드 스레드에서 수행된다.
+    """
+    
+    def __init__(self, config_path='config.json'):
+        """
+        Args:
+            config_path: 설정 파일 경로
+        """
+        self.config_path = Path(config_path)
+        self.config = None
+        self.detector = None
+        self.pool = None
+        self.detectors = {}  # 카메라 ID → RealtimeDetector (단일 카메라는 None → 검출기)
+        
+        self._wake = threading.Event()
+        self._stop_requested = False
+        self._reload_requested = False
+        
+        self.log_interval = 30.0
+        self._last_log_time = None
+        self._last_counters = None
+    
+    def load_config(self):
+        """config.json 로드 (시각화 비활성화)"""
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        # ROI 데이터 정규화 (rectangle → polygon 변환)
+        config['roi_regions'] = [normalize_roi_format(roi) for roi in config.get('roi_regions', [])]
+        
+        # 헤드리스: 화면 출력용 시각화 비활성화 (카메라별 키가 공통 설정을 덮어쓰므로 카메라마다 설정)
+        config['enable_rendering'] = False
+        cameras = config.get('cameras', [])
+        for camera in cameras:
+            if 'roi_regions' in camera:
+                camera['roi_regions'] = [normalize_roi_format(roi) for roi in camera['roi_regions']]
+            camera['enable_rendering'] = False
+        
+        self.log_interval = config.get('service_log_interval_seconds', 30.0)
+        self.config = config
+        if cameras:
+            print(f"[DetectorService] 설정 로드: {self.config_path} (카메라 {len(cameras)}대)")
+        else:
+            print(f"[DetectorService] 설정 로드: {self.config_path} (ROI {len(config['roi_regions'])}개)")
+        return config
+    
+    def start_detector(self):
+        """검출기(멀티 카메라는 검출기 풀) 생성 및 백그라운드 스레드 시작"""
+        if self.config.get('cameras'):
+            base_config = {key: value for key, value in self.config.items() if key != 'cameras'}
+            self.pool = DetectorPool(self.config['cameras'], base_config=base_config)
+            self.pool.start()
+            self.detectors = dict(self.pool.detectors)
+        else:
+            self.detector = RealtimeDetector(self.config, self.config['roi_regions'])
+            self.detector.start()
+            self.detectors = {None: self.detector}
+        self._last_log_time = time.monotonic()
+        self._last_counters = self._read_counters()
+    
+    def stop_detector(self):
+        """검출기 중지"""
+        if self.pool is not None:
+            self.pool.stop()
+            self.log_events()
+            self.pool = None
+        elif self.detector is not None:
+            self.detector.stop()
+            self.log_events()
+            self.detector = None
+        self.detectors = {}
+    
+    def is_running(self):
+        """검출(풀) 스레드 동작 여부"""
+        thread = self.pool.thread if self.pool is not None else self.detector.thread
+        return thread is not None and thread.is_alive()
+    
+    def handle_signal(self, signum, frame):
+        """시그널 핸들러 (플래그만 설정하고 메인 루프를 깨움)"""
+        if signum == getattr(signal, 'SIGHUP', None):
+            print("[DetectorService] SIGHUP 수신 - 설정 다시 로드")
+            self._reload_requested = True
+        else:
+            print(f"[DetectorService] 종료 시그널 수신 ({signal.Signals(signum).name})")
+            self._stop_requested = True
+        self._wake.set()
+    
+    def install_signal_handlers(self):
+        """SIGTERM/SIGINT/SIGHUP 핸들러 등록 (SIGHUP은 지원하는 플랫폼만)"""
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self.handle_signal)
+    
+    def _read_counters(self):
+        """처리량 계산용 누적 카운터 (카메라별)"""
+        counters = {}
+        for camera_id, detector in self.detectors.items():
+            grabber = detector.grabber
+            counters[camera_id] = {
+                'captured': grabber.frames_captured if grabber else 0,
+                'dropped': detector.frames_dropped,
+                'inferences': detector.inferences_run
+            }
+        return counters
+    
+    def log_throughput(self):
+        """직전 로그 이후 처리량 출력 (멀티 카메라는 카메라별 한 줄)"""
+        now = time.monotonic()
+        elapsed = now - self._last_log_time
+        counters = self._read_counters()
+        
+        for camera_id, detector in self.detectors.items():
+            prefix = "[DetectorService]" if camera_id is None else f"[DetectorService] [{camera_id}]"
+            delta = {key: counters[camera_id][key] - self._last_counters[camera_id][key] for key in counters[camera_id]}
+            message = (
+                f"{prefix} 📊 처리 {detector.fps:.1f} FPS | "
+                f"캡처 {delta['captured'] / elapsed:.1f} FPS (드롭 {delta['dropped']}) | "
+                f"추론 {delta['inferences']}회 ({delta['inferences'] / elapsed:.2f}/s)"
+            )
+            if detector.motion_gate is not None:
+                message += f" | 모션 스킵률 {detector.motion_gate.get_stats()['skip_ratio']:.0%}"
+            if detector.events_dropped:
+                message += f" | 버린 이벤트 {detector.events_dropped}건"
+            print(message)
+            print(f"{prefix} ⏱️  {detector.pipeline_stats.format_summary()}")
+            if detector.alert_latency.get_summary():
+                print(f"{prefix} 🚨 캡처→알림 {detector.alert_latency.format_summary()}")
+        
+        if self.pool is not None:
+            stats = self.pool.get_pool_stats()
+            print(f"[DetectorService] 🧺 배치 {stats['batches_run']}회 (평균 {stats['avg_batch_size']:.1f}프레임)")
+        
+        self._last_log_time = now
+        self._last_counters = counters
+    
+    def log_events(self):
+        """검출기 이벤트/상태 큐 비우기 (이벤트는 로그로 출력)"""
+        for camera_id, detector in self.detectors.items():
+            prefix = "[DetectorService]" if camera_id is None else f"[DetectorService] [{camera_id}]"
+            for event in detector.get_latest_events():
+                print(f"{prefix} 🔔 이벤트: {event}")
+            detector.get_latest_stats()
+    
+    def run(self):
+        """
+        서비스 메인 루프
+        
+        Returns:
+            int: 종료 코드 (0: 정상 종료, 1: 검출기 비정상 종료)
+        """
+        self.install_signal_handlers()
+        self.load_config()
+        self.start_detector()
+        print(f"[DetectorService] 서비스 시작 (처리량 로그 {self.log_interval}초 간격)")
+        
+        exit_code = 0
+        while not self._stop_requested:
+            self._wake.wait(timeout=1.0)
+            self._wake.clear()
+            
+            if self._reload_requested:
+                self._reload_requested = False
+                self.stop_detector()
+                try:
+                    self.load_config()
+                except (OSError, ValueError) as e:
+                    print(f"[DetectorService] ⚠️  설정 다시 로드 실패 - 이전 설정 유지: {e}")
+                self.start_detector()
+                continue
+            
+            self.log_events()
+            
+            # 카메라 종료/읽기 실패 등으로 검출 스레드가 끝나면 서비스도 종료 (상위 감시자가 재시작)
+            if not self.is_running():
+                print("[DetectorService] ❌ 검출 스레드가 종료되었습니다")
+                exit_code = 1
+                break
+            
+            if time.monotonic() - self._last_log_time >= self.log_interval:
+                self.log_throughput()
+        
+        self.stop_detector()
+        print("[DetectorService] 서비스 종료")
+        return exit_code
+
+
+def main():
+    """메인 함수"""
+    config_path = sys.argv[1] if len(sys.argv) > 1 else 'config.json'
+    
+    try:
+        service = DetectorService(config_path)
+        sys.exit(service.run())
+    except FileNotFoundError:
+        print(f"❌ {config_path} 파일을 찾을 수 없습니다.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
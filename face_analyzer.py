@@ -8,7 +8,8 @@
 
 import cv2
 import numpy as np
-from collections import deque
+from collections import deque, OrderedDict
+from itertools import chain
 
 try:
     import mediapipe as mp
@@ -18,6 +19,90 @@ except ImportError:
     print("⚠️ MediaPipe not installed. Run: pip install mediapipe")
 
 
+# 랜드마크 인덱스 (468개 중 주요 점) - 팬시 인덱싱용 배열
+# 왼쪽 눈 (6개 점)
+LEFT_EYE = np.array([362, 385, 387, 263, 373, 380], dtype=np.intp)
+# 오른쪽 눈 (6개 점)
+RIGHT_EYE = np.array([33, 160, 158, 133, 153, 144], dtype=np.intp)
+# 입 외곽 (12개 점)
+MOUTH_OUTER = np.array([61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 308], dtype=np.intp)
+# 입 내부 (8개 점)
+MOUTH_INNER = np.array([78, 95, 88, 178, 87, 14, 317, 402], dtype=np.intp)
+# 눈썹 (표정 분석용)
+LEFT_EYEBROW = np.array([70, 63, 105, 66, 107], dtype=np.intp)
+RIGHT_EYEBROW = np.array([336, 296, 334, 293, 300], dtype=np.intp)
+
+# 양쪽 눈/눈썹 (2, K) - 한 번의 인덱싱으로 두 쪽을 함께 계산
+BOTH_EYES = np.stack([LEFT_EYE, RIGHT_EYE])
+BOTH_EYEBROWS = np.stack([LEFT_EYEBROW, RIGHT_EYEBROW])
+# 입 중앙 상단(13) / 하단(14), 왼쪽(61) / 오른쪽(291) 입꼬리
+MOUTH_KEYPOINTS = np.array([13, 14, 61, 291], dtype=np.intp)
+
+# EAR: 눈 점 순서 기준 수직 쌍 (p2-p6, p3-p5), 수평 쌍 (p1-p4)
+EAR_UPPER = np.array([1, 2], dtype=np.intp)
+EAR_LOWER = np.array([5, 4], dtype=np.intp)
+# MAR: 입 점 순서 기준 수직 쌍 (p2-p8, p3-p7, p4-p6), 수평 쌍 (p1-p5)
+MAR_UPPER = np.array([1, 2, 3], dtype=np.intp)
+MAR_LOWER = np.array([7, 6, 5], dtype=np.intp)
+
+# 모자이크 배치 분석: 타일 한 변 크기 (픽셀)
+MOSAIC_TILE_SIZE = 192
+
+# 눈 감김 판단 EAR 기본 임계값 (얼굴 분석 스케줄러도 같은 값 사용)
+DEFAULT_EAR_THRESHOLD = 0.21
+
+
+def landmark_array(landmarks):
+    """
+    MediaPipe 랜드마크 → (N, 2) float32 [x, y] 배열 (정규화 좌표)
+    
+    얼굴마다 한 번만 변환하고 이후 지표는 모두 이 배열에서 인덱싱한다.
+    이미 배열이면 그대로 반환.
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    count = len(landmarks)
+    coords = np.fromiter(
+        chain.from_iterable((lm.x, lm.y) for lm in landmarks),
+        dtype=np.float32,
+        count=2 * count
+    )
+    return coords.reshape(count, 2)
+
+
+def clip_bbox(frame, bbox):
+    """BBox를 프레임 경계로 자르기 → (x1, y1, x2, y2) 정수"""
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = map(int, bbox)
+    return max(0, x1), max(0, y1), min(w, x2), min(h, y2)
+
+
+def head_region(x1, y1, x2, y2):
+    """
+    사람 BBox에서 머리가 있을 영역 (모자이크 타일용)
+    
+    서 있는 사람(세로로 긴 박스)은 상단 정사각형 (머리 + 어깨),
+    누워 있는 사람(가로로 긴 박스)은 머리 위치를 알 수 없으므로 박스 전체.
+    """
+    width, height = x2 - x1, y2 - y1
+    if height > width:
+        return x1, y1, x2, y1 + width
+    return x1, y1, x2, y2
+
+
+def aspect_ratio(points, upper, lower, left, right):
+    """
+    수직 거리 합 / (수직 쌍 개수 * 수평 거리) - EAR/MAR 공통
+    
+    points는 (..., K, 2) 배열이며 앞쪽 차원(예: 양쪽 눈)은 한 번에 계산된다.
+    """
+    vertical = points[..., upper, :] - points[..., lower, :]
+    horizontal = points[..., left, :] - points[..., right, :]
+    vertical_sum = np.sqrt((vertical * vertical).sum(axis=-1)).sum(axis=-1)
+    horizontal_dist = np.sqrt((horizontal * horizontal).sum(axis=-1))
+    return vertical_sum / (len(upper) * horizontal_dist + 1e-6)  # 0으로 나누기 방지
+
+
 class FaceAnalyzer:
     """
     MediaPipe 기반 실시간 얼굴 분석기
@@ -35,8 +120,14 @@ class FaceAnalyzer:
         
         # MediaPipe Face Mesh 초기화
         self.mp_face_mesh = mp.solutions.face_mesh
+        # 사람 크롭 1개만 받는 트랙별 컨텍스트는 1로 설정해야 추적 경로가 동작
+        # (추적 중인 얼굴 수 < max_num_faces이면 MediaPipe가 매 프레임 얼굴 검출을 다시 실행)
+        self.max_num_faces = self.config.get('face_mesh_max_faces', 3)
+        # 정지 이미지 모드: 매 호출 얼굴 검출 (모자이크처럼 호출마다 배치가 바뀌는 입력은 추적하면 안 됨)
+        self.static_image_mode = self.config.get('face_mesh_static_image', False)
         self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=3,                # 최대 3명
+            static_image_mode=self.static_image_mode,
+            max_num_faces=self.max_num_faces,  # 기본 최대 3명
             refine_landmarks=True,          # 눈/입술 정제
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
@@ -46,21 +137,16 @@ class FaceAnalyzer:
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
         
-        # 랜드마크 인덱스 (468개 중 주요 점)
-        # 왼쪽 눈 (6개 점)
-        self.LEFT_EYE = [362, 385, 387, 263, 373, 380]
-        # 오른쪽 눈 (6개 점)
-        self.RIGHT_EYE = [33, 160, 158, 133, 153, 144]
-        # 입 외곽 (12개 점)
-        self.MOUTH_OUTER = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 308]
-        # 입 내부 (8개 점)
-        self.MOUTH_INNER = [78, 95, 88, 178, 87, 14, 317, 402]
-        # 눈썹 (표정 분석용)
-        self.LEFT_EYEBROW = [70, 63, 105, 66, 107]
-        self.RIGHT_EYEBROW = [336, 296, 334, 293, 300]
+        # 랜드마크 인덱스 (모듈 상수 참조)
+        self.LEFT_EYE = LEFT_EYE
+        self.RIGHT_EYE = RIGHT_EYE
+        self.MOUTH_OUTER = MOUTH_OUTER
+        self.MOUTH_INNER = MOUTH_INNER
+        self.LEFT_EYEBROW = LEFT_EYEBROW
+        self.RIGHT_EYEBROW = RIGHT_EYEBROW
         
         # 임계값 (config에서 가져오거나 기본값)
-        self.EAR_THRESHOLD = self.config.get('ear_threshold', 0.21)
+        self.EAR_THRESHOLD = self.config.get('ear_threshold', DEFAULT_EAR_THRESHOLD)
         self.MAR_SPEAK_THRESHOLD = self.config.get('mar_speak_threshold', 0.3)
         self.MAR_OPEN_THRESHOLD = self.config.get('mar_open_threshold', 0.5)
         self.VENTILATOR_THRESHOLD = self.config.get('ventilator_detection_threshold', 0.3)
@@ -68,6 +154,10 @@ class FaceAnalyzer:
         # 안정화를 위한 버퍼 (5 프레임 평균)
         self.ear_buffer = deque(maxlen=5)
         self.mar_buffer = deque(maxlen=5)
+        self._key_buffers = OrderedDict()  # analyze_faces() 키별 (ear_buffer, mar_buffer)
+        
+        # 모자이크 캔버스 (analyze_faces()에서 재사용)
+        self._mosaic_canvas = None
         
         print("[FaceAnalyzer] 초기화 완료")
         print(f"  - EAR Threshold: {self.EAR_THRESHOLD}")
@@ -81,29 +171,15 @@ class FaceAnalyzer:
         EAR = (||p2-p6|| + ||p3-p5||) / (2 * ||p1-p4||)
         
         Args:
-            landmarks: MediaPipe 랜드마크
-            eye_indices: 눈 랜드마크 인덱스 리스트
+            landmarks: MediaPipe 랜드마크 또는 landmark_array() 결과
+            eye_indices: 눈 랜드마크 인덱스 (6,) 또는 여러 눈 (K, 6)
         
         Returns:
-            float: EAR 값 (0.2 이하면 눈 감음)
+            float: EAR 값 (0.2 이하면 눈 감음), (K, 6)이면 눈별 EAR 배열
         """
-        # 랜드마크 좌표 추출
-        points = np.array([
-            [landmarks[i].x, landmarks[i].y]
-            for i in eye_indices
-        ])
-        
-        # 수직 거리 (2개)
-        A = np.linalg.norm(points[1] - points[5])
-        B = np.linalg.norm(points[2] - points[4])
-        
-        # 수평 거리
-        C = np.linalg.norm(points[0] - points[3])
-        
-        # EAR 계산
-        ear = (A + B) / (2.0 * C + 1e-6)  # 0으로 나누기 방지
-        
-        return ear
+        points = landmark_array(landmarks)[eye_indices]
+        ear = aspect_ratio(points, EAR_UPPER, EAR_LOWER, 0, 3)
+        return float(ear) if ear.ndim == 0 else ear
     
     def calculate_mar(self, landmarks, mouth_indices):
         """
@@ -112,30 +188,14 @@ class FaceAnalyzer:
         MAR = (||p2-p8|| + ||p3-p7|| + ||p4-p6||) / (3 * ||p1-p5||)
         
         Args:
-            landmarks: MediaPipe 랜드마크
-            mouth_indices: 입 랜드마크 인덱스 리스트
+            landmarks: MediaPipe 랜드마크 또는 landmark_array() 결과
+            mouth_indices: 입 랜드마크 인덱스
         
         Returns:
             float: MAR 값 (높을수록 입이 크게 열림)
         """
-        # 랜드마크 좌표 추출
-        points = np.array([
-            [landmarks[i].x, landmarks[i].y]
-            for i in mouth_indices
-        ])
-        
-        # 수직 거리 (3개)
-        A = np.linalg.norm(points[1] - points[7])
-        B = np.linalg.norm(points[2] - points[6])
-        C = np.linalg.norm(points[3] - points[5])
-        
-        # 수평 거리
-        D = np.linalg.norm(points[0] - points[4])
-        
-        # MAR 계산
-        mar = (A + B + C) / (3.0 * D + 1e-6)
-        
-        return mar
+        points = landmark_array(landmarks)[mouth_indices]
+        return float(aspect_ratio(points, MAR_UPPER, MAR_LOWER, 0, 4))
     
     def detect_mask_or_ventilator(self, frame, face_bbox):
         """
@@ -199,34 +259,27 @@ class FaceAnalyzer:
         얼굴 표정 분석 (개선된 규칙 기반)
         
         Args:
-            landmarks: MediaPipe 랜드마크
+            landmarks: MediaPipe 랜드마크 또는 landmark_array() 결과
         
         Returns:
             dict: 표정 정보 {'expression': str, 'confidence': float, 'metrics': dict}
         """
-        # 눈썹 평균 높이 (정규화)
-        left_eyebrow_y = np.mean([landmarks[i].y for i in self.LEFT_EYEBROW])
-        right_eyebrow_y = np.mean([landmarks[i].y for i in self.RIGHT_EYEBROW])
-        eyebrow_avg = (left_eyebrow_y + right_eyebrow_y) / 2
+        y = landmark_array(landmarks)[:, 1]
+        
+        # 눈썹 평균 높이 (정규화, 양쪽 점 개수가 같으므로 전체 평균 = 좌우 평균의 평균)
+        eyebrow_avg = float(y[BOTH_EYEBROWS].mean())
         
         # 눈 중앙점
-        left_eye_center_y = np.mean([landmarks[i].y for i in self.LEFT_EYE])
-        right_eye_center_y = np.mean([landmarks[i].y for i in self.RIGHT_EYE])
-        eye_avg = (left_eye_center_y + right_eye_center_y) / 2
+        eye_avg = float(y[BOTH_EYES].mean())
         
         # 눈썹-눈 거리 (표정 강도 측정)
         eyebrow_eye_dist = eye_avg - eyebrow_avg
         
-        # 입꼏리 좌표
-        left_mouth_corner = landmarks[61]  # 왼쪽 입꼬리
-        right_mouth_corner = landmarks[291]  # 오른쪽 입꼬리
-        
-        # 입 중앙 상단/하단
-        mouth_top = landmarks[13].y  # 윗입술 중앙
-        mouth_bottom = landmarks[14].y  # 아랫입술 중앙
+        # 입 중앙 상단/하단 (윗입술/아랫입술 중앙), 왼쪽/오른쪽 입꼬리
+        mouth_top, mouth_bottom, left_corner_y, right_corner_y = y[MOUTH_KEYPOINTS].tolist()
         
         # 입꼬리 평균 높이
-        mouth_corners_avg = (left_mouth_corner.y + right_mouth_corner.y) / 2
+        mouth_corners_avg = (left_corner_y + right_corner_y) / 2
         
         # 입 벌림 정도 (MAR과 유사)
         mouth_opening = mouth_bottom - mouth_top
@@ -278,28 +331,21 @@ class FaceAnalyzer:
             'metrics': metrics
         }
     
-    def analyze_face(self, frame, person_bbox=None):
+    def analyze_face(self, frame, person_bbox=None, key=None):
         """
         얼굴 분석 메인 함수
         
         Args:
             frame: 전체 프레임 또는 사람 크롭
             person_bbox: 사람 BBox (x1, y1, x2, y2) - None이면 전체 프레임 분석
+            key: EAR/MAR 평균 버퍼 키 (트랙 ID 등, None이면 분석기 공용 버퍼)
         
         Returns:
             dict or None: 분석 결과
         """
         # 사람 영역 크롭 (person_bbox 제공 시)
         if person_bbox is not None:
-            x1, y1, x2, y2 = map(int, person_bbox)
-            
-            # 경계 확인
-            h, w = frame.shape[:2]
-            x1 = max(0, x1)
-            y1 = max(0, y1)
-            x2 = min(w, x2)
-            y2 = min(h, y2)
-            
+            x1, y1, x2, y2 = clip_bbox(frame, person_bbox)
             person_crop = frame[y1:y2, x1:x2]
             
             if person_crop.size == 0:
@@ -320,21 +366,145 @@ class FaceAnalyzer:
         # 첫 번째 얼굴만 분석 (추후 다중 얼굴 지원 가능)
         face_landmarks = results.multi_face_landmarks[0]
         
-        # EAR 계산 (눈 상태)
-        left_ear = self.calculate_ear(face_landmarks.landmark, self.LEFT_EYE)
-        right_ear = self.calculate_ear(face_landmarks.landmark, self.RIGHT_EYE)
+        # 랜드마크를 한 번만 배열로 변환 (이후 지표는 모두 인덱싱)
+        points = landmark_array(face_landmarks.landmark)
+        
+        buffers = self.key_buffers(key) if key is not None else None
+        result = self.measure_face(frame, points, (x1, y1, x2, y2), buffers)
+        result['landmarks'] = face_landmarks
+        result['num_faces'] = len(results.multi_face_landmarks)
+        return result
+    
+    def analyze_faces(self, frame, person_bboxes, keys=None, tile_size=MOSAIC_TILE_SIZE):
+        """
+        여러 사람 얼굴을 모자이크로 묶어 한 번에 분석
+        
+        각 사람의 머리 영역을 고정 크기 캔버스의 타일에 배치하고 FaceMesh를 한 번만 실행한 뒤,
+        얼굴 중심이 속한 타일로 원래 사람을 찾는다. 타일 수는 max_num_faces (격자 한 변 = √)이며
+        사람이 더 많으면 타일 수만큼씩 나눠 실행한다.
+        타일에 들어가는 사람은 호출(패스)마다 바뀌므로 정지 이미지 모드 분석기(face_mesh_static_image)로
+        호출해야 한다 (추적 모드면 이전 캔버스의 얼굴 위치를 다른 사람에게 이어 붙일 수 있음).
+        랜드마크는 사람 크롭 기준 정규화 좌표로 되돌리므로 EAR/MAR 임계값은 analyze_face()와 같다.
+        
+        Args:
+            frame: 전체 프레임
+            person_bboxes: 사람 BBox 목록 [(x1, y1, x2, y2), ...]
+            keys: 사람별 평균 버퍼 키 (트랙 ID 등, None이면 분석기 공용 버퍼)
+            tile_size: 타일 한 변 크기 (픽셀)
+        
+        Returns:
+            list: person_bboxes 순서의 분석 결과 (얼굴 없으면 None)
+                  'landmarks'는 사람 크롭 기준 정규화 (N, 2) 배열
+        """
+        results = [None] * len(person_bboxes)
+        grid = max(1, int(np.sqrt(self.max_num_faces)))
+        tiles = grid * grid
+        
+        # 캔버스 (타일 크기가 바뀔 때만 재할당)
+        canvas_size = grid * tile_size
+        canvas = self._mosaic_canvas
+        if canvas is None or canvas.shape[0] != canvas_size:
+            canvas = np.zeros((canvas_size, canvas_size, 3), dtype=np.uint8)
+            self._mosaic_canvas = canvas
+        
+        for start in range(0, len(person_bboxes), tiles):
+            canvas.fill(0)
+            placements = {}  # 타일 번호 → (사람 번호, 사람 크롭 박스, 머리 영역 원점, 축소 비율)
+            
+            for tile, index in enumerate(range(start, min(start + tiles, len(person_bboxes)))):
+                x1, y1, x2, y2 = clip_bbox(frame, person_bboxes[index])
+                hx1, hy1, hx2, hy2 = head_region(x1, y1, x2, y2)
+                if hx2 <= hx1 or hy2 <= hy1:
+                    continue
+                
+                # 머리 영역을 비율 유지로 축소해 타일 좌상단에 배치
+                scale = tile_size / max(hx2 - hx1, hy2 - hy1)
+                tile_w = max(1, min(tile_size, round((hx2 - hx1) * scale)))
+                tile_h = max(1, min(tile_size, round((hy2 - hy1) * scale)))
+                row, col = divmod(tile, grid)
+                canvas[row * tile_size:row * tile_size + tile_h, col * tile_size:col * tile_size + tile_w] = cv2.resize(
+                    frame[hy1:hy2, hx1:hx2], (tile_w, tile_h), interpolation=cv2.INTER_AREA
+                )
+                placements[tile] = (index, (x1, y1, x2, y2), (hx1, hy1), scale)
+            
+            if not placements:
+                continue
+            
+            mesh_results = self.face_mesh.process(cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB))
+            if not mesh_results.multi_face_landmarks:
+                continue
+            
+            # 얼굴 → 타일 (중심점 기준)
+            tile_faces = {}
+            for face_landmarks in mesh_results.multi_face_landmarks:
+                canvas_points = landmark_array(face_landmarks.landmark) * canvas_size
+                center_x, center_y = canvas_points.mean(axis=0).tolist()
+                tile = int(center_y // tile_size) * grid + int(center_x // tile_size)
+                if tile in placements:
+                    tile_faces.setdefault(tile, []).append(canvas_points)
+            
+            for tile, faces in tile_faces.items():
+                # 한 타일에 여러 얼굴이면 가장 넓은 얼굴
+                canvas_points = max(faces, key=lambda face: np.ptp(face[:, 0]))
+                index, crop_box, (hx1, hy1), scale = placements[tile]
+                row, col = divmod(tile, grid)
+                x1, y1, x2, y2 = crop_box
+                
+                # 캔버스 픽셀 → 프레임 픽셀 → 사람 크롭 기준 정규화 좌표
+                points = canvas_points - np.array([col * tile_size, row * tile_size], dtype=np.float32)
+                points /= scale
+                points += np.array([hx1 - x1, hy1 - y1], dtype=np.float32)
+                points /= np.array([x2 - x1, y2 - y1], dtype=np.float32)
+                
+                buffers = self.key_buffers(keys[index]) if keys is not None else None
+                result = self.measure_face(frame, points, crop_box, buffers)
+                result['landmarks'] = points
+                result['num_faces'] = len(faces)
+                results[index] = result
+        
+        return results
+    
+    def key_buffers(self, key, max_keys=32):
+        """키(트랙 ID)별 EAR/MAR 평균 버퍼 (오래 쓰지 않은 키부터 삭제)"""
+        buffers = self._key_buffers
+        if key in buffers:
+            buffers.move_to_end(key)
+        else:
+            buffers[key] = (deque(maxlen=5), deque(maxlen=5))
+            while len(buffers) > max_keys:
+                buffers.popitem(last=False)
+        return buffers[key]
+    
+    def measure_face(self, frame, points, crop_box, buffers=None):
+        """
+        랜드마크 배열 → 눈/입/표정/마스크 분석 결과
+        
+        Args:
+            frame: 전체 프레임 (마스크/호흡기 검출용)
+            points: landmark_array() 결과 (크롭 기준 정규화 좌표)
+            crop_box: 랜드마크 기준 크롭 (x1, y1, x2, y2) - 프레임 좌표
+            buffers: (ear_buffer, mar_buffer) - None이면 분석기 공용 버퍼
+        
+        Returns:
+            dict: analyze_face() 결과 ('landmarks', 'num_faces' 제외)
+        """
+        ear_buffer, mar_buffer = buffers or (self.ear_buffer, self.mar_buffer)
+        x1, y1, x2, y2 = crop_box
+        
+        # EAR 계산 (눈 상태, 양쪽 눈 한 번에)
+        left_ear, right_ear = self.calculate_ear(points, BOTH_EYES).tolist()
         avg_ear = (left_ear + right_ear) / 2
         
         # 버퍼에 추가 (안정화)
-        self.ear_buffer.append(avg_ear)
-        ear_smoothed = np.mean(self.ear_buffer)
+        ear_buffer.append(avg_ear)
+        ear_smoothed = np.mean(ear_buffer)
         
         # MAR 계산 (입 상태)
-        mar = self.calculate_mar(face_landmarks.landmark, self.MOUTH_OUTER)
+        mar = self.calculate_mar(points, self.MOUTH_OUTER)
         
         # 버퍼에 추가 (안정화)
-        self.mar_buffer.append(mar)
-        mar_smoothed = np.mean(self.mar_buffer)
+        mar_buffer.append(mar)
+        mar_smoothed = np.mean(mar_buffer)
         
         # 눈 상태 판단
         eyes_open = ear_smoothed > self.EAR_THRESHOLD
@@ -348,17 +518,15 @@ class FaceAnalyzer:
             mouth_state = "closed"     # 닫힘
         
         # 표정 분석
-        expression = self.analyze_expression(face_landmarks.landmark)
-        
-        # 얼굴 BBox 계산 (랜드마크 기준)
-        landmark_points = np.array([
-            [lm.x * person_crop.shape[1], lm.y * person_crop.shape[0]]
-            for lm in face_landmarks.landmark
-        ])
-        face_x1 = int(np.min(landmark_points[:, 0]))
-        face_y1 = int(np.min(landmark_points[:, 1]))
-        face_x2 = int(np.max(landmark_points[:, 0]))
-        face_y2 = int(np.max(landmark_points[:, 1]))
+        expression = self.analyze_expression(points)
+        
+        # 얼굴 BBox 계산 (랜드마크 기준, 정규화 좌표 min/max 후 크롭 크기로 스케일)
+        crop_w, crop_h = x2 - x1, y2 - y1
+        (min_x, min_y), (max_x, max_y) = points.min(axis=0).tolist(), points.max(axis=0).tolist()
+        face_x1 = int(min_x * crop_w)
+        face_y1 = int(min_y * crop_h)
+        face_x2 = int(max_x * crop_w)
+        face_y2 = int(max_y * crop_h)
         
         # 절대 좌표로 변환
         face_bbox_abs = (
@@ -382,9 +550,7 @@ class FaceAnalyzer:
             'mar': float(mar_smoothed),
             'expression': expression,
             'has_mask_or_ventilator': has_device,
-            'device_confidence': float(device_conf),
-            'landmarks': face_landmarks,
-            'num_faces': len(results.multi_face_landmarks)
+            'device_confidence': float(device_conf)
         }
     
     def draw_face_analysis(self, frame, face_result):
@@ -446,6 +612,17 @@ class FaceAnalyzer:
         
         return frame
     
+    def reset(self):
+        """
+        스트림별 상태 초기화 (다른 검출기에서 재사용할 때)
+        
+        EAR/MAR 평균 버퍼만 비운다. FaceMesh 추적 상태는 새 장면에서 추적 신뢰도가 떨어지면
+        MediaPipe가 자동으로 다시 검출한다.
+        """
+        self.ear_buffer.clear()
+        self.mar_buffer.clear()
+        self._key_buffers.clear()
+    
     def __del__(self):
         """소멸자 - MediaPipe 자원 해제"""
         if hasattr(self, 'face_mesh'):
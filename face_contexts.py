@@ -0,0 +1,88 @@
+"""
+트랙별 얼굴 분석 컨텍스트 풀
+- 트래커 ID마다 전용 FaceAnalyzer (FaceMesh + EAR/MAR 평균 버퍼)
+- 같은 사람의 크롭만 연속으로 들어가므로 MediaPipe 추적 경로(얼굴 재검출 생략)가 동작
+- 트랙이 사라지거나 최대 개수를 넘으면 가장 오래 사용하지 않은 컨텍스트부터 반납 (LRU)
+
+하나의 FaceMesh에 여러 사람의 크롭을 번갈아 넣으면 매 호출마다 추적 상태가 무효화되어
+얼굴 검출이 다시 실행되고, EAR/MAR 평균 버퍼에도 여러 사람의 값이 섞인다.
+"""
+
+from collections import OrderedDict
+
+from model_registry import model_registry
+
+
+class FaceContextPool:
+    """
+    트랙 ID → FaceAnalyzer LRU 풀
+    
+    FaceAnalyzer는 모델 레지스트리에서 대여하고 제거 시 반납하므로,
+    새 트랙은 사라진 트랙의 인스턴스를 FaceMesh 재생성 없이 물려받는다.
+    검출 스레드 한 곳에서만 사용한다 (내부 락 없음).
+    """
+    
+    def __init__(self, max_contexts=4, registry=None):
+        """
+        Args:
+            max_contexts: 동시에 유지할 최대 컨텍스트 수 (초과 시 LRU 제거)
+            registry: FaceAnalyzer를 대여/반납할 모델 레지스트리 (None이면 전역 레지스트리)
+        """
+        self.max_contexts = max(1, int(max_contexts))
+        self.registry = registry or model_registry
+        self.contexts = OrderedDict()  # track_id → FaceAnalyzer (오래된 순)
+        
+        # 통계
+        self.created = 0
+        self.hits = 0
+        self.evicted = 0
+    
+    def get(self, track_id):
+        """트랙의 FaceAnalyzer (없으면 대여, 최대 개수 초과 시 LRU 제거)"""
+        analyzer = self.contexts.get(track_id)
+        if analyzer is not None:
+            self.contexts.move_to_end(track_id)
+            self.hits += 1
+            return analyzer
+        
+        while len(self.contexts) >= self.max_contexts:
+            _, oldest = self.contexts.popitem(last=False)
+            self.registry.release_face_analyzer(oldest)
+            self.evicted += 1
+        
+        analyzer = self.registry.acquire_face_analyzer(max_num_faces=1)
+        self.contexts[track_id] = analyzer
+        self.created += 1
+        return analyzer
+    
+    def analyze_face(self, track_id, frame, person_bbox):
+        """트랙 전용 FaceAnalyzer로 얼굴 분석 (FaceAnalyzer.analyze_face와 같은 결과)"""
+        return self.get(track_id).analyze_face(frame, person_bbox)
+    
+    def retain(self, track_ids):
+        """
+        살아있는 트랙의 컨텍스트만 유지 (트래커에서 삭제된 트랙은 반납)
+        
+        Args:
+            track_ids: 트래커의 현재 트랙 ID 목록
+        """
+        alive = set(track_ids)
+        for track_id in [t for t in self.contexts if t not in alive]:
+            self.registry.release_face_analyzer(self.contexts.pop(track_id))
+            self.evicted += 1
+    
+    def release_all(self):
+        """모든 컨텍스트 반납 (검출 중지 시)"""
+        while self.contexts:
+            _, analyzer = self.contexts.popitem(last=False)
+            self.registry.release_face_analyzer(analyzer)
+    
+    def get_stats(self):
+        """컨텍스트 풀 통계"""
+        return {
+            'contexts': len(self.contexts),
+            'max_contexts': self.max_contexts,
+            'created': self.created,
+            'hits': self.hits,
+            'evicted': self.evicted
+        }
@@ -0,0 +1,149 @@
+"""
+얼굴 분석 스케줄러 (검출 주기당 시간 예산)
+- 검출 주기마다 얼굴 분석에 쓸 수 있는 시간(ms)을 정하고, 우선순위가 높은 사람부터 예산 안에서 분석
+- 우선순위: ROI 내부 > 결과가 오래된 사람 > 임계값 근처 상태 (SAD 신뢰도, 눈 감김 EAR)
+- 예산을 넘는 사람은 다음 주기로 미룸 (인원이 많아도 주기 시간 상한 유지)
+
+사람 식별은 detection_key() 기준이므로 트래킹(트랙 ID)이 필요하다 (검출기가 자동으로 켬).
+임계값은 분석기/알림과 어긋나지 않도록 검출기가 넘겨준다 (기본값 없음).
+"""
+
+from collections import OrderedDict
+
+
+# 우선순위 점수 가중치
+ROI_PRIORITY = 100.0            # ROI 내부
+NEVER_ANALYZED_PRIORITY = 50.0  # 아직 분석 결과 없음 (경과 시간 점수의 상한)
+AGE_PRIORITY_PER_SECOND = 10.0  # 마지막 분석 이후 경과 시간 (초당)
+THRESHOLD_PRIORITY = 20.0       # 임계값 근처 (가까울수록 최대)
+
+
+class FaceAnalysisScheduler:
+    """
+    시간 예산 기반 얼굴 분석 스케줄러
+    
+    사용 순서 (검출 주기마다):
+        order = scheduler.plan(candidates, now)   # 우선순위 순서
+        for 후보 in order:
+            if not scheduler.fits(경과 시간, 분석 수): break   # 나머지는 다음 주기로
+            분석 → scheduler.record(key, result, now), scheduler.record_cost(소요 시간)
+        scheduler.end_cycle(분석 수, 후보 수, 경과 시간)
+    """
+    
+    def __init__(self, ear_threshold, sad_confidence, budget_ms=20.0, ear_margin=0.03,
+                 sad_margin=0.2, max_keys=64):
+        """
+        Args:
+            ear_threshold: 눈 감김 판단 EAR 임계값 (FaceAnalyzer.EAR_THRESHOLD와 같은 값)
+            sad_confidence: SAD 알림 신뢰도 임계값 (검출기의 sad_alert_confidence와 같은 값)
+            budget_ms: 검출 주기당 얼굴 분석 시간 예산 (ms)
+            ear_margin: EAR이 임계값 ± margin 안이면 임계값 근처로 판단
+            sad_margin: SAD 신뢰도가 임계값 ± margin 안이면 임계값 근처로 판단
+            max_keys: 상태를 유지할 최대 인원 (오래 보이지 않은 사람부터 삭제)
+        """
+        self.budget = budget_ms / 1000.0
+        self.ear_threshold = ear_threshold
+        self.ear_margin = ear_margin
+        self.sad_confidence = sad_confidence
+        self.sad_margin = sad_margin
+        self.max_keys = max_keys
+        
+        self.states = OrderedDict()  # key → (마지막 분석 시각, 마지막 결과)
+        self.cost_estimate = 0.0     # 분석 1회(모자이크는 1패스) 소요 시간 이동 평균 (초)
+        
+        # 통계
+        self.cycles = 0
+        self.analyzed = 0
+        self.deferred = 0
+        self.over_budget_cycles = 0
+        self._cycle_rotation = 0
+    
+    def priority(self, key, in_roi, now):
+        """후보 1명의 우선순위 점수 (높을수록 먼저 분석)"""
+        score = ROI_PRIORITY if in_roi else 0.0
+        
+        state = self.states.get(key)
+        if state is None:
+            return score + NEVER_ANALYZED_PRIORITY
+        
+        last_time, result = state
+        score += min(NEVER_ANALYZED_PRIORITY, max(0.0, now - last_time) * AGE_PRIORITY_PER_SECOND)
+        
+        if result:
+            # 눈 감김 임계값 근처
+            ear_distance = abs(result.get('ear', 1.0) - self.ear_threshold)
+            if ear_distance < self.ear_margin:
+                score += THRESHOLD_PRIORITY * (1.0 - ear_distance / self.ear_margin)
+            
+            # SAD 알림 임계값 근처
+            expression = result.get('expression')
+            if isinstance(expression, dict) and expression.get('expression') == 'sad':
+                sad_distance = abs(expression.get('confidence', 0) - self.sad_confidence)
+                if sad_distance < self.sad_margin:
+                    score += THRESHOLD_PRIORITY * (1.0 - sad_distance / self.sad_margin)
+        
+        return score
+    
+    def plan(self, candidates, now):
+        """
+        이번 주기 분석 순서
+        
+        Args:
+            candidates: [(key, ROI 내부 여부), ...]
+            now: 현재 시각
+        
+        Returns:
+            list: candidates 번호를 우선순위 순서로 정렬한 목록
+                  (점수가 같으면 주기마다 시작 위치를 돌려 같은 사람만 밀리지 않게 함)
+        """
+        count = len(candidates)
+        if count == 0:
+            return []
+        
+        rotation = self._cycle_rotation % count
+        self._cycle_rotation += 1
+        scores = [self.priority(key, in_roi, now) for key, in_roi in candidates]
+        return sorted(range(count), key=lambda i: (-scores[i], (i - rotation) % count))
+    
+    def fits(self, elapsed_seconds, analyzed):
+        """
+        예산 안에서 하나 더 분석할 수 있는지 (주기마다 최소 1회는 분석)
+        
+        Args:
+            elapsed_seconds: 이번 주기 얼굴 분석에 쓴 시간
+            analyzed: 이번 주기에 분석한 횟수
+        """
+        return analyzed == 0 or elapsed_seconds + self.cost_estimate <= self.budget
+    
+    def record(self, key, result, now):
+        """분석 결과 기록 (다음 주기 우선순위 계산용)"""
+        self.states[key] = (now, result)
+        self.states.move_to_end(key)
+        while len(self.states) > self.max_keys:
+            self.states.popitem(last=False)
+    
+    def record_cost(self, seconds):
+        """분석 1회 소요 시간 기록 (이동 평균)"""
+        if self.cost_estimate == 0.0:
+            self.cost_estimate = seconds
+        else:
+            self.cost_estimate = 0.8 * self.cost_estimate + 0.2 * seconds
+    
+    def end_cycle(self, analyzed, candidates, elapsed_seconds):
+        """주기 종료 (통계)"""
+        self.cycles += 1
+        self.analyzed += analyzed
+        self.deferred += candidates - analyzed
+        if elapsed_seconds > self.budget:
+            self.over_budget_cycles += 1
+    
+    def get_stats(self):
+        """스케줄러 통계"""
+        return {
+            'budget_ms': self.budget * 1000.0,
+            'cost_estimate_ms': self.cost_estimate * 1000.0,
+            'cycles': self.cycles,
+            'analyzed': self.analyzed,
+            'deferred': self.deferred,
+            'over_budget_cycles': self.over_budget_cycles
+        }
@@ -0,0 +1,339 @@
+"""
+얼굴 분석 워커 프로세스 풀
+- MediaPipe 추론 / HSV 마스크 검출 / 랜드마크 계산을 별도 프로세스에서 실행 (검출 스레드와 GIL 경쟁 없음)
+- 사람 크롭은 공유 메모리 슬롯으로 전달 (큐에는 슬롯 번호와 크기만)
+- submit()은 빈 슬롯이 없으면 바로 포기하고, 결과는 poll()로 비동기 수거 (검출 루프는 대기하지 않음)
+- 여러 검출기(카메라)가 풀 1개를 공유 (register()로 받은 owner별로 결과 분배)
+- 죽은 워커는 poll()에서 감지해 처리 중이던 슬롯을 회수하고 다시 시작
+
+같은 (owner, 키) 작업은 항상 같은 워커로 가고, 워커는 키마다 전용 FaceAnalyzer(FaceMesh 추적 상태 +
+EAR/MAR 평균 버퍼)를 LRU로 유지한다 (face_contexts와 같은 방식 - 여러 사람의 크롭이 한 FaceMesh에 섞이지 않음).
+키는 프레임 사이에 사람을 구분해야 하므로 트랙 ID를 사용한다 (트래킹 필수).
+"""
+
+import itertools
+import multiprocessing
+import queue
+import threading
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from face_analyzer import clip_bbox
+
+
+def compact_result(result):
+    """
+    워커 → 메인 프로세스로 보낼 분석 결과 (랜드마크 제외, 파이썬 기본 타입만)
+    """
+    if not result:
+        return None
+    return {
+        'face_detected': True,
+        'face_bbox': tuple(int(v) for v in result['face_bbox']),
+        'eyes_open': bool(result['eyes_open']),
+        'ear': result['ear'],
+        'mouth_state': result['mouth_state'],
+        'mar': result['mar'],
+        'expression': result['expression'],
+        'has_mask_or_ventilator': bool(result['has_mask_or_ventilator']),
+        'device_confidence': result['device_confidence'],
+        'num_faces': result['num_faces']
+    }
+
+
+def face_worker_main(shm_name, slots_shape, task_queue, result_queue, analyzer_config, max_contexts):
+    """
+    워커 프로세스 루프 (spawn으로 실행되므로 모듈 최상위 함수)
+    
+    작업: (seq, slot, key, height, width) - None이면 종료
+    결과: (seq, slot, compact_result 또는 None, 오류 메시지 또는 None)
+    
+    키마다 전용 FaceAnalyzer를 최대 max_contexts개 유지하고, 넘으면 가장 오래 사용하지 않은
+    분석기를 상태 초기화 후 새 키에 넘겨준다 (FaceMesh 재생성 없음).
+    """
+    from face_analyzer import FaceAnalyzer
+    
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slots = np.ndarray(slots_shape, dtype=np.uint8, buffer=shm.buf)
+    contexts = OrderedDict()  # 키 → FaceAnalyzer (오래된 순)
+    
+    try:
+        # 시작 시 1개 생성 (MediaPipe 초기화 실패를 바로 확인)
+        spare = FaceAnalyzer(analyzer_config)
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            
+            seq, slot, key, height, width = task
+            try:
+                analyzer = contexts.pop(key, None)
+                if analyzer is None:
+                    if spare is not None:
+                        analyzer, spare = spare, None
+                    elif len(contexts) >= max_contexts:
+                        _, analyzer = contexts.popitem(last=False)
+                        analyzer.reset()
+                    else:
+                        analyzer = FaceAnalyzer(analyzer_config)
+                contexts[key] = analyzer
+                
+                result = analyzer.analyze_face(slots[slot, :height, :width], None)
+                result_queue.put((seq, slot, compact_result(result), None))
+            except Exception as e:
+                result_queue.put((seq, slot, None, str(e)))
+    finally:
+        del slots
+        contexts.clear()
+        spare = None
+        shm.close()
+
+
+class FaceWorkerPool:
+    """
+    FaceAnalyzer 워커 프로세스 풀
+    
+    메인 프로세스에서만 submit()/poll()을 호출한다 (여러 검출 스레드에서 호출 가능, 내부 락).
+    검출기마다 register()로 owner를 받아 사용하고, 끝나면 unregister().
+    풀 사용이 모두 끝나면 close()로 워커 종료 + 공유 메모리 해제 (모델 레지스트리가 관리).
+    """
+    
+    def __init__(self, num_workers=2, slots_per_worker=2, max_crop_size=480, contexts_per_worker=4,
+                 start_method='spawn'):
+        """
+        Args:
+            num_workers: 워커 프로세스 수
+            slots_per_worker: 워커당 공유 메모리 슬롯 수 (동시에 처리 대기할 수 있는 크롭 수)
+            max_crop_size: 슬롯 한 변 크기 (더 큰 크롭은 비율 유지로 축소 - EAR/MAR은 비율이라 영향 없음)
+            contexts_per_worker: 워커당 유지할 키(트랙)별 FaceAnalyzer 최대 개수 (초과 시 LRU 재사용)
+            start_method: multiprocessing 시작 방식 (스레드가 있는 프로세스에서는 spawn 권장)
+        """
+        self.num_workers = max(1, int(num_workers))
+        self.max_crop_size = int(max_crop_size)
+        self.contexts_per_worker = max(1, int(contexts_per_worker))
+        slot_count = self.num_workers * max(1, int(slots_per_worker))
+        self.slots_shape = (slot_count, self.max_crop_size, self.max_crop_size, 3)
+        
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.slots_shape)))
+        self.slots = np.ndarray(self.slots_shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.free_slots = list(range(slot_count))
+        
+        self.lock = threading.Lock()
+        self.pending = {}          # seq → (owner, key, context, 크롭 원점, 축소 비율, 워커 번호, 슬롯)
+        self.pending_keys = set()  # 처리 중인 (owner, 키) (같은 사람 작업이 쌓이지 않도록)
+        self.ready = {}            # owner → 아직 수거하지 않은 결과 목록
+        self._seq = itertools.count()
+        self._owners = itertools.count()
+        self.closed = False
+        
+        # 통계
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.lost = 0
+        self.restarts = 0
+        
+        self.mp_context = multiprocessing.get_context(start_method)
+        self.result_queue = self.mp_context.Queue()
+        self.task_queues = [None] * self.num_workers
+        self.workers = [None] * self.num_workers
+        for index in range(self.num_workers):
+            self._start_worker(index)
+        
+        print(f"[FaceWorkerPool] 워커 {self.num_workers}개 시작 (슬롯 {slot_count}개, 최대 크롭 {self.max_crop_size}px, "
+              f"워커당 트랙 컨텍스트 {self.contexts_per_worker}개)")
+    
+    def _start_worker(self, index):
+        """워커 프로세스 시작 (재시작 시 이전 작업이 남은 큐는 버리고 새 큐 사용)"""
+        task_queue = self.mp_context.Queue()
+        worker = self.mp_context.Process(
+            target=face_worker_main,
+            args=(self.shm.name, self.slots_shape, task_queue, self.result_queue,
+                  {'face_mesh_max_faces': 1}, self.contexts_per_worker),
+            daemon=True
+        )
+        worker.start()
+        self.task_queues[index] = task_queue
+        self.workers[index] = worker
+    
+    def register(self):
+        """검출기 등록 (submit()/poll()에 사용할 owner 반환)"""
+        with self.lock:
+            owner = next(self._owners)
+            self.ready[owner] = []
+            return owner
+    
+    def unregister(self, owner):
+        """검출기 등록 해제 (아직 처리 중인 작업의 결과는 도착하면 버림)"""
+        with self.lock:
+            self.ready.pop(owner, None)
+    
+    def submit(self, owner, key, frame, person_bbox, context=None):
+        """
+        사람 크롭 분석 요청 (대기 없음)
+        
+        Args:
+            owner: register()로 받은 검출기 번호
+            key: 결과 식별 키 (트랙 ID, 같은 키는 같은 워커에서 처리)
+            frame: 전체 프레임
+            person_bbox: 사람 BBox (x1, y1, x2, y2)
+            context: poll() 결과에 그대로 돌려받을 값 (ROI, FrameInfo 등)
+        
+        Returns:
+            bool: 제출 여부 (빈 슬롯 없음 / 같은 키 처리 중 / 빈 크롭이면 False)
+        """
+        x1, y1, x2, y2 = clip_bbox(frame, person_bbox)
+        width, height = x2 - x1, y2 - y1
+        if width <= 0 or height <= 0:
+            return False
+        
+        worker_key = (owner, key)
+        with self.lock:
+            if self.closed or worker_key in self.pending_keys:
+                return False
+            if not self.free_slots:
+                self.dropped += 1
+                return False
+            
+            # 공유 메모리 슬롯에 크롭 복사 (슬롯보다 크면 축소)
+            slot = self.free_slots.pop()
+            crop = frame[y1:y2, x1:x2]
+            scale = min(1.0, self.max_crop_size / max(width, height))
+            if scale < 1.0:
+                width = max(1, min(self.max_crop_size, round(width * scale)))
+                height = max(1, min(self.max_crop_size, round(height * scale)))
+                self.slots[slot, :height, :width] = cv2.resize(crop, (width, height), interpolation=cv2.INTER_AREA)
+            else:
+                self.slots[slot, :height, :width] = crop
+            
+            seq = next(self._seq)
+            worker_index = hash(worker_key) % self.num_workers
+            self.pending[seq] = (owner, key, context, (x1, y1), scale, worker_index, slot)
+            self.pending_keys.add(worker_key)
+            self.task_queues[worker_index].put((seq, slot, worker_key, height, width))
+            self.submitted += 1
+            return True
+    
+    def _reclaim_dead_workers(self):
+        """
+        죽은 워커가 처리 중이던 슬롯/키 회수 후 워커 재시작 (락 안에서 호출)
+        
+        결과가 오지 않는 작업이 슬롯과 pending_keys를 계속 점유하면 해당 사람은 다시 제출되지 않는다.
+        """
+        for index, worker in enumerate(self.workers):
+            if worker.is_alive():
+                continue
+            
+            lost = [seq for seq, entry in self.pending.items() if entry[5] == index]
+            for seq in lost:
+                owner, key, _, _, _, _, slot = self.pending.pop(seq)
+                self.pending_keys.discard((owner, key))
+                self.free_slots.append(slot)
+            self.lost += len(lost)
+            self.restarts += 1
+            print(f"[FaceWorkerPool] ⚠️  워커 {index} 종료 감지 (exit {worker.exitcode}) - 작업 {len(lost)}개 회수 후 재시작")
+            
+            old_queue = self.task_queues[index]
+            old_queue.cancel_join_thread()
+            old_queue.close()
+            self._start_worker(index)
+    
+    def poll(self, owner):
+        """
+        도착한 결과 수거 (대기 없음)
+        
+        Args:
+            owner: register()로 받은 검출기 번호 (다른 검출기의 결과는 해당 검출기가 수거할 때까지 보관)
+        
+        Returns:
+            list: [(key, 분석 결과, context), ...] - 얼굴이 없으면 결과는 None,
+                  face_bbox는 원본 프레임 좌표
+        """
+        with self.lock:
+            if self.closed:
+                return []
+            
+            while True:
+                try:
+                    seq, slot, result, error = self.result_queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                # 워커 종료로 이미 회수한 작업이면 슬롯도 이미 반환됨
+                entry = self.pending.pop(seq, None)
+                if entry is None:
+                    continue
+                
+                result_owner, key, context, (x1, y1), scale, _, _ = entry
+                self.free_slots.append(slot)
+                self.pending_keys.discard((result_owner, key))
+                self.completed += 1
+                
+                if error:
+                    self.errors += 1
+                    print(f"[FaceWorkerPool] ⚠️  얼굴 분석 실패: {error}")
+                
+                # 크롭(축소) 좌표 → 원본 프레임 좌표
+                if result:
+                    fx1, fy1, fx2, fy2 = result['face_bbox']
+                    result['face_bbox'] = (
+                        x1 + int(fx1 / scale),
+                        y1 + int(fy1 / scale),
+                        x1 + int(fx2 / scale),
+                        y1 + int(fy2 / scale)
+                    )
+                
+                # 등록 해제된 검출기의 결과는 버림
+                if result_owner in self.ready:
+                    self.ready[result_owner].append((key, result, context))
+            
+            self._reclaim_dead_workers()
+            
+            completed = self.ready.get(owner, [])
+            if owner in self.ready:
+                self.ready[owner] = []
+            return completed
+    
+    def close(self, timeout=2.0):
+        """워커 종료 + 공유 메모리 해제"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=timeout)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join(timeout=timeout)
+        
+        for worker_queue in self.task_queues + [self.result_queue]:
+            worker_queue.cancel_join_thread()
+            worker_queue.close()
+        
+        del self.slots
+        self.shm.close()
+        self.shm.unlink()
+        print("[FaceWorkerPool] 종료")
+    
+    def get_stats(self):
+        """워커 풀 통계"""
+        with self.lock:
+            return {
+                'workers': self.num_workers,
+                'workers_alive': sum(worker.is_alive() for worker in self.workers),
+                'owners': len(self.ready),
+                'in_flight': len(self.pending),
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'lost': self.lost,
+                'restarts': self.restarts
+            }
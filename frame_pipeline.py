@@ -0,0 +1,448 @@
+"""
+프레임 파이프라인 유틸리티
+- 최신 프레임 슬롯 (Latest-frame slot, 시퀀스 번호 포함)
+- 카메라 캡처 전용 스레드 (FrameGrabber)
+- 비동기 추론 워커 (InferenceWorker)
+- 사전 할당 프레임 버퍼 풀 (FrameBufferPool, 참조 카운트)
+"""
+
+import time
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from clock import WallClock
+
+
+# 프레임 출처 정보 (캡처 시퀀스 번호, 캡처 시각) - 검출/이벤트까지 전달되어 지연 시간 추적에 사용
+FrameInfo = namedtuple('FrameInfo', ['seq', 'capture_time'])
+
+
+class PooledFrame:
+    """
+    프레임 버퍼 풀에서 빌린 버퍼 (참조 카운트)
+    
+    버퍼를 보관하는 쪽(슬롯/큐/워커)마다 retain()으로 참조를 얻고 다 쓰면 release()한다.
+    참조가 0이 되면 버퍼는 풀로 돌아가 다음 프레임에 재사용된다 (이후 array는 None).
+    pool이 None이면 일반 배열 래퍼로 동작한다 (retain/release 무시).
+    info에는 캡처 시점의 FrameInfo가 붙는다 (캡처 스레드/read_frame이 기록).
+    """
+    
+    __slots__ = ('array', 'pool', 'refs', 'info')
+    
+    def __init__(self, array, pool=None, info=None):
+        self.array = array
+        self.pool = pool
+        self.refs = 1
+        self.info = info
+    
+    def retain(self):
+        """참조 1개 추가"""
+        if self.pool is not None:
+            self.pool._retain(self)
+        return self
+    
+    def release(self):
+        """참조 1개 반환 (0이 되면 풀로 반환)"""
+        if self.pool is not None:
+            self.pool._release(self)
+
+
+class FrameBufferPool:
+    """
+    사전 할당 프레임 버퍼 풀
+    
+    캡처/시각화 프레임을 매번 새로 할당하는 대신 반환된 버퍼를 재사용한다.
+    (shape, dtype)별로 최대 capacity개의 여유 버퍼를 보관하며,
+    여유 버퍼가 없으면 새로 할당한다 (buffers_allocated로 집계 - 정상 상태에서는 증가하지 않음).
+    """
+    
+    def __init__(self, capacity=12, name='frames'):
+        """
+        Args:
+            capacity: (shape, dtype)별 보관할 최대 여유 버퍼 수
+            name: 로그용 이름
+        """
+        self.capacity = capacity
+        self.name = name
+        
+        self._lock = threading.Lock()
+        self._free = {}  # (shape, dtype) → [ndarray, ...]
+        self._read_shape = None  # read_from()이 마지막으로 읽은 프레임 크기
+        
+        self.buffers_allocated = 0
+        self.buffers_in_use = 0
+    
+    def acquire(self, shape, dtype=np.uint8):
+        """
+        버퍼 1개 빌리기 (내용은 초기화되지 않음)
+        
+        Returns:
+            PooledFrame: 참조 1개를 가진 버퍼
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            array = free.pop() if free else None
+            if array is None:
+                self.buffers_allocated += 1
+            self.buffers_in_use += 1
+        
+        if array is None:
+            array = np.empty(shape, dtype=dtype)
+        return PooledFrame(array, self)
+    
+    def copy_of(self, frame, info=None):
+        """frame(배열)을 풀 버퍼에 복사"""
+        buffer = self.acquire(frame.shape, frame.dtype)
+        np.copyto(buffer.array, frame)
+        buffer.info = info
+        return buffer
+    
+    def read_from(self, cap):
+        """
+        cap.read()를 풀 버퍼에 직접 디코딩
+        
+        첫 프레임이나 해상도가 바뀐 경우에만 OpenCV가 새로 할당한 프레임을 풀 버퍼로 복사한다.
+        
+        Returns:
+            PooledFrame 또는 None (읽기 실패)
+        """
+        buffer = self.acquire(self._read_shape) if self._read_shape else None
+        
+        if buffer is not None:
+            ret, frame = cap.read(buffer.array)
+        else:
+            ret, frame = cap.read()
+        
+        if not ret or frame is None:
+            if buffer is not None:
+                buffer.release()
+            return None
+        
+        if buffer is None or frame is not buffer.array:
+            if buffer is not None:
+                buffer.release()
+            self._read_shape = frame.shape
+            buffer = self.copy_of(frame)
+        
+        return buffer
+    
+    def _retain(self, buffer):
+        with self._lock:
+            if buffer.refs <= 0:
+                raise RuntimeError(f"[FrameBufferPool] {self.name}: 이미 반환된 버퍼입니다")
+            buffer.refs += 1
+    
+    def _release(self, buffer):
+        with self._lock:
+            if buffer.refs <= 0:
+                raise RuntimeError(f"[FrameBufferPool] {self.name}: 이미 반환된 버퍼입니다")
+            buffer.refs -= 1
+            if buffer.refs:
+                return
+            
+            self.buffers_in_use -= 1
+            array = buffer.array
+            buffer.array = None
+            free = self._free.setdefault((array.shape, array.dtype.str), [])
+            if len(free) < self.capacity:
+                free.append(array)
+    
+    def get_stats(self):
+        """풀 통계"""
+        with self._lock:
+            return {
+                'buffers_allocated': self.buffers_allocated,
+                'buffers_in_use': self.buffers_in_use,
+                'buffers_free': sum(len(free) for free in self._free.values())
+            }
+
+
+class LatestFrameSlot:
+    """
+    최신 프레임 1개만 보관하는 락 보호 슬롯
+    
+    캡처 스레드가 계속 덮어쓰고, 소비자(추론/렌더링)는 항상 가장 최근 프레임만 가져감.
+    시퀀스 번호로 소비자가 건너뛴(drop) 프레임 수를 계산할 수 있음.
+    
+    PooledFrame을 넣으면 슬롯이 생산자의 참조를 넘겨받고 (덮어쓸 때 release),
+    get()은 소비자 몫의 참조를 추가해서 반환한다 (소비자가 release).
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._frame = None
+        self._seq = 0
+        self._timestamp = None
+        self._closed = False
+    
+    def put(self, frame, timestamp=None):
+        """
+        새 프레임 저장 (이전 프레임은 덮어씀)
+        
+        Returns:
+            int: 저장된 프레임의 시퀀스 번호
+        """
+        with self._cond:
+            previous = self._frame
+            self._seq += 1
+            self._frame = frame
+            self._timestamp = timestamp if timestamp is not None else time.time()
+            self._cond.notify_all()
+            seq = self._seq
+        
+        # 덮어쓴 프레임 버퍼 반환
+        if isinstance(previous, PooledFrame):
+            previous.release()
+        return seq
+    
+    def get(self, after_seq=0, timeout=None):
+        """
+        after_seq 이후의 새 프레임을 기다려서 가져오기
+        
+        Args:
+            after_seq: 마지막으로 소비한 시퀀스 번호
+            timeout: 최대 대기 시간 (초, None이면 무한 대기)
+        
+        Returns:
+            tuple: (seq, timestamp, frame) 또는 None (타임아웃/슬롯 종료)
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._seq > after_seq or self._closed, timeout=timeout
+            ):
+                return None
+            if self._seq <= after_seq or self._frame is None:
+                return None
+            return self._seq, self._timestamp, self._retained_frame()
+    
+    def _retained_frame(self):
+        """소비자에게 넘길 프레임 (PooledFrame이면 참조 추가, 락 보유 상태에서 호출)"""
+        if isinstance(self._frame, PooledFrame):
+            return self._frame.retain()
+        return self._frame
+    
+    def close(self):
+        """슬롯 종료 - 대기 중인 소비자를 깨움"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+    
+    def clear(self):
+        """보관 중인 프레임 반환 (생산자/소비자 스레드가 모두 끝난 뒤 호출)"""
+        with self._cond:
+            frame = self._frame
+            self._frame = None
+        
+        if isinstance(frame, PooledFrame):
+            frame.release()
+    
+    @property
+    def closed(self):
+        return self._closed
+    
+    @property
+    def seq(self):
+        return self._seq
+
+
+class FrameGrabber:
+    """
+    카메라 소스별 전용 캡처 스레드
+    
+    cap.read()를 별도 스레드에서 계속 호출하여 카메라 내부 버퍼가 쌓이지 않게 하고,
+    가장 최신 프레임만 LatestFrameSlot에 보관한다.
+    buffer_pool이 주어지면 풀 버퍼에 직접 디코딩하고 슬롯에는 PooledFrame이 들어간다.
+    """
+    
+    def __init__(self, cap, name='camera', pace_fps=None, buffer_pool=None, stats=None, clock=None):
+        """
+        Args:
+            cap: 열린 cv2.VideoCapture 객체
+            name: 로그용 이름
+            pace_fps: 비디오 파일처럼 실시간이 아닌 소스의 재생 속도 제한 (None이면 제한 없음)
+            buffer_pool: 프레임 버퍼 풀 (None이면 cap.read()가 매 프레임 새로 할당)
+            stats: PipelineStats (프레임 읽기 시간을 'capture' 단계로 기록, None이면 기록 안 함)
+            clock: 캡처 시각을 매기는 시계 (None이면 WallClock)
+        """
+        self.cap = cap
+        self.name = name
+        self.pace_fps = pace_fps
+        self.buffer_pool = buffer_pool
+        self.stats = stats
+        self.clock = clock if clock is not None else WallClock()
+        self.slot = LatestFrameSlot()
+        
+        self.frames_captured = 0
+        self.read_failures = 0
+        
+        self.running = False
+        self.thread = None
+    
+    def start(self):
+        """캡처 스레드 시작"""
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+            print(f"[FrameGrabber] {self.name} 캡처 스레드 시작됨")
+    
+    def stop(self):
+        """캡처 스레드 중지 (슬롯에 남은 프레임 버퍼는 풀에 반환)"""
+        self.running = False
+        self.slot.close()
+        if self.thread:
+            self.thread.join(timeout=2)
+        self.slot.clear()
+    
+    def _run(self):
+        """캡처 루프"""
+        frame_period = 1.0 / self.pace_fps if self.pace_fps else 0
+        next_frame_time = time.time()
+        
+        while self.running:
+            read_start = time.perf_counter()
+            if self.buffer_pool is not None:
+                frame = self.buffer_pool.read_from(self.cap)
+            else:
+                ret, frame = self.cap.read()
+                if not ret:
+                    frame = None
+            
+            if frame is None:
+                self.read_failures += 1
+                print(f"[FrameGrabber] {self.name} 프레임 읽기 실패")
+                break
+            
+            if self.stats is not None:
+                self.stats.record('capture', time.perf_counter() - read_start)
+            
+            capture_time = self.clock.frame_timestamp(self.cap)
+            if isinstance(frame, PooledFrame):
+                frame.info = FrameInfo(self.slot.seq + 1, capture_time)
+            self.slot.put(frame, capture_time)
+            self.frames_captured += 1
+            
+            # 파일 소스는 원래 FPS로 재생 (실시간 카메라는 cap.read()가 자체적으로 블로킹)
+            if frame_period:
+                next_frame_time += frame_period
+                delay = next_frame_time - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_frame_time = time.time()
+        
+        self.running = False
+        self.slot.close()
+        print(f"[FrameGrabber] {self.name} 캡처 종료 ({self.frames_captured} 프레임)")
+
+
+class InferenceWorker:
+    """
+    추론 전용 워커 스레드
+    
+    렌더링 루프가 submit()으로 프레임을 넘기면 워커가 handler(frame, timestamp, frame_info)를 실행하고
+    타임스탬프가 붙은 결과를 게시한다. 워커가 바쁜 동안 들어온 프레임은 최신 것만 남는다.
+    PooledFrame을 넘기면 워커가 참조를 넘겨받고, handler에는 배열(frame.array)과 frame.info,
+    PooledFrame 자체가 전달된다 (handler 실행 후 반환 - 더 보관하려면 handler가 retain()).
+    """
+    
+    def __init__(self, handler, name='inference'):
+        """
+        Args:
+            handler: handler(frame, timestamp, frame_info, pooled_frame) -> result 형태의 추론 함수
+                     (frame_info: PooledFrame.info, pooled_frame: 넘긴 PooledFrame - 일반 배열이면 둘 다 None)
+            name: 로그용 이름
+        """
+        self.handler = handler
+        self.name = name
+        self.slot = LatestFrameSlot()
+        
+        self._result_lock = threading.Lock()
+        self._latest_result = None
+        self.results_published = 0
+        self.frames_skipped = 0
+        
+        self.running = False
+        self.thread = None
+    
+    def start(self):
+        """워커 스레드 시작"""
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+            print(f"[InferenceWorker] {self.name} 워커 시작됨")
+    
+    def stop(self):
+        """워커 스레드 중지 (처리하지 못한 프레임 버퍼는 풀에 반환)"""
+        self.running = False
+        self.slot.close()
+        if self.thread:
+            self.thread.join(timeout=5)
+        self.slot.clear()
+    
+    def submit(self, frame, timestamp=None):
+        """
+        추론할 프레임 전달 (논블로킹)
+        
+        Returns:
+            int: 프레임 시퀀스 번호
+        """
+        return self.slot.put(frame, timestamp)
+    
+    def latest_result(self):
+        """
+        가장 최근 게시된 결과 (논블로킹)
+        
+        Returns:
+            dict 또는 None: {'seq', 'frame_timestamp', 'completed_at', 'inference_seconds', 'result'}
+        """
+        with self._result_lock:
+            return self._latest_result
+    
+    def _run(self):
+        """워커 루프"""
+        last_seq = 0
+        
+        while self.running:
+            item = self.slot.get(last_seq, timeout=0.5)
+            if item is None:
+                if self.slot.closed:
+                    break
+                continue
+            
+            seq, timestamp, frame = item
+            if last_seq:
+                self.frames_skipped += seq - last_seq - 1
+            last_seq = seq
+            
+            if isinstance(frame, PooledFrame):
+                image, frame_info, pooled_frame = frame.array, frame.info, frame
+            else:
+                image, frame_info, pooled_frame = frame, None, None
+            
+            start_time = time.time()
+            try:
+                result = self.handler(image, timestamp, frame_info, pooled_frame)
+            except Exception as e:
+                print(f"[InferenceWorker] ⚠️  {self.name} 추론 실패: {e}")
+                continue
+            finally:
+                if isinstance(frame, PooledFrame):
+                    frame.release()
+            completed_at = time.time()
+            
+            with self._result_lock:
+                self._latest_result = {
+                    'seq': seq,
+                    'frame_timestamp': timestamp,
+                    'completed_at': completed_at,
+                    'inference_seconds': completed_at - start_time,
+                    'result': result
+                }
+            self.results_published += 1
+        
+        print(f"[InferenceWorker] {self.name} 워커 종료 ({self.results_published}회 추론)")
@@ -0,0 +1,516 @@
+"""
+YOLO 추론 백엔드
+- ultralytics: PyTorch 모델 (.pt, 기본 - GPU/Jetson)
+- onnxruntime: ONNX로 내보낸 모델 (.onnx - GPU 없는 CPU 엣지 장비)
+- openvino: OpenVINO IR로 내보낸 모델 (.xml 또는 *_openvino_model 디렉토리 - Intel CPU)
+
+모든 백엔드는 입력 이미지 좌표로
+- detect(images): 이미지별 원시 검출 배열 (N, 6) [x1, y1, x2, y2, conf, cls] (전체 클래스)
+- detect_persons(images, ...): 이미지별 사람 검출 배열 (N, 5) [x1, y1, x2, y2, conf]
+  (NMS 전에 사람 클래스/신뢰도로 제한 - 검출기가 사용하는 경로)
+를 반환한다 (ROI 판정/트래킹은 백엔드와 무관).
+
+모델 내보내기:
+    yolo export model=yolov8n.pt format=onnx
+    yolo export model=yolov8n.pt format=openvino
+
+INT8 모델 (model_precision: int8, onnxruntime 전용):
+    python quantize_model.py quantize --model yolov8n.onnx --calibration recording.mp4
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from detection_utils import decode_boxes, decode_person_boxes, empty_detections, empty_raw_detections
+
+# 백엔드 런타임 임포트 (모두 선택적 - 사용하는 백엔드만 설치하면 됨)
+try:
+    from ultralytics import YOLO
+    ULTRALYTICS_AVAILABLE = True
+except ImportError:
+    ULTRALYTICS_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    import openvino as ov
+    OPENVINO_AVAILABLE = True
+except ImportError:
+    OPENVINO_AVAILABLE = False
+
+
+INFERENCE_BACKENDS = ('ultralytics', 'onnxruntime', 'openvino')
+MODEL_PRECISIONS = ('fp32', 'int8')
+
+# 레터박스 여백 색 (ultralytics 전처리와 동일)
+LETTERBOX_FILL = 114
+
+
+def default_num_threads():
+    """추론 스레드 기본값 (캡처/ROI 처리용으로 코어 1개 남김)"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def quantized_model_path(model_path):
+    """FP32 모델 경로 → 기본 INT8 모델 경로 (yolov8n.pt / yolov8n.onnx → yolov8n_int8.onnx)"""
+    model_path = Path(model_path)
+    return str(model_path.with_name(f"{model_path.stem}_int8.onnx"))
+
+
+def resolve_model_path(config):
+    """
+    실제로 로드할 모델 경로
+    
+    model_precision이 'int8'이면 yolo_model_int8 (없으면 yolo_model 옆의 *_int8.onnx)
+    """
+    precision = config.get('model_precision', 'fp32')
+    if precision not in MODEL_PRECISIONS:
+        raise ValueError(f"지원하지 않는 model_precision: {precision} (가능: {', '.join(MODEL_PRECISIONS)})")
+    
+    model_path = config.get('yolo_model', 'yolov8n.pt')
+    if precision == 'int8':
+        return config.get('yolo_model_int8') or quantized_model_path(model_path)
+    return model_path
+
+
+def resolve_backend_name(config):
+    """
+    사용할 백엔드 이름 결정
+    
+    inference_backend가 'auto'(기본)면 모델 경로로 판단한다.
+    INT8 모델(model_precision: int8)은 onnxruntime 백엔드만 지원한다.
+    """
+    name = config.get('inference_backend', 'auto')
+    model_path = str(resolve_model_path(config)).lower().rstrip('/\\')
+    if name == 'auto':
+        if model_path.endswith('.onnx'):
+            name = 'onnxruntime'
+        elif model_path.endswith('.xml') or model_path.endswith('_openvino_model'):
+            name = 'openvino'
+        else:
+            name = 'ultralytics'
+    
+    if name not in INFERENCE_BACKENDS:
+        raise ValueError(f"지원하지 않는 inference_backend: {name} (가능: auto, {', '.join(INFERENCE_BACKENDS)})")
+    if config.get('model_precision', 'fp32') == 'int8' and name != 'onnxruntime':
+        raise ValueError(f"model_precision int8은 onnxruntime 백엔드만 지원합니다 (현재: {name}, 모델: {model_path})")
+    return name
+
+
+def create_backend(config, model=None):
+    """
+    설정에 맞는 추론 백엔드 생성
+    
+    Args:
+        config: 설정 딕셔너리 (yolo_model, inference_backend, inference_threads 등)
+        model: 이미 로드된 모델 (InferenceBackend면 그대로 공유, ultralytics 호환 모델이면 감싸서 사용)
+    
+    Returns:
+        InferenceBackend
+    """
+    if isinstance(model, InferenceBackend):
+        return model
+    if model is not None:
+        return UltralyticsBackend(config, model=model)
+    
+    name = resolve_backend_name(config)
+    if name == 'onnxruntime':
+        return OnnxRuntimeBackend(config)
+    if name == 'openvino':
+        return OpenVINOBackend(config)
+    return UltralyticsBackend(config)
+
+
+class InferenceBackend:
+    """추론 백엔드 공통 인터페이스"""
+    
+    name = 'base'
+    
+    def __init__(self, config):
+        """
+        Args:
+            config: 설정 딕셔너리
+        """
+        self.model_path = resolve_model_path(config)
+        self.precision = config.get('model_precision', 'fp32')
+        self.num_threads = config.get('inference_threads') or default_num_threads()
+        self.warmup_runs = config.get('inference_warmup_runs', 1)
+        
+        # 여러 검출기가 백엔드를 공유할 수 있으므로 추론은 한 번에 하나씩 (입력 텐서 재사용)
+        self._lock = threading.Lock()
+    
+    def detect(self, images):
+        """
+        이미지 리스트 추론
+        
+        Args:
+            images: BGR 이미지 리스트 (크기가 서로 달라도 됨)
+        
+        Returns:
+            list: 이미지별 (N, 6) float32 배열 [x1, y1, x2, y2, conf, cls] (입력 이미지 좌표)
+        """
+        with self._lock:
+            return self._detect(images)
+    
+    def _detect(self, images):
+        """백엔드별 추론 구현 (detect()가 락을 잡은 상태로 호출)"""
+        raise NotImplementedError
+    
+    def detect_persons(self, images, confidence_threshold=0.5, person_class_id=0):
+        """
+        사람 클래스만 추론
+        
+        NMS 전에 사람 클래스와 신뢰도로 후보를 제한하고, 전체 클래스 결과를 만들지 않고
+        사람 검출 배열을 바로 반환한다.
+        
+        Args:
+            images: BGR 이미지 리스트
+            confidence_threshold: 신뢰도 임계값
+            person_class_id: 사람 클래스 ID (COCO = 0)
+        
+        Returns:
+            list: 이미지별 (N, 5) float32 배열 [x1, y1, x2, y2, conf] (입력 이미지 좌표)
+        """
+        with self._lock:
+            return self._detect_persons(images, confidence_threshold, person_class_id)
+    
+    def _detect_persons(self, images, confidence_threshold, person_class_id):
+        """백엔드별 사람 전용 추론 구현 (detect_persons()가 락을 잡은 상태로 호출)"""
+        raise NotImplementedError
+    
+    def warmup(self, image_size=(640, 640)):
+        """첫 추론 지연 (메모리 할당/커널 선택) 제거용 더미 추론"""
+        if self.warmup_runs <= 0:
+            return
+        width, height = image_size
+        dummy = np.full((height, width, 3), LETTERBOX_FILL, dtype=np.uint8)
+        for _ in range(self.warmup_runs):
+            self.detect([dummy])
+        print(f"[{self.__class__.__name__}] 워밍업 완료 ({self.warmup_runs}회)")
+
+
+class UltralyticsBackend(InferenceBackend):
+    """ultralytics YOLO (PyTorch) 백엔드"""
+    
+    name = 'ultralytics'
+    
+    def __init__(self, config, model=None):
+        """
+        Args:
+            config: 설정 딕셔너리
+            model: 이미 로드된 ultralytics 호환 모델 (None이면 yolo_model을 로드하고 워밍업)
+        """
+        super().__init__(config)
+        
+        if model is not None:
+            self.model = model
+            return
+        
+        if not ULTRALYTICS_AVAILABLE:
+            raise ImportError("ultralytics is required. Install: pip install ultralytics")
+        
+        # PyTorch CPU 스레드 수 (명시한 경우에만 - GPU 사용 시에는 의미 없음)
+        if config.get('inference_threads'):
+            import torch
+            torch.set_num_threads(self.num_threads)
+        
+        print(f"[UltralyticsBackend] YOLO 모델 로딩: {self.model_path}")
+        self.model = YOLO(self.model_path)
+        self.warmup()
+    
+    def predict(self, images, **kwargs):
+        """YOLO 추론 → ultralytics Results 리스트 (kwargs는 모델 호출 인자)"""
+        # NumPy 배열을 명시적으로 contiguous하게 변환 (크롭 뷰 등)
+        inputs = [np.ascontiguousarray(image) for image in images]
+        source = inputs[0] if len(inputs) == 1 else inputs
+        
+        # YOLO 추론 (NumPy 호환성 개선)
+        try:
+            return self.model(source, verbose=False, **kwargs)
+        except RuntimeError as e:
+            print(f"[UltralyticsBackend] ⚠️  YOLO 추론 실패: {e}")
+            # 프레임을 복사하여 재시도
+            source = inputs[0].copy() if len(inputs) == 1 else [image.copy() for image in inputs]
+            return self.model(source, verbose=False, **kwargs)
+    
+    def _detect(self, images):
+        return [decode_boxes(result) for result in self.predict(images)]
+    
+    def _detect_persons(self, images, confidence_threshold, person_class_id):
+        # classes/conf로 NMS 전에 후보 제한 → 결과당 boxes.data 1회 변환
+        results = self.predict(images, classes=[person_class_id], conf=confidence_threshold)
+        return [decode_person_boxes(result, person_class_id, confidence_threshold) for result in results]
+
+
+class LetterboxBackend(InferenceBackend):
+    """
+    내보낸 YOLO 모델 (ONNX/OpenVINO) 공통 전처리/후처리
+    
+    - 전처리: 레터박스 리사이즈 → RGB → NCHW float32 (0~1), 입력 텐서는 시작 시 1회 할당 후 재사용
+    - 후처리: YOLOv8/11 출력 (1, 4 + 클래스 수, 앵커 수) 디코딩 + NMS
+    """
+    
+    def __init__(self, config):
+        super().__init__(config)
+        self.min_confidence = config.get('inference_min_confidence', 0.25)
+        self.nms_iou_threshold = config.get('nms_iou_threshold', 0.7)
+        self.max_detections = config.get('max_detections', 300)
+        self.default_imgsz = config.get('inference_imgsz', 640)
+        
+        self.input_tensor = None
+        self._canvas = None
+        self._letterbox_key = None
+        self._letterbox = None
+    
+    def allocate_input(self, shape):
+        """
+        모델 입력 형태에 맞게 입력 텐서/레터박스 캔버스 할당
+        
+        Args:
+            shape: 모델 입력 형태 [N, 3, H, W] (동적 차원은 inference_imgsz 사용)
+        """
+        height, width = (
+            dim if isinstance(dim, int) and dim > 0 else self.default_imgsz
+            for dim in list(shape)[2:4]
+        )
+        self.input_size = (width, height)
+        self.input_tensor = np.zeros((1, 3, height, width), dtype=np.float32)
+        self._canvas = np.full((height, width, 3), LETTERBOX_FILL, dtype=np.uint8)
+        self._letterbox_key = None
+    
+    def preprocess(self, image):
+        """
+        이미지를 입력 텐서에 레터박스로 채움 (새 배열 할당 없음)
+        
+        Returns:
+            tuple: (scale, pad_x, pad_y) - 출력 좌표 → 입력 이미지 좌표 변환용
+        """
+        image_height, image_width = image.shape[:2]
+        
+        # 입력 이미지 크기가 바뀔 때만 레터박스 배치 계산 + 여백 다시 채움
+        if self._letterbox_key != (image_width, image_height):
+            input_width, input_height = self.input_size
+            scale = min(input_width / image_width, input_height / image_height)
+            resized_width = max(1, int(round(image_width * scale)))
+            resized_height = max(1, int(round(image_height * scale)))
+            pad_x = (input_width - resized_width) // 2
+            pad_y = (input_height - resized_height) // 2
+            
+            self._canvas[:] = LETTERBOX_FILL
+            self._letterbox = (scale, pad_x, pad_y, resized_width, resized_height)
+            self._letterbox_key = (image_width, image_height)
+        
+        scale, pad_x, pad_y, resized_width, resized_height = self._letterbox
+        target = self._canvas[pad_y:pad_y + resized_height, pad_x:pad_x + resized_width]
+        cv2.resize(image, (resized_width, resized_height), dst=target, interpolation=cv2.INTER_LINEAR)
+        
+        # HWC BGR uint8 → NCHW RGB float32 (0~1)
+        np.multiply(self._canvas[:, :, ::-1].transpose(2, 0, 1), np.float32(1.0 / 255.0),
+                    out=self.input_tensor[0])
+        return scale, pad_x, pad_y
+    
+    def postprocess(self, output, letterbox, image_shape):
+        """
+        YOLO 출력 → 원시 검출 배열 (입력 이미지 좌표)
+        
+        Args:
+            output: 모델 출력 (1, 4 + 클래스 수, 앵커 수) [cx, cy, w, h, 클래스별 점수...]
+            letterbox: preprocess() 반환값 (scale, pad_x, pad_y)
+            image_shape: 입력 이미지 shape
+        
+        Returns:
+            numpy.ndarray: (N, 6) float32 배열 [x1, y1, x2, y2, conf, cls]
+        """
+        predictions = output[0]
+        if predictions.shape[0] > predictions.shape[1]:
+            predictions = predictions.T  # (앵커 수, 4 + 클래스 수)로 내보낸 모델
+        
+        class_scores = predictions[4:]
+        class_ids = class_scores.argmax(axis=0)
+        scores = class_scores.max(axis=0)
+        
+        candidates = np.flatnonzero(scores >= self.min_confidence)
+        if not len(candidates):
+            return empty_raw_detections()
+        
+        boxes_xywh = self.candidate_boxes(predictions, candidates)
+        scores = scores[candidates]
+        class_ids = class_ids[candidates]
+        
+        # 클래스별 NMS
+        keep = cv2.dnn.NMSBoxesBatched(
+            boxes_xywh.tolist(), scores.tolist(), class_ids.tolist(),
+            self.min_confidence, self.nms_iou_threshold
+        )
+        keep = np.asarray(keep, dtype=np.int64).reshape(-1)[:self.max_detections]
+        
+        raw = np.empty((len(keep), 6), dtype=np.float32)
+        self.to_image_coordinates(boxes_xywh[keep], letterbox, image_shape, out=raw[:, :4])
+        raw[:, 4] = scores[keep]
+        raw[:, 5] = class_ids[keep]
+        return raw
+    
+    def postprocess_persons(self, output, letterbox, image_shape, confidence_threshold, person_class_id):
+        """
+        YOLO 출력 → 사람 검출 배열 (사람 점수 행으로 후보를 고른 뒤 후보만 클래스 판정)
+        
+        사람 클래스 점수 1행으로 임계값 후보를 고르고, 후보 중 최고 점수 클래스가 사람인 앵커만 남겨
+        단일 클래스 NMS를 실행한다 (ultralytics classes=[사람]과 같은 판정, 전체 앵커 argmax 없음).
+        
+        Returns:
+            numpy.ndarray: (N, 5) float32 배열 [x1, y1, x2, y2, conf]
+        """
+        predictions = output[0]
+        if predictions.shape[0] > predictions.shape[1]:
+            predictions = predictions.T  # (앵커 수, 4 + 클래스 수)로 내보낸 모델
+        
+        person_scores = predictions[4 + person_class_id]
+        candidates = np.flatnonzero(person_scores >= confidence_threshold)
+        if len(candidates):
+            # 다른 클래스 점수가 더 높은 박스는 그 클래스로 판정되므로 제외
+            candidates = candidates[predictions[4:, candidates].argmax(axis=0) == person_class_id]
+        if not len(candidates):
+            return empty_detections()
+        
+        boxes_xywh = self.candidate_boxes(predictions, candidates)
+        scores = person_scores[candidates]
+        
+        keep = cv2.dnn.NMSBoxes(
+            boxes_xywh.tolist(), scores.tolist(), confidence_threshold, self.nms_iou_threshold
+        )
+        keep = np.asarray(keep, dtype=np.int64).reshape(-1)[:self.max_detections]
+        
+        detections = np.empty((len(keep), 5), dtype=np.float32)
+        self.to_image_coordinates(boxes_xywh[keep], letterbox, image_shape, out=detections[:, :4])
+        detections[:, 4] = scores[keep]
+        return detections
+    
+    @staticmethod
+    def candidate_boxes(predictions, candidates):
+        """후보 앵커의 [cx, cy, w, h] → [x, y, w, h] (OpenCV NMS 입력 형식)"""
+        cx, cy, w, h = predictions[:4, candidates]
+        return np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+    
+    @staticmethod
+    def to_image_coordinates(boxes_xywh, letterbox, image_shape, out):
+        """레터박스 [x, y, w, h] → 입력 이미지 [x1, y1, x2, y2] (out에 기록)"""
+        scale, pad_x, pad_y = letterbox
+        image_height, image_width = image_shape[:2]
+        out[:, 0] = (boxes_xywh[:, 0] - pad_x) / scale
+        out[:, 1] = (boxes_xywh[:, 1] - pad_y) / scale
+        out[:, 2] = out[:, 0] + boxes_xywh[:, 2] / scale
+        out[:, 3] = out[:, 1] + boxes_xywh[:, 3] / scale
+        np.clip(out[:, 0::2], 0, image_width, out=out[:, 0::2])
+        np.clip(out[:, 1::2], 0, image_height, out=out[:, 1::2])
+    
+    def run(self):
+        """입력 텐서로 추론 1회 → 출력 배열"""
+        raise NotImplementedError
+    
+    def _detect(self, images):
+        # 입력 텐서가 배치 1로 고정되어 있으므로 이미지별로 순차 추론
+        detections = []
+        for image in images:
+            letterbox = self.preprocess(image)
+            detections.append(self.postprocess(self.run(), letterbox, image.shape))
+        return detections
+    
+    def _detect_persons(self, images, confidence_threshold, person_class_id):
+        detections = []
+        for image in images:
+            letterbox = self.preprocess(image)
+            detections.append(self.postprocess_persons(
+                self.run(), letterbox, image.shape, confidence_threshold, person_class_id
+            ))
+        return detections
+
+
+class OnnxRuntimeBackend(LetterboxBackend):
+    """ONNX Runtime CPU 백엔드"""
+    
+    name = 'onnxruntime'
+    
+    def __init__(self, config):
+        super().__init__(config)
+        
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("onnxruntime is required. Install: pip install onnxruntime")
+        
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        
+        if self.precision == 'int8' and not Path(self.model_path).exists():
+            raise FileNotFoundError(
+                f"INT8 모델이 없습니다: {self.model_path} "
+                f"(python quantize_model.py quantize --model <FP32 모델> --calibration <녹화 영상>)"
+            )
+        
+        print(f"[OnnxRuntimeBackend] ONNX 모델 로딩: {self.model_path} ({self.precision.upper()}, 스레드 {self.num_threads})")
+        self.session = ort.InferenceSession(
+            str(self.model_path), sess_options=options, providers=['CPUExecutionProvider']
+        )
+        
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.allocate_input(model_input.shape)
+        
+        # 입력 텐서 메모리를 세션에 바인딩 (추론마다 입력 복사/할당 없음)
+        self.io_binding = self.session.io_binding()
+        self.io_binding.bind_ortvalue_input(model_input.name, ort.OrtValue.ortvalue_from_numpy(self.input_tensor))
+        self.io_binding.bind_output(self.session.get_outputs()[0].name, 'cpu')
+        
+        self.warmup(self.input_size)
+    
+    def run(self):
+        self.session.run_with_iobinding(self.io_binding)
+        return self.io_binding.get_outputs()[0].numpy()
+
+
+class OpenVINOBackend(LetterboxBackend):
+    """OpenVINO CPU 백엔드"""
+    
+    name = 'openvino'
+    
+    def __init__(self, config):
+        super().__init__(config)
+        
+        if not OPENVINO_AVAILABLE:
+            raise ImportError("openvino is required. Install: pip install openvino")
+        
+        # ultralytics 내보내기 결과 디렉토리 (yolov8n_openvino_model/) → 내부 .xml
+        model_path = Path(self.model_path)
+        if model_path.is_dir():
+            model_path = next(model_path.glob('*.xml'))
+        
+        print(f"[OpenVINOBackend] OpenVINO 모델 로딩: {model_path} (스레드 {self.num_threads})")
+        core = ov.Core()
+        model = core.read_model(str(model_path))
+        if model.input(0).get_partial_shape().is_dynamic:
+            model.reshape([1, 3, self.default_imgsz, self.default_imgsz])
+        
+        self.compiled_model = core.compile_model(model, 'CPU', {
+            'INFERENCE_NUM_THREADS': self.num_threads,
+            'PERFORMANCE_HINT': 'LATENCY'
+        })
+        self.allocate_input(list(self.compiled_model.input(0).get_shape()))
+        
+        # 입력 텐서 메모리를 추론 요청에 공유 (추론마다 입력 복사/할당 없음)
+        self.infer_request = self.compiled_model.create_infer_request()
+        self.infer_request.set_input_tensor(ov.Tensor(self.input_tensor, shared_memory=True))
+        
+        self.warmup(self.input_size)
+    
+    def run(self):
+        self.infer_request.infer()
+        return self.infer_request.get_output_tensor(0).data
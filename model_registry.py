@@ -0,0 +1,189 @@
+"""
+프로세스 전역 모델 레지스트리
+- 추론 백엔드: (백엔드, 모델 경로, 백엔드 옵션) 키로 프로세스당 1회 로드 + 워밍업 후 검출기끼리 공유
+- FaceAnalyzer: MediaPipe FaceMesh는 스트림별 추적 상태가 있으므로 공유 대신 대여/반납
+  (검출기 중지/트랙 소멸 시 반납된 인스턴스를 다음 검출기/트랙이 재사용)
+- FaceWorkerPool: 얼굴 분석 워커 프로세스 풀은 (워커 수, 최대 크롭) 키로 검출기끼리 공유
+  (카메라 수만큼 워커 프로세스가 늘어나지 않도록, 마지막 검출기가 반납하면 종료)
+
+Streamlit에서 ROI 수정 후 검출을 다시 시작하거나 서비스가 SIGHUP으로 재시작할 때
+모델 로딩/워밍업 없이 바로 시작된다.
+"""
+
+import threading
+
+from inference_backends import create_backend, resolve_backend_name
+
+# 얼굴 분석기 임포트 (선택적)
+try:
+    from face_analyzer import FaceAnalyzer
+    from face_worker_pool import FaceWorkerPool
+    FACE_ANALYZER_AVAILABLE = True
+except ImportError:
+    FACE_ANALYZER_AVAILABLE = False
+
+
+# 추론 백엔드를 구분하는 설정 키 (같은 값이면 같은 백엔드 인스턴스 공유)
+BACKEND_OPTION_KEYS = (
+    'yolo_model',
+    'model_precision',
+    'yolo_model_int8',
+    'inference_threads',
+    'inference_imgsz',
+    'inference_warmup_runs',
+    'inference_min_confidence',
+    'nms_iou_threshold',
+    'max_detections',
+)
+
+
+class ModelRegistry:
+    """
+    추론 백엔드 / FaceAnalyzer / 얼굴 분석 워커 풀 캐시
+    
+    백엔드는 detect() 내부 락으로 동시 호출이 직렬화되므로 여러 검출기가 같은 인스턴스를 써도 된다.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._backends = {}
+        self._idle_face_analyzers = {}  # (max_num_faces, 정지 이미지 모드) → 반납된 FaceAnalyzer 리스트
+        self._face_worker_pools = {}    # (워커 수, 최대 크롭, 워커당 컨텍스트) → [FaceWorkerPool, 사용 중인 검출기 수]
+        
+        # 통계
+        self.backend_loads = 0
+        self.backend_reuses = 0
+        self.face_analyzer_loads = 0
+        self.face_analyzer_reuses = 0
+    
+    @staticmethod
+    def backend_key(config):
+        """설정 → 백엔드 캐시 키"""
+        return (resolve_backend_name(config),) + tuple(config.get(key) for key in BACKEND_OPTION_KEYS)
+    
+    def get_backend(self, config):
+        """
+        설정에 맞는 추론 백엔드 (처음 요청 시 로드 + 워밍업, 이후 같은 인스턴스 반환)
+        
+        Args:
+            config: 설정 딕셔너리 (yolo_model, inference_backend, inference_threads 등)
+        
+        Returns:
+            InferenceBackend
+        """
+        key = self.backend_key(config)
+        
+        # 같은 모델을 두 번 로드하지 않도록 로딩도 락 안에서 수행 (프로세스당 1회)
+        with self._lock:
+            backend = self._backends.get(key)
+            if backend is None:
+                backend = create_backend(config)
+                self._backends[key] = backend
+                self.backend_loads += 1
+            else:
+                self.backend_reuses += 1
+                print(f"[ModelRegistry] ♻️  추론 백엔드 재사용: {backend.name} ({backend.model_path})")
+        return backend
+    
+    def acquire_face_analyzer(self, max_num_faces=3, static_image_mode=False):
+        """
+        FaceAnalyzer 대여 (반납된 인스턴스가 있으면 상태 초기화 후 재사용)
+        
+        Args:
+            max_num_faces: FaceMesh 최대 얼굴 수 (트랙별 컨텍스트는 1)
+            static_image_mode: FaceMesh 정지 이미지 모드 (모자이크 분석용 - 호출마다 얼굴 검출)
+        
+        Returns:
+            FaceAnalyzer - 사용이 끝나면 release_face_analyzer()로 반납
+        """
+        if not FACE_ANALYZER_AVAILABLE:
+            raise ImportError("face_analyzer module (MediaPipe) is not available")
+        
+        with self._lock:
+            idle = self._idle_face_analyzers.get((max_num_faces, static_image_mode))
+            analyzer = idle.pop() if idle else None
+            if analyzer is not None:
+                self.face_analyzer_reuses += 1
+        
+        if analyzer is None:
+            analyzer = FaceAnalyzer({
+                'face_mesh_max_faces': max_num_faces,
+                'face_mesh_static_image': static_image_mode
+            })
+            with self._lock:
+                self.face_analyzer_loads += 1
+        else:
+            analyzer.reset()
+        return analyzer
+    
+    def release_face_analyzer(self, analyzer):
+        """FaceAnalyzer 반납 (다른 스레드에서 더 이상 사용하지 않을 때만 호출)"""
+        if analyzer is None:
+            return
+        with self._lock:
+            idle = self._idle_face_analyzers.setdefault((analyzer.max_num_faces, analyzer.static_image_mode), [])
+            if all(analyzer is not other for other in idle):
+                idle.append(analyzer)
+    
+    def acquire_face_worker_pool(self, num_workers=2, max_crop_size=480, contexts_per_worker=4):
+        """
+        얼굴 분석 워커 풀 대여 (같은 설정이면 이미 실행 중인 풀 공유)
+        
+        Args:
+            num_workers: 워커 프로세스 수
+            max_crop_size: 공유 메모리 슬롯 한 변 크기
+            contexts_per_worker: 워커당 트랙별 FaceAnalyzer 최대 개수
+        
+        Returns:
+            FaceWorkerPool - 사용이 끝나면 release_face_worker_pool()로 반납
+        """
+        if not FACE_ANALYZER_AVAILABLE:
+            raise ImportError("face_analyzer module (MediaPipe) is not available")
+        
+        key = (int(num_workers), int(max_crop_size), int(contexts_per_worker))
+        with self._lock:
+            entry = self._face_worker_pools.get(key)
+            if entry is None:
+                entry = [FaceWorkerPool(num_workers=key[0], max_crop_size=key[1], contexts_per_worker=key[2]), 0]
+                self._face_worker_pools[key] = entry
+            else:
+                print(f"[ModelRegistry] ♻️  얼굴 분석 워커 풀 공유 (워커 {key[0]}개)")
+            entry[1] += 1
+            return entry[0]
+    
+    def release_face_worker_pool(self, pool):
+        """얼굴 분석 워커 풀 반납 (마지막 사용자가 반납하면 워커 종료)"""
+        if pool is None:
+            return
+        with self._lock:
+            for key, entry in list(self._face_worker_pools.items()):
+                if entry[0] is pool:
+                    entry[1] -= 1
+                    if entry[1] > 0:
+                        return
+                    del self._face_worker_pools[key]
+                    break
+        pool.close()
+    
+    def clear(self):
+        """캐시된 모델 모두 해제 (다음 요청 시 다시 로드, 사용 중인 워커 풀은 반납 시 종료)"""
+        with self._lock:
+            self._backends.clear()
+            self._idle_face_analyzers.clear()
+    
+    def get_stats(self):
+        """레지스트리 통계"""
+        with self._lock:
+            return {
+                'backends_cached': len(self._backends),
+                'backend_loads': self.backend_loads,
+                'backend_reuses': self.backend_reuses,
+                'face_analyzers_idle': sum(len(idle) for idle in self._idle_face_analyzers.values()),
+                'face_analyzer_loads': self.face_analyzer_loads,
+                'face_analyzer_reuses': self.face_analyzer_reuses,
+                'face_worker_pools': len(self._face_worker_pools)
+            }
+
+
+# 프로세스 전역 레지스트리
+model_registry = ModelRegistry()
@@ -0,0 +1,121 @@
+"""
+모션 게이트 (저비용 움직임 감지)
+- ROI 영역만 축소 그레이스케일로 변환 후 프레임 차분
+- 장면이 정지해 있으면 YOLO 추론 생략
+- 최대 생략 시간(staleness) 초과 시 강제로 추론 허용
+"""
+
+import cv2
+import numpy as np
+
+from roi_utils import get_roi_union_bounds, get_roi_geometry_key
+
+
+class MotionGate:
+    """
+    YOLO 추론 전에 실행하는 모션 게이트
+    
+    마지막 YOLO 추론 시점의 축소 그레이스케일 프레임을 기준으로 차분하므로,
+    천천히 움직이는 경우에도 변화가 누적되면 감지된다.
+    """
+    
+    def __init__(self, scale=0.125, pixel_threshold=25, area_ratio=0.003, max_skip_seconds=5.0):
+        """
+        Args:
+            scale: 축소 비율 (기본 1/8)
+            pixel_threshold: 픽셀 변화 임계값 (0~255 그레이 레벨)
+            area_ratio: 움직임으로 판단할 변화 픽셀 비율
+            max_skip_seconds: 정지 상태에서도 이 시간이 지나면 추론 허용 (최대 staleness)
+        """
+        self.scale = scale
+        self.pixel_threshold = pixel_threshold
+        self.area_ratio = area_ratio
+        self.max_skip_seconds = max_skip_seconds
+        
+        self.reference = None  # 마지막 추론 시점의 축소 그레이 프레임
+        self.last_inference_time = None
+        self.last_motion_ratio = 0.0
+        
+        # ROI 영역 캐시 (ROI/해상도 변경 시 재계산)
+        self._bounds = None
+        self._bounds_key = None
+        
+        # 통계
+        self.frames_checked = 0
+        self.frames_skipped = 0
+    
+    def _get_bounds(self, frame, roi_regions):
+        """ROI 합집합 경계 (ROI가 없으면 전체 프레임)"""
+        frame_height, frame_width = frame.shape[:2]
+        key = (frame_width, frame_height, get_roi_geometry_key(roi_regions))
+        
+        if key != self._bounds_key:
+            bounds = get_roi_union_bounds(roi_regions, frame_width, frame_height)
+            self._bounds = bounds or (0, 0, frame_width, frame_height)
+            self._bounds_key = key
+            self.reference = None  # 영역이 바뀌면 기준 프레임 초기화
+        
+        return self._bounds
+    
+    def _prepare(self, frame, roi_regions):
+        """ROI 영역 크롭 → 그레이스케일 → 축소 → 블러"""
+        x1, y1, x2, y2 = self._get_bounds(frame, roi_regions)
+        crop = frame[y1:y2, x1:x2]
+        
+        small_width = max(1, int((x2 - x1) * self.scale))
+        small_height = max(1, int((y2 - y1) * self.scale))
+        small = cv2.resize(crop, (small_width, small_height), interpolation=cv2.INTER_AREA)
+        
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        
+        return cv2.GaussianBlur(small, (3, 3), 0)
+    
+    def should_infer(self, frame, roi_regions, current_time):
+        """
+        이번 검출 주기에 YOLO를 실행해야 하는지 판단
+        
+        Args:
+            frame: 원본 프레임 (BGR)
+            roi_regions: ROI 정보 리스트
+            current_time: 현재 시각
+        
+        Returns:
+            bool: True면 추론 실행 (움직임 감지, 최대 생략 시간 초과, 기준 프레임 없음)
+        """
+        self.frames_checked += 1
+        small = self._prepare(frame, roi_regions)
+        
+        if self.reference is None or self.reference.shape != small.shape:
+            self._mark_inference(small, current_time)
+            return True
+        
+        # 최대 생략 시간 초과 시 강제 추론 (ROI 상태 타이머 정확성 보장)
+        if current_time - self.last_inference_time >= self.max_skip_seconds:
+            self._mark_inference(small, current_time)
+            return True
+        
+        diff = cv2.absdiff(small, self.reference)
+        changed = np.count_nonzero(diff > self.pixel_threshold)
+        self.last_motion_ratio = float(changed) / diff.size
+        
+        if self.last_motion_ratio >= self.area_ratio:
+            self._mark_inference(small, current_time)
+            return True
+        
+        self.frames_skipped += 1
+        return False
+    
+    def _mark_inference(self, small, current_time):
+        """추론 실행 시점의 프레임을 새 기준으로 저장"""
+        self.reference = small
+        self.last_inference_time = current_time
+    
+    def get_stats(self):
+        """모션 게이트 통계"""
+        return {
+            'frames_checked': self.frames_checked,
+            'frames_skipped': self.frames_skipped,
+            'skip_ratio': self.frames_skipped / self.frames_checked if self.frames_checked else 0.0,
+            'last_motion_ratio': self.last_motion_ratio
+        }
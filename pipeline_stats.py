@@ -0,0 +1,119 @@
+"""
+파이프라인 단계별 지연 시간 통계
+- 단계별 최근 N개 측정값 보관 (rolling window)
+- p50 / p95 / p99 / 최대 / 평균 (밀리초)
+- 여러 스레드(캡처/추론/렌더링)에서 동시에 기록 가능
+"""
+
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# 검출 파이프라인 단계
+PIPELINE_STAGES = (
+    'capture',     # 카메라 프레임 읽기/디코딩
+    'preprocess',  # YOLO 입력 준비 (ROI 크롭 등)
+    'inference',   # YOLO 추론 + 결과 변환
+    'roi',         # 트랙 갱신 + ROI 판정 + ROI 상태 업데이트
+    'face',        # 얼굴 분석 (SAD API 전송 포함)
+    'render',      # 시각화
+    'queue',       # UI 큐/추론 워커 전달
+    'api',         # 실시간 API 전송
+)
+
+
+class PipelineStats:
+    """
+    단계별 지연 시간 롤링 히스토그램
+    
+    단계마다 최근 window개의 측정값(초)을 보관하고, 요약 시 백분위수를 계산한다.
+    측정은 time.perf_counter() (단조 시계) 기준.
+    """
+    
+    def __init__(self, window=300, stages=PIPELINE_STAGES):
+        """
+        Args:
+            window: 단계별 보관할 최근 측정값 수
+            stages: 기본 단계 목록 (다른 이름도 record()로 기록 가능)
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {stage: deque(maxlen=window) for stage in stages}
+        self._counts = {stage: 0 for stage in stages}
+    
+    def record(self, stage, seconds):
+        """측정값 1개 기록 (초)"""
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+                self._counts[stage] = 0
+            samples.append(seconds)
+            self._counts[stage] += 1
+    
+    @contextmanager
+    def measure(self, stage):
+        """
+        with 블록 실행 시간을 stage에 기록
+        
+        Example:
+            with stats.measure('render'):
+                draw(frame)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+    
+    def get_summary(self):
+        """
+        단계별 요약 (밀리초)
+        
+        Returns:
+            dict: {stage: {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}}
+                  count는 누적 측정 횟수, 나머지는 최근 window개 기준 (측정값 없으면 None)
+        """
+        with self._lock:
+            snapshot = {stage: (self._counts[stage], np.array(samples, dtype=np.float64))
+                        for stage, samples in self._samples.items()}
+        
+        summary = {}
+        for stage, (count, samples) in snapshot.items():
+            if not len(samples):
+                summary[stage] = {'count': count, 'mean_ms': None, 'p50_ms': None,
+                                  'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+                continue
+            
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000.0
+            summary[stage] = {
+                'count': count,
+                'mean_ms': float(samples.mean() * 1000.0),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(samples.max() * 1000.0)
+            }
+        return summary
+    
+    def format_summary(self):
+        """요약을 로그용 한 줄 문자열로 (측정값 있는 단계만)"""
+        parts = []
+        for stage, stats in self.get_summary().items():
+            if stats['p50_ms'] is None:
+                continue
+            parts.append(
+                f"{stage} {stats['p50_ms']:.1f}/{stats['p95_ms']:.1f}/{stats['p99_ms']:.1f}"
+            )
+        return "p50/p95/p99 ms: " + ", ".join(parts) if parts else "측정값 없음"
+    
+    def reset(self):
+        """모든 측정값 삭제"""
+        with self._lock:
+            for stage in self._samples:
+                self._samples[stage].clear()
+                self._counts[stage] = 0
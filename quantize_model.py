@@ -0,0 +1,487 @@
+"""
+INT8 정적 양자화 도구 (ONNX Runtime, CPU 전용 장비용)
+- quantize: FP32 ONNX 모델(.pt는 ONNX로 내보낸 뒤)을 녹화 영상 프레임으로 보정(calibration)하여 INT8 모델 생성
+- report: 같은 리플레이 영상에서 FP32 / INT8 모델의 사람 검출 재현율, 존재/부재 이벤트 일치율, 추론 속도 비교
+
+사용법:
+    python quantize_model.py quantize --model yolov8n.onnx --calibration rec1.mp4 rec2.mp4 --samples 300
+    python quantize_model.py report --model yolov8n.onnx --video clip.mp4 --config config.json --output int8_report.json
+
+양자화 후 config.json:
+    "yolo_model": "yolov8n.onnx",
+    "model_precision": "int8"
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+try:
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+    QUANTIZATION_AVAILABLE = True
+except ImportError:
+    QUANTIZATION_AVAILABLE = False
+    CalibrationDataReader = object
+
+from inference_backends import quantized_model_path, ULTRALYTICS_AVAILABLE
+from model_registry import model_registry
+from detection_utils import box_iou
+from roi_utils import create_left_right_rois, normalize_roi_format
+from realtime_detector import RealtimeDetector
+from clock import ReplayClock
+
+
+CALIBRATION_METHODS = {
+    'minmax': 'MinMax',
+    'entropy': 'Entropy',
+    'percentile': 'Percentile',
+}
+
+
+def export_onnx(model_path, imgsz=640):
+    """
+    .pt 모델이면 ONNX로 내보내기 (ultralytics 필요)
+    
+    Returns:
+        str: FP32 ONNX 모델 경로
+    """
+    if str(model_path).lower().endswith('.onnx'):
+        return str(model_path)
+    
+    if not ULTRALYTICS_AVAILABLE:
+        raise ImportError("ultralytics is required to export .pt models. Install: pip install ultralytics")
+    
+    from ultralytics import YOLO
+    print(f"[Quantize] ONNX 내보내기: {model_path} (imgsz {imgsz})")
+    return str(YOLO(model_path).export(format='onnx', imgsz=imgsz))
+
+
+def sample_frames(video_paths, count):
+    """
+    녹화 영상들에서 프레임을 고르게 샘플링
+    
+    Args:
+        video_paths: 영상 파일 경로 리스트
+        count: 전체 샘플 수 (영상별로 나눠서 뽑음)
+    
+    Returns:
+        list: BGR 프레임 리스트
+    """
+    frames = []
+    per_video = max(1, count // len(video_paths))
+    
+    for path in video_paths:
+        cap = cv2.VideoCapture(str(path))
+        if not cap.isOpened():
+            raise FileNotFoundError(f"영상을 열 수 없습니다: {path}")
+        
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or per_video
+        wanted = set(np.linspace(0, total - 1, num=min(per_video, total)).astype(int).tolist())
+        
+        # 탐색(seek)은 코덱에 따라 부정확하므로 순차로 읽으면서 선택
+        index = 0
+        while len(wanted):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if index in wanted:
+                frames.append(frame)
+                wanted.discard(index)
+            index += 1
+        cap.release()
+    
+    print(f"[Quantize] 샘플 프레임 {len(frames)}개 ({len(video_paths)}개 영상)")
+    return frames
+
+
+class FrameCalibrationReader(CalibrationDataReader):
+    """
+    보정용 입력 제공자
+    
+    추론 때와 같은 전처리(OnnxRuntimeBackend.preprocess 레터박스)를 거친 텐서를 하나씩 넘긴다.
+    """
+    
+    def __init__(self, frames, backend):
+        """
+        Args:
+            frames: BGR 프레임 리스트
+            backend: FP32 모델의 OnnxRuntimeBackend (전처리 전용)
+        """
+        self.frames = frames
+        self.backend = backend
+        self.index = 0
+    
+    def get_next(self):
+        if self.index >= len(self.frames):
+            return None
+        self.backend.preprocess(self.frames[self.index])
+        self.index += 1
+        return {self.backend.input_name: self.backend.input_tensor.copy()}
+    
+    def rewind(self):
+        self.index = 0
+
+
+def find_head_nodes(model_path):
+    """
+    검출 헤드의 박스 디코딩 노드 (Conv 제외) 목록
+    
+    YOLOv8/11 Detect 헤드의 DFL/앵커 디코딩(Softmax, Mul, Add, Concat 등)은 INT8로 양자화하면
+    박스 좌표 오차가 커지므로 FP32로 남긴다. 헤드 Conv는 양자화 대상으로 유지.
+    """
+    model = onnx.load(str(model_path), load_external_data=False)
+    output_name = model.graph.output[0].name
+    producer = next((node for node in model.graph.node if output_name in node.output), None)
+    if producer is None or '/' not in producer.name.strip('/'):
+        return []
+    
+    # 예: '/model.22/Concat_5' → '/model.22/'
+    prefix = '/' + producer.name.strip('/').split('/')[0] + '/'
+    return [node.name for node in model.graph.node
+            if node.name.startswith(prefix) and node.op_type != 'Conv']
+
+
+def quantize(args):
+    """INT8 정적 양자화 실행"""
+    if not QUANTIZATION_AVAILABLE:
+        raise ImportError("onnx and onnxruntime are required. Install: pip install onnx onnxruntime")
+    
+    fp32_path = export_onnx(args.model, args.imgsz)
+    output_path = args.output or quantized_model_path(fp32_path)
+    
+    frames = sample_frames(args.calibration, args.samples)
+    if not frames:
+        raise RuntimeError("보정용 프레임을 읽지 못했습니다")
+    
+    preprocessor = model_registry.get_backend({
+        'yolo_model': fp32_path, 'inference_backend': 'onnxruntime',
+        'inference_imgsz': args.imgsz, 'inference_warmup_runs': 0
+    })
+    reader = FrameCalibrationReader(frames, preprocessor)
+    
+    nodes_to_exclude = [] if args.quantize_head else find_head_nodes(fp32_path)
+    if nodes_to_exclude:
+        print(f"[Quantize] 검출 헤드 디코딩 노드 {len(nodes_to_exclude)}개는 FP32 유지")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 양자화 전처리 (shape 추론 + 그래프 최적화) - 실패하면 원본으로 진행
+        model_input = fp32_path
+        try:
+            prepared_path = str(Path(tmp_dir) / 'prepared.onnx')
+            quant_pre_process(fp32_path, prepared_path)
+            model_input = prepared_path
+        except Exception as e:
+            print(f"[Quantize] ⚠️  양자화 전처리 생략: {e}")
+        
+        print(f"[Quantize] 정적 양자화 시작 (보정 {CALIBRATION_METHODS[args.method]}, 프레임 {len(frames)}개)")
+        start_time = time.perf_counter()
+        quantize_static(
+            model_input=model_input,
+            model_output=output_path,
+            calibration_data_reader=reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=not args.per_tensor,
+            calibrate_method=getattr(CalibrationMethod, CALIBRATION_METHODS[args.method]),
+            nodes_to_exclude=nodes_to_exclude
+        )
+    
+    fp32_mb = Path(fp32_path).stat().st_size / 1e6
+    int8_mb = Path(output_path).stat().st_size / 1e6
+    print(f"[Quantize] ✅ INT8 모델 저장: {output_path} ({fp32_mb:.1f} MB → {int8_mb:.1f} MB, "
+          f"{time.perf_counter() - start_time:.1f}초)")
+    print(f"[Quantize] 정확도 확인: python quantize_model.py report --model {fp32_path} --int8-model {output_path} --video <리플레이 영상>")
+    return output_path
+
+
+def load_replay_config(config_path=None):
+    """리플레이용 설정 (config 파일 + 결정적 실행 옵션)"""
+    config = {}
+    if config_path:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    
+    # 처리 루프를 직접 돌리므로 캡처 스레드/비동기 추론은 사용하지 않음 (결정적 실행)
+    config['use_capture_thread'] = False
+    config['async_inference'] = False
+    config['enable_rendering'] = False
+    
+    # 외부 API 호출 금지, 검출 모델만 비교
+    config['api_endpoint'] = ''
+    config['enable_face_analysis'] = False
+    return config
+
+
+def compare_detections(fp32_backend, int8_backend, frames, person_class_id=0,
+                       confidence_threshold=0.5, iou_threshold=0.5):
+    """
+    프레임별 사람 검출 비교 (FP32 검출을 기준으로 INT8의 재현율/정밀도)
+    
+    Returns:
+        dict: recall / precision / mean_iou / 모델별 추론 시간
+    """
+    matched = 0
+    reference_total = 0
+    candidate_total = 0
+    ious = []
+    timings = {'fp32': [], 'int8': []}
+    
+    for frame in frames:
+        detections = {}
+        for precision, backend in (('fp32', fp32_backend), ('int8', int8_backend)):
+            start = time.perf_counter()
+            detections[precision] = backend.detect_persons([frame], confidence_threshold, person_class_id)[0]
+            timings[precision].append(time.perf_counter() - start)
+        
+        reference, candidate = detections['fp32'], detections['int8']
+        reference_total += len(reference)
+        candidate_total += len(candidate)
+        if not len(reference) or not len(candidate):
+            continue
+        
+        # IoU 높은 순으로 1:1 매칭
+        iou = box_iou(reference[:, :4], candidate[:, :4])
+        while iou.size and iou.max() >= iou_threshold:
+            r, c = np.unravel_index(np.argmax(iou), iou.shape)
+            ious.append(float(iou[r, c]))
+            matched += 1
+            iou[r, :] = -1
+            iou[:, c] = -1
+    
+    return {
+        'frames': len(frames),
+        'fp32_persons': reference_total,
+        'int8_persons': candidate_total,
+        'recall': matched / reference_total if reference_total else None,  # FP32 검출이 없으면 측정 불가
+        'precision': matched / candidate_total if candidate_total else None,
+        'mean_iou': float(np.mean(ious)) if ious else None,
+        'fp32_ms': float(np.median(timings['fp32']) * 1000.0) if frames else None,
+        'int8_ms': float(np.median(timings['int8']) * 1000.0) if frames else None
+    }
+
+
+def replay_events(config, video_path, precision, max_frames=None):
+    """
+    영상을 RealtimeDetector로 리플레이하여 존재/부재 이벤트 수집 (ReplayClock - 실시간과 같은 판정)
+    
+    Returns:
+        list: [(roi_id, status, 영상 내 시각(초)), ...]
+    """
+    config = dict(config, model_precision=precision)
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise FileNotFoundError(f"영상을 열 수 없습니다: {video_path}")
+    
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    roi_regions = [normalize_roi_format(roi) for roi in config.get('roi_regions', [])]
+    if not roi_regions:
+        roi_regions = create_left_right_rois(width, height)
+    
+    clock = ReplayClock(fps=cap.get(cv2.CAP_PROP_FPS) or 30.0)
+    detector = RealtimeDetector(config, roi_regions, clock=clock)
+    detector.cap = cap
+    detector.running = True
+    
+    events = []
+    frames = 0
+    while max_frames is None or frames < max_frames:
+        buffer = detector.read_frame()
+        if buffer is None:
+            break
+        detector.process_frame(buffer)
+        buffer.release()
+        
+        for event in detector.get_latest_events():
+            media_time = event['capture_time'] - clock.start_time if event['capture_time'] is not None else None
+            events.append((event['roi_id'], event['status'], media_time))
+        detector.get_latest_stats()
+        frames += 1
+    
+    detector.running = False
+    cap.release()
+    print(f"[Report] {precision.upper()} 리플레이: {frames} 프레임, 이벤트 {len(events)}건")
+    return events
+
+
+def match_events(reference, candidate, tolerance=2.0):
+    """
+    이벤트 일치율 (같은 ROI/상태, 상태 변화 프레임 시각 차이가 tolerance초 이내면 일치)
+    
+    Returns:
+        dict: agreement (일치 수 / 두 모델 중 많은 쪽 이벤트 수, FP32 이벤트가 없으면 None - 측정 불가)
+              + 일치하지 않은 이벤트 목록
+    """
+    unmatched_candidate = list(candidate)
+    unmatched_reference = []
+    max_offset = 0.0
+    
+    for roi_id, status, media_time in reference:
+        match = None
+        for index, (other_roi, other_status, other_time) in enumerate(unmatched_candidate):
+            if other_roi != roi_id or other_status != status:
+                continue
+            if media_time is None or other_time is None or abs(other_time - media_time) <= tolerance:
+                match = index
+                break
+        if match is None:
+            unmatched_reference.append((roi_id, status, media_time))
+            continue
+        other_time = unmatched_candidate.pop(match)[2]
+        if media_time is not None and other_time is not None:
+            max_offset = max(max_offset, abs(other_time - media_time))
+    
+    total = max(len(reference), len(candidate))
+    matched = len(reference) - len(unmatched_reference)
+    return {
+        'fp32_events': len(reference),
+        'int8_events': len(candidate),
+        'matched': matched,
+        'agreement': matched / total if reference else None,  # FP32 이벤트가 없으면 비교할 ROI 상태 변화가 없음
+        'max_offset_seconds': max_offset,
+        'fp32_only': unmatched_reference,
+        'int8_only': unmatched_candidate
+    }
+
+
+def report(args):
+    """FP32 / INT8 비교 리포트"""
+    config = load_replay_config(args.config)
+    fp32_path = export_onnx(args.model, args.imgsz)
+    int8_path = args.int8_model or quantized_model_path(fp32_path)
+    config.update({
+        'yolo_model': fp32_path,
+        'yolo_model_int8': int8_path,
+        'inference_imgsz': args.imgsz,
+        'inference_backend': 'onnxruntime'
+    })
+    
+    # 1) 프레임별 사람 검출 비교 (레지스트리 백엔드 - 리플레이 검출기가 같은 인스턴스를 재사용)
+    fp32_backend = model_registry.get_backend(dict(config, model_precision='fp32'))
+    int8_backend = model_registry.get_backend(dict(config, model_precision='int8'))
+    frames = sample_frames([args.video], args.recall_frames)
+    detection = compare_detections(
+        fp32_backend, int8_backend, frames,
+        confidence_threshold=config.get('confidence_threshold', 0.5), iou_threshold=args.iou
+    )
+    
+    # 2) 리플레이 이벤트 비교 (ROI 판정/임계 시간 포함)
+    fp32_events = replay_events(config, args.video, 'fp32', args.max_frames)
+    int8_events = replay_events(config, args.video, 'int8', args.max_frames)
+    events = match_events(fp32_events, int8_events, args.event_tolerance)
+    
+    speedup = detection['fp32_ms'] / detection['int8_ms'] if detection['fp32_ms'] and detection['int8_ms'] else None
+    accepted = (detection['recall'] is not None and detection['recall'] >= args.min_recall
+                and events['agreement'] is not None and events['agreement'] >= args.min_event_agreement)
+    
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'video': str(args.video),
+        'fp32_model': fp32_path,
+        'int8_model': int8_path,
+        'detection': detection,
+        'events': events,
+        'speedup': speedup,
+        'criteria': {'min_recall': args.min_recall, 'min_event_agreement': args.min_event_agreement},
+        'accepted': accepted
+    }
+
+
+def print_report(result):
+    """리포트 요약 출력"""
+    detection, events = result['detection'], result['events']
+    print("\n" + "=" * 60)
+    print(f"📊 INT8 정확도 리포트 ({result['video']})")
+    print("=" * 60)
+    if detection['recall'] is None:
+        print(f"사람 검출 ({detection['frames']} 프레임): FP32 검출 없음 - 재현율 측정 불가 (사람이 나오는 영상 사용)")
+    else:
+        precision = f"{detection['precision']:.1%}" if detection['precision'] is not None else '-'
+        print(f"사람 검출 ({detection['frames']} 프레임): 재현율 {detection['recall']:.1%}, "
+              f"정밀도 {precision} (FP32 {detection['fp32_persons']}명 / INT8 {detection['int8_persons']}명)")
+    if detection['mean_iou'] is not None:
+        print(f"매칭 박스 평균 IoU: {detection['mean_iou']:.3f}")
+    if detection['fp32_ms'] is None or detection['int8_ms'] is None:
+        print("추론 p50: 측정 프레임 없음")
+    else:
+        speedup = f"{result['speedup']:.2f}배" if result['speedup'] is not None else '-'
+        print(f"추론 p50: FP32 {detection['fp32_ms']:.1f} ms → INT8 {detection['int8_ms']:.1f} ms ({speedup})")
+    if events['agreement'] is None:
+        print(f"존재/부재 이벤트: FP32 이벤트 없음 - 일치율 측정 불가 (INT8 {events['int8_events']}건, "
+              f"ROI 상태가 바뀌는 영상 사용)")
+    else:
+        print(f"존재/부재 이벤트: 일치율 {events['agreement']:.1%} "
+              f"(FP32 {events['fp32_events']}건 / INT8 {events['int8_events']}건, 최대 시각 차이 {events['max_offset_seconds']:.2f}초)")
+    for label, only in (('FP32', events['fp32_only']), ('INT8', events['int8_only'])):
+        for roi_id, status, media_time in only:
+            at = f"{media_time:.1f}초" if media_time is not None else '-'
+            print(f"  - {label}에만 있음: {roi_id} {status} @ {at}")
+    print(f"\n{'✅ 기준 충족 - INT8 사용 가능' if result['accepted'] else '❌ 기준 미달 - FP32 유지 권장'} "
+          f"(재현율 ≥ {result['criteria']['min_recall']:.0%}, 이벤트 일치율 ≥ {result['criteria']['min_event_agreement']:.0%})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='YOLO 모델 INT8 정적 양자화 (ONNX Runtime)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    quantize_parser = subparsers.add_parser('quantize', help='녹화 영상으로 보정하여 INT8 모델 생성')
+    quantize_parser.add_argument('--model', required=True, help='FP32 모델 (.onnx 또는 .pt)')
+    quantize_parser.add_argument('--calibration', nargs='+', required=True, help='보정용 녹화 영상 (여러 개 가능)')
+    quantize_parser.add_argument('--samples', type=int, default=300, help='보정 프레임 수 (기본: 300)')
+    quantize_parser.add_argument('--output', default=None, help='INT8 모델 경로 (기본: <모델>_int8.onnx)')
+    quantize_parser.add_argument('--method', choices=sorted(CALIBRATION_METHODS), default='minmax',
+                                 help='보정 방법 (기본: minmax)')
+    quantize_parser.add_argument('--per-tensor', action='store_true', help='채널별 대신 텐서별 가중치 양자화')
+    quantize_parser.add_argument('--quantize-head', action='store_true', help='검출 헤드 박스 디코딩까지 양자화')
+    quantize_parser.add_argument('--imgsz', type=int, default=640, help='입력 크기 (기본: 640)')
+    
+    report_parser = subparsers.add_parser('report', help='FP32 / INT8 정확도 및 속도 비교')
+    report_parser.add_argument('--model', required=True, help='FP32 모델 (.onnx 또는 .pt)')
+    report_parser.add_argument('--int8-model', default=None, help='INT8 모델 (기본: <모델>_int8.onnx)')
+    report_parser.add_argument('--video', required=True, help='리플레이 영상')
+    report_parser.add_argument('--config', default=None, help='설정 파일 (ROI/임계값, 기본: 없음)')
+    report_parser.add_argument('--recall-frames', type=int, default=300, help='검출 비교 프레임 수 (기본: 300)')
+    report_parser.add_argument('--max-frames', type=int, default=None, help='리플레이 최대 프레임 수 (기본: 영상 끝까지)')
+    report_parser.add_argument('--iou', type=float, default=0.5, help='검출 매칭 IoU 임계값 (기본: 0.5)')
+    report_parser.add_argument('--event-tolerance', type=float, default=2.0,
+                               help='이벤트 일치 허용 시각 차이(초) (기본: 2.0)')
+    report_parser.add_argument('--min-recall', type=float, default=0.95, help='INT8 허용 최소 재현율 (기본: 0.95)')
+    report_parser.add_argument('--min-event-agreement', type=float, default=1.0,
+                               help='INT8 허용 최소 이벤트 일치율 (기본: 1.0)')
+    report_parser.add_argument('--imgsz', type=int, default=640, help='입력 크기 (기본: 640)')
+    report_parser.add_argument('--output', default=None, help='리포트 JSON 저장 경로')
+    
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """메인 함수"""
+    args = parse_args(argv)
+    
+    if args.command == 'quantize':
+        quantize(args)
+        return
+    
+    result = report(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ 리포트 저장: {args.output}")
+    sys.exit(0 if result['accepted'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,7 +10,6 @@ import time
 import threading
 import queue
 from datetime import datetime
-from ultralytics import YOLO
 import platform
 import requests
 import json
@@ -26,13 +25,29 @@ except ImportError:
 
 # 얼굴 분석기 임포트 (선택적)
 try:
-    from face_analyzer import FaceAnalyzer
+    from face_analyzer import FaceAnalyzer, DEFAULT_EAR_THRESHOLD
     FACE_ANALYZER_AVAILABLE = True
     print("[RealtimeDetector] ✅ FaceAnalyzer 모듈 로드 완료")
 except ImportError:
     FACE_ANALYZER_AVAILABLE = False
     print("[RealtimeDetector] ⚠️  FaceAnalyzer 모듈 없음 - 얼굴 분석 비활성화")
 
+from frame_pipeline import FrameGrabber, InferenceWorker, FrameBufferPool, FrameInfo, PooledFrame
+from roi_utils import ROILabelMap, get_roi_union_bounds, get_roi_geometry_key
+from motion_gate import MotionGate
+from roi_renderer import ROIOverlayCache
+from pipeline_stats import PipelineStats
+from clock import WallClock
+from inference_backends import create_backend
+from model_registry import model_registry
+from face_contexts import FaceContextPool
+from face_scheduler import FaceAnalysisScheduler
+from detection_utils import (
+    empty_detections, detection_key,
+    BBOX_COLUMNS, CONF_COLUMN, TRACK_ID_COLUMN
+)
+from tracker import IoUTracker
+
 
 class RealtimeDetector:
     """
@@ -40,25 +55,45 @@ class RealtimeDetector:
     큐를 사용하여 Streamlit UI와 통신
     """
     
-    def __init__(self, config, roi_regions):
+    def __init__(self, config, roi_regions, model=None, clock=None):
         """
         Args:
             config: 설정 딕셔너리
             roi_regions: ROI 영역 리스트
+            model: 공유 추론 백엔드 또는 YOLO 모델 (None이면 config['yolo_model']을 inference_backend로 직접 로드)
+            clock: 이벤트 판정용 시계 (None이면 WallClock, 녹화 영상 리플레이는 ReplayClock)
         """
         self.config = config
         self.roi_regions = roi_regions
         
-        # YOLO 모델 로드
-        model_path = config.get('yolo_model', 'yolov8n.pt')
-        print(f"[RealtimeDetector] YOLO 모델 로딩: {model_path}")
-        self.model = YOLO(model_path)
+        # ROI 상태/검출 간격/SAD 재전송 대기 등 판정 시각은 모두 self.clock 기준
+        # (FPS, 뷰어 타임아웃, 단계별 지연 시간은 실제 시각 기준)
+        self.clock = clock if clock is not None else WallClock()
+        
+        # 추론 백엔드 (ultralytics/onnxruntime/openvino, DetectorPool 등에서 공유 백엔드를 넘겨받을 수 있음)
+        # 직접 로드할 때는 프로세스 전역 레지스트리 사용 (검출 재시작 시 모델 다시 로드 안 함)
+        if model is not None:
+            self.backend = create_backend(config, model)
+        else:
+            self.backend = model_registry.get_backend(config)
         
         # 카메라 초기화
         self.camera_source = config.get('camera_source', 0)
         self.camera_source_type = config.get('camera_source_type', None)  # 자동 감지 가능
         self.cap = None
         
+        # 캡처 전용 스레드 (최신 프레임만 유지하여 지연 최소화)
+        self.use_capture_thread = config.get('use_capture_thread', True)
+        self.grabber = None
+        self.last_frame_seq = 0
+        self.frames_dropped = 0
+        
+        # 프레임 버퍼 풀 (캡처/시각화 프레임 재사용, 큐에는 버퍼 참조만 전달)
+        self.frame_pool = FrameBufferPool(
+            capacity=config.get('frame_buffer_pool_size', 12),
+            name=str(self.camera_source)
+        )
+        
         # 카메라 소스 정보 출력
         if CAMERA_UTILS_AVAILABLE:
             source_info = CameraSourceManager.get_source_info(self.camera_source)
@@ -68,7 +103,8 @@ class RealtimeDetector:
         # Linux 환경 감지
         self.is_linux = platform.system() == 'Linux'
         
-        # ROI별 상태 추적
+        # ROI별 상태 추적 (검출 스레드와 렌더링 스레드의 모션 게이트가 함께 갱신하므로 락으로 보호)
+        self.roi_state_lock = threading.Lock()
         self.roi_states = {}
         for roi in roi_regions:
             roi_id = roi['id']
@@ -78,9 +114,22 @@ class RealtimeDetector:
                 'absence_start_time': None,
                 'last_status_sent': None,
                 'detection_count': 0,
-                'last_count_time': time.time()
+                'last_count_time': self.clock.now(),
+                'transition_frame': None  # 현재 상태(존재/부재)가 처음 관측된 프레임의 FrameInfo
             }
         
+        # ROI 라벨 맵 (박스 → ROI 할당용, 첫 프레임에서 생성)
+        self.roi_label_map = None
+        
+        # ROI 오버레이 캐시 (ROI 상태가 바뀔 때만 재생성)
+        self.roi_overlay = ROIOverlayCache()
+        
+        # ROI 크롭 추론 (ROI 합집합 영역만 YOLO에 입력)
+        self.roi_crop_inference = config.get('roi_crop_inference', False)
+        self.roi_crop_padding = config.get('roi_crop_padding', 32)
+        self._roi_crop_bounds = None
+        self._roi_crop_key = None
+        
         # 설정값
         self.presence_threshold = config.get('presence_threshold_seconds', 5)
         self.absence_threshold = config.get('absence_threshold_seconds', 3)
@@ -90,21 +139,85 @@ class RealtimeDetector:
         # 검출 간격 설정 (초 단위)
         self.detection_interval = config.get('detection_interval_seconds', 1.0)  # 기본 1초
         self.last_detection_time = 0
-        self.last_detections = []  # 마지막 검출 결과 저장
+        self.sync_detections = empty_detections()  # 동기 모드/DetectorPool의 마지막 검출 결과 (읽기 전용 배열)
+        
+        # 비동기 추론 워커 (렌더링 루프가 추론 완료를 기다리지 않음)
+        self.async_inference = config.get('async_inference', True)
+        self.inference_worker = None
+        
+        # 트래커 (추론 사이 프레임의 박스 예측 + 사람별 트랙 ID)
+        # 얼굴 분석 워커/스케줄러는 사람을 트랙 ID로 구분하므로 트래킹을 자동으로 켬
+        enable_tracking = config.get('enable_tracking', False)
+        if not enable_tracking and config.get('enable_face_analysis', False):
+            for key in ('face_workers', 'face_time_budget_ms'):
+                if config.get(key, 0) > 0:
+                    print(f"[RealtimeDetector] {key} 사용 - 트래킹 자동 활성화 (얼굴 분석 결과를 트랙 ID로 매칭)")
+                    enable_tracking = True
+                    break
+        
+        self.tracker = None
+        if enable_tracking:
+            self.tracker = IoUTracker(
+                iou_threshold=config.get('tracker_iou_threshold', 0.3),
+                max_missed=config.get('tracker_max_missed', 2),
+                max_predict_seconds=max(2.0, 2 * self.detection_interval)
+            )
+            print("[RealtimeDetector] 트래커 활성화")
+        
+        # 모션 게이트 (정지 장면에서 YOLO 생략, 최대 생략 시간 이후에는 강제 추론)
+        self.motion_gate = None
+        self.last_roi_presence = {}  # ROI별 마지막 YOLO 판정 결과
+        if config.get('enable_motion_gate', False):
+            max_skip_seconds = config.get(
+                'motion_max_skip_seconds',
+                min(self.presence_threshold, self.absence_threshold)
+            )
+            # 생략 중에는 트래커가 갱신되지 않으므로 예측 한계보다 오래 생략하면 트랙이 사라짐
+            if self.tracker is not None and max_skip_seconds > self.tracker.max_predict_seconds:
+                print(f"[RealtimeDetector] 모션 게이트 최대 생략 {max_skip_seconds}초 → "
+                      f"{self.tracker.max_predict_seconds}초 (트래커 예측 한계)")
+                max_skip_seconds = self.tracker.max_predict_seconds
+            self.motion_gate = MotionGate(
+                scale=config.get('motion_downscale', 0.125),
+                pixel_threshold=config.get('motion_pixel_threshold', 25),
+                area_ratio=config.get('motion_area_ratio', 0.003),
+                max_skip_seconds=max_skip_seconds
+            )
+            print(f"[RealtimeDetector] 모션 게이트 활성화 (최대 생략 {self.motion_gate.max_skip_seconds}초)")
         
         # 얼굴 분석 설정
         self.enable_face_analysis = config.get('enable_face_analysis', False)
         self.face_analysis_roi_only = config.get('face_analysis_roi_only', True)
-        self.face_analyzer = None
+        self.face_track_contexts = config.get('face_track_contexts', 4)
+        self.face_mosaic = config.get('face_mosaic', False)          # 머리 영역 모자이크로 한 번에 분석
+        self.face_mosaic_grid = max(1, int(config.get('face_mosaic_grid', 2)))  # 격자 한 변 타일 수
+        self.face_worker_count = config.get('face_workers', 0)      # > 0이면 워커 프로세스에서 비동기 분석
+        self.face_worker_max_crop = config.get('face_worker_max_crop', 480)
+        self.face_analyzer = None   # 트래킹 미사용 시(또는 모자이크) 공유 분석기
+        self.face_contexts = None   # 트래킹 사용 시 트랙별 분석기 (FaceContextPool)
+        self.face_workers = None    # 워커 프로세스 풀 (FaceWorkerPool, 검출기끼리 공유)
+        self.face_worker_owner = None
+        self.face_worker_frames = {}  # 워커 분석 중인 키 → 제출한 프레임 (PooledFrame, 결과 도착 시 반환)
+        
+        self.sad_alert_confidence = config.get('sad_alert_confidence', 0.6)  # SAD 알림 신뢰도 임계값
+        self.face_scheduler = None
+        
         self.last_face_results = {}  # 마지막 얼굴 분석 결과 저장
         
         if self.enable_face_analysis and FACE_ANALYZER_AVAILABLE:
-            try:
-                self.face_analyzer = FaceAnalyzer()
-                print("[RealtimeDetector] ✅ FaceAnalyzer 초기화 완료")
-            except Exception as e:
-                print(f"[RealtimeDetector] ⚠️  FaceAnalyzer 초기화 실패: {e}")
-                self.enable_face_analysis = False
+            self.acquire_face_analyzer()
+            
+            # 얼굴 분석 시간 예산 (검출 주기당 ms, 0이면 매 주기 모든 사람 분석)
+            # 임계값은 레지스트리 FaceAnalyzer(기본 EAR 임계값) / SAD 알림과 같은 값을 사용
+            face_budget_ms = config.get('face_time_budget_ms', 0)
+            if face_budget_ms:
+                self.face_scheduler = FaceAnalysisScheduler(
+                    ear_threshold=DEFAULT_EAR_THRESHOLD,
+                    sad_confidence=self.sad_alert_confidence,
+                    budget_ms=face_budget_ms
+                )
+                if self.face_workers is not None:
+                    print(f"[RealtimeDetector] 얼굴 분석 시간 예산 {face_budget_ms}ms - 워커 사용 시 검출 스레드의 제출 시간에 적용 (워커 분석 시간은 슬롯 수로 제한)")
         elif self.enable_face_analysis and not FACE_ANALYZER_AVAILABLE:
             print("[RealtimeDetector] ⚠️  FaceAnalyzer 모듈 없음 - 얼굴 분석 비활성화")
             self.enable_face_analysis = False
@@ -119,11 +232,29 @@ class RealtimeDetector:
         self.stats_queue = queue.Queue(maxsize=10)
         self.event_queue = queue.Queue(maxsize=50)
         
+        # 필요 시 렌더링: 시각화 프레임을 읽는 뷰어가 없으면 그리기/큐 전송 생략
+        # enable_rendering=False면 시각화를 전혀 하지 않음 (헤드리스 서비스)
+        self.enable_rendering = config.get('enable_rendering', True)
+        self.render_on_demand = config.get('render_on_demand', True)
+        self.viewer_timeout = config.get('viewer_timeout_seconds', 5.0)
+        self.last_viewer_time = None  # 마지막 get_latest_frame() 호출 시각
+        self.viewer_attached = False
+        self.frames_rendered = 0
+        self.frames_render_skipped = 0
+        self.events_dropped = 0
+        self.inferences_run = 0  # 검출 결과 처리 횟수 (동기/비동기/풀 공통)
+        
         # FPS 측정
         self.fps = 0
         self.frame_count = 0
         self.fps_start_time = time.time()
         
+        # 단계별 지연 시간 통계 (capture/preprocess/inference/roi/face/render/queue/api)
+        self.pipeline_stats = PipelineStats(window=config.get('pipeline_stats_window', 300))
+        
+        # 캡처 → 알림 지연 시간 분포 ("<이벤트 타입>.<구간>" 이름으로 기록)
+        self.alert_latency = PipelineStats(window=config.get('pipeline_stats_window', 300), stages=())
+        
         # API 설정
         self.api_endpoint = config.get('api_endpoint', '')
         self.api_enabled = bool(self.api_endpoint)
@@ -136,25 +267,36 @@ class RealtimeDetector:
         if self.api_enabled:
             print(f"[RealtimeDetector] API 엔드포인트: {self.api_endpoint}")
     
-    def is_person_in_polygon_roi(self, bbox, roi):
-        """사람이 ROI 내에 있는지 확인"""
-        x1, y1, x2, y2 = bbox
-        center_x = (x1 + x2) / 2
-        center_y = (y1 + y2) / 2
-        center_point = (int(center_x), int(center_y))
+    def get_roi_label_map(self, frame):
+        """
+        ROI 라벨 맵 가져오기 (ROI 또는 해상도가 바뀐 경우에만 재생성)
         
-        if roi.get('type') == 'polygon' and 'points' in roi:
-            points = np.array(roi['points'], dtype=np.int32)
-            result = cv2.pointPolygonTest(points, center_point, False)
-            return result >= 0
+        Args:
+            frame: 현재 프레임 (해상도 확인용)
+        """
+        frame_height, frame_width = frame.shape[:2]
         
-        return False
+        if (self.roi_label_map is None or
+                not self.roi_label_map.matches(self.roi_regions, frame_width, frame_height)):
+            self.roi_label_map = ROILabelMap(self.roi_regions, frame_width, frame_height)
+            print(f"[RealtimeDetector] ROI 라벨 맵 생성: {frame_width}x{frame_height}, {len(self.roi_regions)}개 ROI")
+            
+            # ROI/해상도가 바뀌면 이전 트랙은 새 ROI 기준 판정과 맞지 않으므로 초기화
+            if self.tracker is not None:
+                self.tracker.reset()
+        
+        return self.roi_label_map
     
     def send_realtime_api(self, roi_id, event_type, reason, frame=None):
         """실시간 API 전송 (SAD 표정, 부재 상태) - 현재 스냅샷 이미지 포함"""
         if not self.api_enabled:
             return
         
+        with self.pipeline_stats.measure('api'):
+            self._send_realtime_api(roi_id, event_type, reason, frame)
+    
+    def _send_realtime_api(self, roi_id, event_type, reason, frame):
+        """실시간 API 전송 본체 (send_realtime_api에서 지연 시간 측정 후 호출)"""
         try:
             import uuid
             import base64
@@ -165,7 +307,7 @@ class RealtimeDetector:
             
             # FCM Message ID 생성
             fcm_project = self.config.get('fcm_project_id', 'emergency-alert-system-f27e6')
-            fcm_message_id = f"projects/{fcm_project}/messages/{int(time.time() * 1000)}"
+            fcm_message_id = f"projects/{fcm_project}/messages/{int(self.clock.now() * 1000)}"
             
             # API 페이로드 생성 (요청한 형식)
             payload = {
@@ -173,7 +315,7 @@ class RealtimeDetector:
                 'fcmMessageId': fcm_message_id,
                 'imageUrl': None,
                 'status': 'SENT',
-                'createdAt': datetime.now().isoformat(),
+                'createdAt': datetime.fromtimestamp(self.clock.now()).isoformat(),
                 'watchId': self.config.get('watch_id', 'unknown'),
                 'senderId': self.config.get('sender_id', 'test-user'),
                 'note': self.config.get('note', '응급상황 메시지')
@@ -225,7 +367,7 @@ class RealtimeDetector:
             else:
                 print(f"[RealtimeDetector] ⚠️ API 응답 오류: {response.status_code}")
                 print(f"[RealtimeDetector] 응답 내용: {response.text}")
-                
+        
         except requests.exceptions.Timeout:
             print(f"[RealtimeDetector] ⏱️ API 타임아웃")
         except requests.exceptions.ConnectionError:
@@ -235,132 +377,199 @@ class RealtimeDetector:
             import traceback
             traceback.print_exc()
     
-    def update_roi_state(self, roi_id, person_in_roi, frame=None):
-        """ROI 상태 업데이트 및 API 이벤트 전송 판단"""
-        state = self.roi_states[roi_id]
-        current_time = time.time()
-        
-        if person_in_roi:
-            # 사람 검출됨
-            if not state['person_detected']:
-                # 처음 검출된 경우
-                state['person_detected'] = True
-                state['detection_start_time'] = current_time
-                state['absence_start_time'] = None
-            else:
-                # 계속 검출 중
-                detection_duration = current_time - state['detection_start_time']
-                
-                # Presence threshold 초과 시 이벤트 전송
-                if detection_duration >= self.presence_threshold:
-                    if state['last_status_sent'] != 'present':
-                        state['last_status_sent'] = 'present'
-                        state['detection_count'] += 1
-                        
-                        # 이벤트 큐에 전송
-                        self.event_queue.put({
-                            'timestamp': datetime.now().strftime('%H:%M:%S'),
-                            'roi_id': roi_id,
-                            'status': 'present',
-                            'count': state['detection_count']
-                        })
-        else:
-            # 사람 미검출
-            if state['person_detected']:
-                # 이전에 검출되었다가 사라진 경우
-                state['person_detected'] = False
-                state['absence_start_time'] = current_time
-                state['detection_start_time'] = None
-            elif state['absence_start_time'] is not None:
-                # 계속 미검출 중
-                absence_duration = current_time - state['absence_start_time']
-                
-                # Absence threshold 초과 시 이벤트 전송
-                if absence_duration >= self.absence_threshold:
-                    if state['last_status_sent'] == 'present':
-                        state['last_status_sent'] = 'absent'
-                        
-                        # 🚨 실시간 API 전송 (부재 상태) - 현재 프레임 포함
-                        self.send_realtime_api(
-                            roi_id=roi_id,
-                            event_type='absent',
-                            reason='Person absence detected',
-                            frame=frame
-                        )
-                        
-                        # 이벤트 큐에 전송
-                        self.event_queue.put({
-                            'timestamp': datetime.now().strftime('%H:%M:%S'),
-                            'roi_id': roi_id,
-                            'status': 'absent',
-                            'count': state['detection_count']
-                        })
+    def record_alert_latency(self, event_type, frame_info, observed_time, decided_time, network_seconds=0.0):
+        """
+        캡처 → 알림 완료 지연 시간 기록
         
-        # 상태 큐 업데이트
-        try:
-            self.stats_queue.put_nowait({
+        Args:
+            event_type: 이벤트 타입 ('present', 'absent', 'sad_expression')
+            frame_info: 상태 변화가 처음 보인 프레임의 FrameInfo (None이면 observed_time을 캡처 시각으로 사용)
+            observed_time: 그 프레임이 처리(판정)된 시각
+            decided_time: 이벤트 전송을 결정한 시각 (임계 시간 경과 시점)
+            network_seconds: API 전송 소요 시간
+        
+        Returns:
+            dict: 구간별 지연 시간 (초) - detection / threshold_wait / network / total
+        """
+        capture_time = frame_info.capture_time if frame_info is not None else observed_time
+        latency = {
+            'detection': observed_time - capture_time,      # 캡처 → 판정 (추론 간격/추론 대기 포함)
+            'threshold_wait': decided_time - observed_time,  # 존재/부재 임계 시간 대기
+            'network': network_seconds,                      # API 전송
+            'total': decided_time - capture_time + network_seconds  # 캡처 → 알림 완료
+        }
+        for component, seconds in latency.items():
+            self.alert_latency.record(f"{event_type}.{component}", seconds)
+        return latency
+    
+    def send_alert(self, roi_id, event_type, reason, frame, frame_info, observed_time, decided_time):
+        """실시간 API 전송 + 캡처→알림 지연 시간 기록"""
+        send_start = time.perf_counter()
+        self.send_realtime_api(roi_id=roi_id, event_type=event_type, reason=reason, frame=frame)
+        network_seconds = time.perf_counter() - send_start
+        
+        return self.record_alert_latency(event_type, frame_info, observed_time, decided_time, network_seconds)
+    
+    def build_event(self, roi_id, state, latency):
+        """이벤트 큐용 이벤트 딕셔너리"""
+        transition_frame = state['transition_frame']
+        return {
+            'timestamp': datetime.fromtimestamp(self.clock.now()).strftime('%H:%M:%S'),
+            'roi_id': roi_id,
+            'status': state['last_status_sent'],
+            'count': state['detection_count'],
+            'track_ids': state.get('track_ids', []),
+            'frame_seq': transition_frame.seq if transition_frame else None,
+            'capture_time': transition_frame.capture_time if transition_frame else None,
+            'latency': {component: round(seconds, 4) for component, seconds in latency.items()}
+        }
+    
+    def update_roi_state(self, roi_id, person_in_roi, frame=None, track_ids=None, frame_info=None):
+        """
+        ROI 상태 업데이트 및 API 이벤트 전송 판단
+        
+        track_ids: ROI 내부 트랙 ID 목록 (트래킹 사용 시) - 부재 이벤트에는 마지막으로 있던 트랙 ID가 실림
+        frame_info: 판정에 사용한 프레임의 FrameInfo - 상태가 바뀐 프레임은 이벤트의 frame_seq/capture_time이 되고
+                    캡처 → 알림 지연 시간 계산의 기준이 됨
+        
+        검출 스레드(handle_results)와 렌더링 스레드(모션 게이트)에서 모두 호출되므로 상태 변경은
+        roi_state_lock 안에서 하고, 부재 알림 API 전송(네트워크)은 락을 놓은 뒤에 한다.
+        """
+        event = None
+        absence_alert = None
+        
+        with self.roi_state_lock:
+            state = self.roi_states[roi_id]
+            current_time = self.clock.now()
+            
+            if track_ids:
+                state['track_ids'] = track_ids
+            
+            if person_in_roi:
+                # 사람 검출됨
+                if not state['person_detected']:
+                    # 처음 검출된 경우
+                    state['person_detected'] = True
+                    state['detection_start_time'] = current_time
+                    state['absence_start_time'] = None
+                    state['transition_frame'] = frame_info
+                else:
+                    # 계속 검출 중
+                    detection_duration = current_time - state['detection_start_time']
+                    
+                    # Presence threshold 초과 시 이벤트 전송
+                    if detection_duration >= self.presence_threshold:
+                        if state['last_status_sent'] != 'present':
+                            state['last_status_sent'] = 'present'
+                            state['detection_count'] += 1
+                            
+                            latency = self.record_alert_latency(
+                                'present', state['transition_frame'],
+                                state['detection_start_time'], current_time
+                            )
+                            event = self.build_event(roi_id, state, latency)
+            else:
+                # 사람 미검출
+                if state['person_detected']:
+                    # 이전에 검출되었다가 사라진 경우
+                    state['person_detected'] = False
+                    state['absence_start_time'] = current_time
+                    state['detection_start_time'] = None
+                    state['transition_frame'] = frame_info
+                elif state['absence_start_time'] is not None:
+                    # 계속 미검출 중
+                    absence_duration = current_time - state['absence_start_time']
+                    
+                    # Absence threshold 초과 시 이벤트 전송
+                    if absence_duration >= self.absence_threshold:
+                        if state['last_status_sent'] == 'present':
+                            state['last_status_sent'] = 'absent'
+                            absence_alert = (dict(state), current_time)
+            
+            status = {
                 'roi_id': roi_id,
                 'status': state['last_status_sent'] or 'None',
                 'count': state['detection_count'],
                 'person_detected': state['person_detected']
-            })
+            }
+        
+        if absence_alert is not None:
+            event_state, decided_time = absence_alert
+            
+            # 🚨 실시간 API 전송 (부재 상태) - 현재 프레임 포함
+            latency = self.send_alert(
+                roi_id=roi_id,
+                event_type='absent',
+                reason='Person absence detected',
+                frame=frame,
+                frame_info=event_state['transition_frame'],
+                observed_time=event_state['absence_start_time'],
+                decided_time=decided_time
+            )
+            print(f"[RealtimeDetector] ⏱️  {roi_id} 부재 알림 지연: 총 {latency['total']:.2f}초 "
+                  f"(검출 {latency['detection']:.2f} + 대기 {latency['threshold_wait']:.2f} "
+                  f"+ 전송 {latency['network']:.2f})")
+            event = self.build_event(roi_id, event_state, latency)
+        
+        # 이벤트 큐에 전송
+        if event is not None:
+            self.publish_event(event)
+        
+        # 상태 큐 업데이트
+        try:
+            self.stats_queue.put_nowait(status)
         except queue.Full:
             pass  # 큐가 가득 차면 무시
     
-    def draw_rois_and_detections(self, frame, detections):
-        """프레임에 ROI와 검출 결과 그리기 (얼굴 분석 결과 포함)"""
-        frame_copy = frame.copy()
+    def publish_event(self, event):
+        """
+        이벤트 큐에 전송 (논블로킹)
         
-        # ROI 그리기
-        for roi in self.roi_regions:
-            roi_id = roi['id']
-            state = self.roi_states[roi_id]
-            
-            # 상태에 따른 색상
-            color = (0, 255, 0) if state['person_detected'] else (0, 0, 255)
-            
-            if roi.get('type') == 'polygon' and 'points' in roi:
-                points = np.array(roi['points'], dtype=np.int32)
-                
-                # 반투명 채우기
-                overlay = frame_copy.copy()
-                cv2.fillPoly(overlay, [points], color)
-                cv2.addWeighted(overlay, 0.2, frame_copy, 0.8, 0, frame_copy)
-                
-                # 테두리
-                cv2.polylines(frame_copy, [points], True, color, 2)
-                
-                # ROI ID
-                M = cv2.moments(points)
-                if M["m00"] != 0:
-                    cx = int(M["m10"] / M["m00"])
-                    cy = int(M["m01"] / M["m00"])
-                    
-                    cv2.putText(frame_copy, roi_id, (cx - 30, cy - 20),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 3)
-                    cv2.putText(frame_copy, roi_id, (cx - 30, cy - 20),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-                    
-                    # 상태 표시
-                    status_text = f"{state['last_status_sent'] or 'None'}"
-                    cv2.putText(frame_copy, status_text, (cx - 30, cy + 10),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-                    
-                    # 카운트
-                    count_text = f"Count: {state['detection_count']}"
-                    cv2.putText(frame_copy, count_text, (cx - 30, cy + 30),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 2)
+        소비자가 없으면 (헤드리스 실행) 큐가 가득 차므로 가장 오래된 이벤트를 버리고 추가한다.
+        """
+        while True:
+            try:
+                self.event_queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.event_queue.get_nowait()
+                    self.events_dropped += 1
+                except queue.Empty:
+                    pass
+    
+    def draw_rois_and_detections(self, frame, detections, target=None):
+        """
+        프레임에 ROI와 검출 결과 그리기 (얼굴 분석 결과 포함)
+        
+        target: 그릴 버퍼 (frame과 같은 크기, None이면 새로 할당)
+        """
+        if target is None:
+            frame_copy = frame.copy()
+        else:
+            frame_copy = target
+            np.copyto(frame_copy, frame)
+        
+        # ROI 그리기 (캐시된 오버레이 레이어를 1회 블렌딩)
+        with self.roi_state_lock:
+            roi_states = {roi_id: dict(state) for roi_id, state in self.roi_states.items()}
+        self.roi_overlay.render(frame_copy, self.roi_regions, roi_states)
         
         # 검출된 사람 바운딩 박스 + 얼굴 분석 결과
         for detection in detections:
-            x1, y1, x2, y2 = map(int, detection['bbox'])
-            conf = detection['confidence']
+            x1, y1, x2, y2 = map(int, detection[BBOX_COLUMNS])
+            conf = float(detection[CONF_COLUMN])
+            
+            # 트랙 ID 표시 (트래킹 사용 시)
+            person_label = f"Person {conf:.2f}"
+            if len(detection) > TRACK_ID_COLUMN:
+                person_label = f"Person #{int(detection[TRACK_ID_COLUMN])} {conf:.2f}"
             
             # 사람 BBox
             cv2.rectangle(frame_copy, (x1, y1), (x2, y2), (255, 0, 0), 2)
             
             # 얼굴 분석 결과 표시
-            face_result = self.last_face_results.get(tuple(detection['bbox']))
+            face_result = self.last_face_results.get(detection_key(detection))
             
             if face_result and face_result.get('face_detected'):
                 # 표정 정보 추출 (딕셔너리 처리)
@@ -372,7 +581,7 @@ class RealtimeDetector:
                 
                 # 텍스트 준비
                 info_lines = [
-                    f"Person {conf:.2f}",
+                    person_label,
                     f"Eyes: {'Open' if face_result['eyes_open'] else 'Closed'}",
                     f"Mouth: {face_result['mouth_state']}",
                     f"Expr: {expr_text}",
@@ -404,7 +613,7 @@ class RealtimeDetector:
                     )
             else:
                 # 얼굴 분석 없을 때는 기본 표시
-                cv2.putText(frame_copy, f'Person {conf:.2f}', (x1, y1 - 10),
+                cv2.putText(frame_copy, person_label, (x1, y1 - 10),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
         
         # FPS 및 검출 간격 표시
@@ -421,138 +630,420 @@ class RealtimeDetector:
         
         return frame_copy
     
-    def process_frame(self, frame=None):
-        """단일 프레임 처리 (YOLO 추론은 설정된 간격마다만 수행)"""
-        # 프레임이 제공되지 않으면 카메라에서 읽기
-        if frame is None:
-            ret, frame = self.cap.read()
-            if not ret:
-                return None
+    def get_inference_input(self, frame):
+        """
+        YOLO 입력 이미지 준비
         
-        current_time = time.time()
-        detections = []
+        ROI 크롭 추론 모드에서는 모든 ROI의 합집합 경계 박스만 잘라서 추론한다.
         
-        # YOLO 추론을 설정된 간격(기본 1초)마다만 수행
-        if current_time - self.last_detection_time >= self.detection_interval:
-            print(f"[RealtimeDetector] YOLO 추론 실행 (간격: {self.detection_interval}초)")
+        Returns:
+            tuple: (입력 이미지, (offset_x, offset_y)) - 오프셋은 크롭 좌상단 좌표
+        """
+        if not self.roi_crop_inference:
+            return frame, (0, 0)
+        
+        frame_height, frame_width = frame.shape[:2]
+        key = (frame_width, frame_height, get_roi_geometry_key(self.roi_regions))
+        if key != self._roi_crop_key:
+            self._roi_crop_bounds = get_roi_union_bounds(
+                self.roi_regions, frame_width, frame_height, padding=self.roi_crop_padding
+            )
+            self._roi_crop_key = key
+            print(f"[RealtimeDetector] ROI 크롭 추론 영역: {self._roi_crop_bounds}")
+        
+        if self._roi_crop_bounds is None:
+            return frame, (0, 0)
+        
+        x1, y1, x2, y2 = self._roi_crop_bounds
+        return frame[y1:y2, x1:x2], (x1, y1)
+    
+    def decode_results(self, detections, offset=(0, 0)):
+        """
+        백엔드 사람 검출 배열 → 전체 프레임 좌표
+        
+        Args:
+            detections: (N, 5) 배열 [x1, y1, x2, y2, conf] (추론 입력 이미지 좌표, detect_persons() 결과)
+            offset: 크롭 추론 시 크롭 좌상단 좌표
+        
+        Returns:
+            numpy.ndarray: (N, 5) 검출 배열 [x1, y1, x2, y2, conf]
+        """
+        # 배치 추론(DetectorPool)은 카메라 중 가장 낮은 임계값으로 추론하므로 이 카메라 임계값으로 다시 거름
+        if len(detections) and detections[:, CONF_COLUMN].min() < self.confidence_threshold:
+            detections = detections[detections[:, CONF_COLUMN] >= self.confidence_threshold]
+        
+        # 크롭 좌표 → 전체 프레임 좌표
+        offset_x, offset_y = offset
+        if offset_x or offset_y:
+            detections[:, [0, 2]] += offset_x
+            detections[:, [1, 3]] += offset_y
+        
+        return detections
+    
+    def infer(self, frame):
+        """
+        YOLO 추론 1회
+        
+        Returns:
+            numpy.ndarray: (N, 5) 검출 배열 [x1, y1, x2, y2, conf] (전체 프레임 좌표)
+        """
+        print(f"[RealtimeDetector] YOLO 추론 실행 (간격: {self.detection_interval}초)")
+        
+        with self.pipeline_stats.measure('preprocess'):
+            image, offset = self.get_inference_input(frame)
+        
+        # 사람 클래스만 추론 (백엔드별 전처리/후처리 포함, NMS 전에 사람/신뢰도로 제한)
+        with self.pipeline_stats.measure('inference'):
+            detections = self.backend.detect_persons(
+                [image], self.confidence_threshold, self.person_class_id
+            )[0]
+            return self.decode_results(detections, offset)
+    
+    def run_detection(self, frame, current_time=None, frame_info=None, pooled_frame=None):
+        """
+        YOLO 추론 + ROI 판정 + 얼굴 분석 + ROI 상태 업데이트 (1회)
+        
+        동기 모드에서는 process_frame()에서, 비동기 모드에서는 InferenceWorker 스레드에서 호출된다.
+        
+        Returns:
+            numpy.ndarray: (N, 5) 검출 배열 [x1, y1, x2, y2, conf]
+        """
+        detections = self.infer(frame)
+        return self.handle_results(frame, detections, current_time, frame_info, pooled_frame)
+    
+    def handle_results(self, frame, detections, current_time=None, frame_info=None, pooled_frame=None):
+        """
+        검출 결과 처리 (ROI 판정 + 얼굴 분석 + ROI 상태 업데이트)
+        
+        DetectorPool은 여러 카메라를 한 번에 배치 추론한 뒤 카메라별로 이 메서드를 호출한다.
+        
+        Args:
+            frame: 추론에 사용한 원본 프레임
+            detections: (N, 5) 검출 배열 [x1, y1, x2, y2, conf] (전체 프레임 좌표)
+            current_time: 검출 시각 (None이면 현재 시각)
+            frame_info: 프레임의 FrameInfo (캡처 시퀀스 번호/시각, 이벤트 지연 추적용)
+            pooled_frame: frame을 담은 PooledFrame (얼굴 분석 워커 결과가 올 때까지 참조 유지,
+                          None이면 워커에 제출할 때 풀 버퍼에 1회 복사)
+        
+        Returns:
+            numpy.ndarray: (N, 5) 검출 배열 [x1, y1, x2, y2, conf]
+        """
+        if current_time is None:
+            current_time = self.clock.now()
+        
+        self.inferences_run += 1
+        roi_start = time.perf_counter()
+        
+        # ROI 라벨 맵 확인 (ROI/해상도가 바뀌어 트래커를 초기화하는 경우 이번 프레임의 트랙 ID 부여보다 먼저)
+        roi_label_map = self.get_roi_label_map(frame)
+        
+        # 트랙 ID 부여 ((N, 6) 배열 [x1, y1, x2, y2, conf, track_id])
+        if self.tracker is not None:
+            detections = self.tracker.update(detections, current_time)
+        
+        # 각 ROI 확인 (라벨 맵에서 모든 박스 중심점을 한 번에 조회)
+        roi_membership = roi_label_map.assign_boxes(detections[:, BBOX_COLUMNS])
+        roi_seconds = time.perf_counter() - roi_start
+        
+        # 얼굴 분석 (옵션)
+        face_analysis_results = {}
+        face_start = time.perf_counter()
+        if self.enable_face_analysis and self.face_workers is not None:
+            # 워커 프로세스에 제출만 하고 (대기 없음) 이전에 제출한 결과 중 도착한 것을 처리
+            detection_keys = [detection_key(detection) for detection in detections]
+            face_analysis_results = {
+                key: result for key, result in self.last_face_results.items() if key in detection_keys
+            }
             
-            # YOLO 추론 (NumPy 호환성 개선)
-            try:
-                # NumPy 배열을 명시적으로 contiguous하게 변환
-                frame_input = np.ascontiguousarray(frame)
-                results = self.model(frame_input, verbose=False)
-            except RuntimeError as e:
-                print(f"[RealtimeDetector] ⚠️  YOLO 추론 실패: {e}")
-                # 프레임을 복사하여 재시도
-                frame_input = frame.copy()
-                results = self.model(frame_input, verbose=False)
-            
-            # 검출된 사람들
-            detections = []
-            
-            # 각 ROI 확인
-            for roi in self.roi_regions:
-                roi_id = roi['id']
-                person_in_roi = False
+            # 슬롯이 부족하면 우선순위가 높은 사람부터 제출 (스케줄러 사용 시)
+            targets = [
+                index for index, inside_rois in enumerate(roi_membership)
+                if not self.face_analysis_roi_only or inside_rois.any()
+            ]
+            if self.face_scheduler is not None:
+                order = self.face_scheduler.plan(
+                    [(detection_keys[index], bool(roi_membership[index].any())) for index in targets], current_time
+                )
+                targets = [targets[i] for i in order]
+            
+            # 시간 예산은 검출 스레드가 쓰는 제출 시간(크롭 복사/축소)에 적용
+            # 제출한 작업마다 이 프레임의 참조를 보관 (결과의 알림 스냅샷/FrameInfo는 분석한 프레임 기준)
+            submitted = 0
+            snapshot = None
+            for index in targets:
+                if self.face_scheduler is not None and not self.face_scheduler.fits(time.perf_counter() - face_start, submitted):
+                    break
                 
-                for result in results:
-                    boxes = result.boxes
-                    for box in boxes:
-                        cls = int(box.cls[0])
-                        conf = float(box.conf[0])
-                        
-                        if cls == self.person_class_id and conf >= self.confidence_threshold:
-                            # NumPy 변환 안전성 개선
-                            try:
-                                bbox = box.xyxy[0].cpu().numpy()
-                            except:
-                                bbox = np.array(box.xyxy[0].cpu())
-                            
-                            detections.append({
-                                'bbox': bbox,
-                                'confidence': conf
-                            })
-                            
-                            if self.is_person_in_polygon_roi(bbox, roi):
-                                person_in_roi = True
+                inside_rois = roi_membership[index]
+                person_roi = roi_label_map.roi_ids[int(np.argmax(inside_rois))] if inside_rois.any() else None
+                submit_start = time.perf_counter()
+                key = detection_keys[index]
+                if self.face_workers.submit(
+                    self.face_worker_owner, key, frame, detections[index, BBOX_COLUMNS], context=person_roi
+                ):
+                    submitted += 1
+                    if snapshot is None:
+                        snapshot = (pooled_frame.retain() if pooled_frame is not None
+                                    else self.frame_pool.copy_of(frame, frame_info))
+                    # 같은 키의 이전 프레임은 결과가 오지 않은 작업(워커 종료로 회수)의 것
+                    previous = self.face_worker_frames.pop(key, None)
+                    if previous is not None:
+                        previous.release()
+                    self.face_worker_frames[key] = snapshot.retain()
+                    if self.face_scheduler is not None:
+                        self.face_scheduler.record_cost(time.perf_counter() - submit_start)
+            if snapshot is not None:
+                snapshot.release()
+            
+            for key, face_result, person_roi in self.face_workers.poll(self.face_worker_owner):
+                submitted_frame = self.face_worker_frames.pop(key, None)
+                try:
+                    if self.face_scheduler is not None:
+                        self.face_scheduler.record(key, face_result, current_time)
+                    if not face_result:
+                        face_analysis_results.pop(key, None)
+                        continue
+                    if key in detection_keys:
+                        face_analysis_results[key] = face_result
+                    if submitted_frame is None:
+                        continue
+                    try:
+                        self.handle_face_result(
+                            face_result, person_roi, submitted_frame.array, submitted_frame.info, current_time
+                        )
+                    except Exception as e:
+                        print(f"[RealtimeDetector] ⚠️  얼굴 분석 실패: {e}")
+                finally:
+                    if submitted_frame is not None:
+                        submitted_frame.release()
+            
+            face_seconds = time.perf_counter() - face_start
+            if self.face_scheduler is not None:
+                self.face_scheduler.end_cycle(submitted, len(targets), face_seconds)
+            self.pipeline_stats.record('face', face_seconds)
+        
+        elif self.enable_face_analysis and (self.face_analyzer or self.face_contexts is not None):
+            print(f"[RealtimeDetector] 얼굴 분석 실행 ({len(detections)}명 검출)")
+            
+            # 사라진 트랙의 FaceMesh 컨텍스트 반납
+            if self.face_contexts is not None:
+                self.face_contexts.retain(self.tracker.get_track_ids())
+            
+            # 분석 대상 (ROI 내부 사람만 분석 옵션)
+            if self.face_analysis_roi_only:
+                targets = np.flatnonzero(roi_membership.any(axis=1))
+            else:
+                targets = np.arange(len(detections))
+            target_keys = [detection_key(detections[index]) for index in targets]
             
-            # 얼굴 분석 (옵션)
-            face_analysis_results = {}
-            if self.enable_face_analysis and self.face_analyzer:
-                print(f"[RealtimeDetector] 얼굴 분석 실행 ({len(detections)}명 검출)")
+            # 시간 예산: 우선순위 순서로 분석하고 예산을 넘는 사람은 이전 결과를 유지한 채 다음 주기로
+            if self.face_scheduler is not None:
+                order = self.face_scheduler.plan(
+                    [(key, bool(roi_membership[index].any())) for key, index in zip(target_keys, targets)],
+                    current_time
+                )
+                targets = targets[order]
+                target_keys = [target_keys[i] for i in order]
+                face_analysis_results = {
+                    key: result for key, result in self.last_face_results.items() if key in target_keys
+                }
+            
+            # 모자이크는 타일 수만큼씩 FaceMesh 한 번에 (예산은 패스 단위로 확인)
+            batch_size = self.face_mosaic_grid ** 2 if self.face_mosaic else 1
+            passes = 0
+            processed = 0
+            for start in range(0, len(targets), batch_size):
+                if self.face_scheduler is not None and not self.face_scheduler.fits(time.perf_counter() - face_start, passes):
+                    break
                 
-                for detection in detections:
-                    bbox = detection['bbox']
-                    
-                    # ROI 내부 사람만 분석 옵션
-                    if self.face_analysis_roi_only:
-                        person_in_any_roi = False
-                        for roi in self.roi_regions:
-                            if self.is_person_in_polygon_roi(bbox, roi):
-                                person_in_any_roi = True
-                                break
-                        
-                        if not person_in_any_roi:
-                            continue  # ROI 밖이면 건너뛰기
+                batch = targets[start:start + batch_size]
+                batch_keys = target_keys[start:start + batch_size]
+                batch_start = time.perf_counter()
+                try:
+                    if self.face_mosaic:
+                        keys = batch_keys if self.tracker is not None else None
+                        face_results = self.face_analyzer.analyze_faces(frame, detections[batch][:, BBOX_COLUMNS], keys)
+                    elif self.face_contexts is not None:
+                        face_results = [self.face_contexts.analyze_face(batch_keys[0], frame, detections[batch[0], BBOX_COLUMNS])]
+                    else:
+                        face_results = [self.face_analyzer.analyze_face(frame, detections[batch[0], BBOX_COLUMNS])]
+                except Exception as e:
+                    print(f"[RealtimeDetector] ⚠️  얼굴 분석 실패: {e}")
+                    face_results = [None] * len(batch)
+                
+                passes += 1
+                processed += len(batch)
+                if self.face_scheduler is not None:
+                    self.face_scheduler.record_cost(time.perf_counter() - batch_start)
+                
+                for index, key, face_result in zip(batch, batch_keys, face_results):
+                    if self.face_scheduler is not None:
+                        self.face_scheduler.record(key, face_result, current_time)
+                    if not face_result:
+                        face_analysis_results.pop(key, None)
+                        continue
                     
-                    # 얼굴 분석 수행
+                    face_analysis_results[key] = face_result
+                    inside_rois = roi_membership[index]
+                    person_roi = roi_label_map.roi_ids[int(np.argmax(inside_rois))] if inside_rois.any() else None
                     try:
-                        face_result = self.face_analyzer.analyze_face(frame, bbox)
-                        if face_result:
-                            face_analysis_results[tuple(bbox)] = face_result
-                            
-                            # 표정 정보 추출 (딕셔너리 처리)
-                            expr_info = face_result.get('expression', {})
-                            if isinstance(expr_info, dict):
-                                expression = expr_info.get('expression', 'unknown')
-                                confidence = expr_info.get('confidence', 0)
-                                expr_text = f"{expression} ({confidence:.2f})"
-                            else:
-                                expression = 'unknown'
-                                expr_text = str(expr_info)
-                            
-                            print(f"[RealtimeDetector] ✅ 얼굴 분석 완료: Eyes={'Open' if face_result['eyes_open'] else 'Closed'}, Mouth={face_result['mouth_state']}, Expression={expr_text}")
-                            
-                            # 🚨 SAD 표정 감지 시 실시간 API 전송
-                            if expression == 'sad' and confidence > 0.6:
-                                # 어느 ROI에 속하는지 확인
-                                person_roi = None
-                                for roi in self.roi_regions:
-                                    if self.is_person_in_polygon_roi(bbox, roi):
-                                        person_roi = roi['id']
-                                        break
-                                
-                                if person_roi:
-                                    # Cooldown 체크 (같은 ROI에서 10초 내 중복 전송 방지)
-                                    last_sad_time = self.last_sad_api_time.get(person_roi, 0)
-                                    if current_time - last_sad_time >= self.sad_api_cooldown:
-                                        self.send_realtime_api(
-                                            roi_id=person_roi,
-                                            event_type='sad_expression',
-                                            reason=f'SAD expression detected (confidence: {confidence:.2f})',
-                                            frame=frame
-                                        )
-                                        self.last_sad_api_time[person_roi] = current_time
+                        self.handle_face_result(face_result, person_roi, frame, frame_info, current_time)
                     except Exception as e:
                         print(f"[RealtimeDetector] ⚠️  얼굴 분석 실패: {e}")
             
-            # 얼굴 분석 결과 저장
-            self.last_face_results = face_analysis_results
+            face_seconds = time.perf_counter() - face_start
+            if self.face_scheduler is not None:
+                self.face_scheduler.end_cycle(processed, len(targets), face_seconds)
+            self.pipeline_stats.record('face', face_seconds)
+        
+        # 얼굴 분석 결과 저장
+        self.last_face_results = face_analysis_results
+        
+        # ROI 상태 업데이트 (ROI별, 현재 프레임 전달)
+        roi_start = time.perf_counter()
+        for roi_index, roi_id in enumerate(roi_label_map.roi_ids):
+            person_in_roi = bool(roi_membership[:, roi_index].any())
+            with self.roi_state_lock:
+                self.last_roi_presence[roi_id] = person_in_roi
             
-            # ROI 상태 업데이트 (현재 프레임 전달)
-            self.update_roi_state(roi_id, person_in_roi, frame=frame)
+            track_ids = None
+            if self.tracker is not None:
+                track_ids = [int(t) for t in detections[roi_membership[:, roi_index], TRACK_ID_COLUMN]]
             
-            # 검출 결과 저장 (다음 프레임들에서 재사용)
-            self.last_detections = detections
-            self.last_detection_time = current_time
+            self.update_roi_state(
+                roi_id, person_in_roi, frame=frame, track_ids=track_ids, frame_info=frame_info
+            )
+        self.pipeline_stats.record('roi', roi_seconds + time.perf_counter() - roi_start)
+        
+        # 렌더링에 넘기는 스냅샷은 읽기 전용 (비동기 모드는 추론 워커의 latest_result()로 게시됨)
+        detections.setflags(write=False)
+        if self.inference_worker is None:
+            self.sync_detections = detections
+        
+        return detections
+    
+    def is_detection_due(self, current_time):
+        """설정된 검출 간격이 지났는지 확인"""
+        return current_time - self.last_detection_time >= self.detection_interval
+    
+    def handle_face_result(self, face_result, person_roi, frame, frame_info, current_time):
+        """
+        얼굴 분석 결과 처리 (로그 + SAD 표정 실시간 API 전송)
+        
+        Args:
+            face_result: analyze_face() 결과
+            person_roi: 사람이 속한 ROI ID (ROI 밖이면 None)
+            frame: 알림에 첨부할 프레임
+            frame_info: 분석한 프레임의 FrameInfo (캡처→알림 지연 추적용)
+            current_time: 현재 시각 (쿨다운 판단)
+        """
+        # 표정 정보 추출 (딕셔너리 처리)
+        expr_info = face_result.get('expression', {})
+        if isinstance(expr_info, dict):
+            expression = expr_info.get('expression', 'unknown')
+            confidence = expr_info.get('confidence', 0)
+            expr_text = f"{expression} ({confidence:.2f})"
         else:
-            # 이전 검출 결과 재사용 (YOLO 추론 생략)
-            detections = self.last_detections
+            expression = 'unknown'
+            expr_text = str(expr_info)
         
-        # 시각화 (매 프레임마다 수행 - 부드러운 영상)
-        annotated_frame = self.draw_rois_and_detections(frame, detections)
+        print(f"[RealtimeDetector] ✅ 얼굴 분석 완료: Eyes={'Open' if face_result['eyes_open'] else 'Closed'}, Mouth={face_result['mouth_state']}, Expression={expr_text}")
+        
+        # 🚨 SAD 표정 감지 시 실시간 API 전송
+        if expression == 'sad' and confidence > self.sad_alert_confidence:
+            if person_roi:
+                # Cooldown 체크 (같은 ROI에서 10초 내 중복 전송 방지)
+                last_sad_time = self.last_sad_api_time.get(person_roi, 0)
+                if current_time - last_sad_time >= self.sad_api_cooldown:
+                    alert_time = self.clock.now()
+                    self.send_alert(
+                        roi_id=person_roi,
+                        event_type='sad_expression',
+                        reason=f'SAD expression detected (confidence: {confidence:.2f})',
+                        frame=frame,
+                        frame_info=frame_info,
+                        observed_time=alert_time,
+                        decided_time=alert_time
+                    )
+                    self.last_sad_api_time[person_roi] = current_time
+    
+    def check_motion_gate(self, frame, current_time, frame_info=None):
+        """
+        모션 게이트 확인
+        
+        정지 장면이면 YOLO를 생략하고, 마지막 판정 결과로 ROI 상태를 갱신하여
+        존재/부재 타이머가 계속 진행되도록 한다.
+        
+        Returns:
+            bool: True면 YOLO 추론 실행
+        """
+        if self.motion_gate is None:
+            return True
+        
+        if self.motion_gate.should_infer(frame, self.roi_regions, current_time):
+            return True
+        
+        with self.roi_state_lock:
+            last_presence = list(self.last_roi_presence.items())
+        for roi_id, person_in_roi in last_presence:
+            self.update_roi_state(roi_id, person_in_roi, frame=frame, frame_info=frame_info)
+        return False
+    
+    def process_frame(self, frame=None):
+        """
+        단일 프레임 처리 (YOLO 추론은 설정된 간격마다만 수행)
+        
+        Args:
+            frame: read_frame()의 PooledFrame (FrameInfo 포함) 또는 BGR 배열 (None이면 카메라에서 읽기)
         
-        # FPS 계산 (화면 FPS)
+        Returns:
+            PooledFrame: 시각화된 프레임 버퍼 (호출자가 release 또는 publish_frames로 전달)
+                         뷰어가 없어 그리기를 생략하면 None
+        """
+        # 프레임이 제공되지 않으면 카메라에서 읽기
+        if frame is None:
+            buffer = self.read_frame()
+            if buffer is None:
+                return None
+            try:
+                return self.process_frame(buffer)
+            finally:
+                buffer.release()
+        
+        # 캡처 정보 (시퀀스 번호/캡처 시각)는 검출 → ROI 상태 → 이벤트까지 전달
+        frame_info = None
+        pooled_frame = None
+        if isinstance(frame, PooledFrame):
+            frame_info = frame.info
+            pooled_frame = frame
+            frame = frame.array
+        
+        current_time = self.clock.now()
+        
+        # YOLO 추론을 설정된 간격(기본 1초)마다만 수행
+        if self.is_detection_due(current_time):
+            self.last_detection_time = current_time
+            
+            # 모션 게이트: 정지 장면이면 YOLO 생략
+            if self.check_motion_gate(frame, current_time, frame_info):
+                if self.inference_worker is not None:
+                    # 비동기: 추론 워커에 프레임만 넘기고 바로 렌더링 (워커가 바쁘면 최신 프레임으로 교체됨)
+                    # 캡처 버퍼는 곧 재사용되므로 풀 버퍼에 복사해서 넘김 (추론 간격마다 1회)
+                    with self.pipeline_stats.measure('queue'):
+                        self.inference_worker.submit(self.frame_pool.copy_of(frame, frame_info), current_time)
+                else:
+                    self.run_detection(frame, current_time, frame_info, pooled_frame)
+        
+        return self.render_frame(frame)
+    
+    def render_frame(self, frame):
+        """
+        가장 최근 검출 결과로 프레임 시각화 + 화면 FPS 계산
+        
+        Returns:
+            PooledFrame: 시각화된 프레임 버퍼 (풀에서 할당), 뷰어가 없으면 None
+        """
+        # FPS 계산 (화면 FPS - 그리기 생략 시에도 처리 루프 속도로 집계)
         self.frame_count += 1
         elapsed_time = time.time() - self.fps_start_time
         if elapsed_time > 1.0:
@@ -560,13 +1051,107 @@ class RealtimeDetector:
             self.frame_count = 0
             self.fps_start_time = time.time()
         
+        # 뷰어가 없으면 시각화 생략
+        if not self.update_viewer_state():
+            self.frames_render_skipped += 1
+            return None
+        
+        # 가장 최근 검출 결과 사용 (비동기 모드에서는 추론 완료를 기다리지 않음)
+        # 트래킹 사용 시 추론 사이 프레임은 트랙 위치를 예측
+        if self.tracker is not None:
+            detections = self.tracker.predict(self.clock.now())
+        else:
+            detections = self.latest_detections()
+        
+        # 시각화 (매 프레임마다 수행 - 부드러운 영상)
+        with self.pipeline_stats.measure('render'):
+            annotated_frame = self.frame_pool.acquire(frame.shape, frame.dtype)
+            self.draw_rois_and_detections(frame, detections, target=annotated_frame.array)
+        self.frames_rendered += 1
+        
         return annotated_frame
     
-    def run(self):
-        """백그라운드 검출 루프"""
-        print("[RealtimeDetector] 검출 시작")
+    def latest_detections(self):
+        """
+        렌더링에 사용할 가장 최근 검출 결과 (읽기 전용 스냅샷)
+        
+        비동기 모드는 추론 워커가 게시한 결과를, 동기 모드/DetectorPool은 같은 스레드에서 처리한 마지막 결과를 사용한다.
+        """
+        if self.inference_worker is not None:
+            result = self.inference_worker.latest_result()
+            return result['result'] if result is not None else empty_detections()
+        return self.sync_detections
+    
+    def has_viewer(self, current_time=None):
+        """시각화 프레임을 읽는 뷰어가 있는지 (viewer_timeout 이내에 get_latest_frame() 호출)"""
+        if not self.enable_rendering:
+            return False
+        if not self.render_on_demand:
+            return True
+        if self.last_viewer_time is None:
+            return False
+        if current_time is None:
+            current_time = time.time()
+        return current_time - self.last_viewer_time <= self.viewer_timeout
+    
+    def update_viewer_state(self):
+        """
+        뷰어 연결/해제 감지
+        
+        뷰어가 떠나면 큐에 남은 시각화 프레임을 비워서, 다시 연결됐을 때 오래된 프레임이 보이지 않게 한다.
+        
+        Returns:
+            bool: 뷰어 존재 여부
+        """
+        viewer = self.has_viewer()
+        if viewer != self.viewer_attached:
+            self.viewer_attached = viewer
+            if viewer:
+                print("[RealtimeDetector] 👀 뷰어 연결됨 - 시각화 재개")
+            else:
+                print(f"[RealtimeDetector] 뷰어 없음 ({self.viewer_timeout}초) - 시각화 생략")
+                self._drain_frame_queue(self.frame_queue)
+        return viewer
+    
+    @staticmethod
+    def _drain_frame_queue(frame_queue):
+        """큐의 프레임 버퍼를 모두 풀에 반환"""
+        while True:
+            try:
+                frame_queue.get_nowait().release()
+            except queue.Empty:
+                return
+    
+    def publish_frames(self, original_frame, annotated_frame):
+        """
+        시각화 프레임/원본 프레임을 UI 큐에 전송 (가득 차면 오래된 프레임 교체)
         
-        # 카메라 열기 (CameraSourceManager 사용)
+        두 PooledFrame의 참조는 큐로 넘어간다 (복사 없음).
+        annotated_frame이 None이면 (뷰어 없음) 원본 프레임만 전송한다.
+        """
+        with self.pipeline_stats.measure('queue'):
+            # 시각화된 프레임 큐에 전송 (UI 표시용)
+            if annotated_frame is not None:
+                self._put_latest(self.frame_queue, annotated_frame)
+            
+            # 원본 프레임 큐에 전송 (테스트 API 전송용 - 순수 카메라 이미지)
+            self._put_latest(self.original_frame_queue, original_frame)
+    
+    @staticmethod
+    def _put_latest(frame_queue, buffer):
+        """큐에 프레임 버퍼 추가 (가득 차면 가장 오래된 버퍼를 풀에 반환하고 교체)"""
+        while True:
+            try:
+                frame_queue.put_nowait(buffer)
+                return
+            except queue.Full:
+                try:
+                    frame_queue.get_nowait().release()
+                except queue.Empty:
+                    pass
+    
+    def open_capture(self):
+        """카메라 열기 (CameraSourceManager 사용)"""
         if CAMERA_UTILS_AVAILABLE:
             print(f"[RealtimeDetector] CameraSourceManager로 카메라 열기")
             
@@ -591,51 +1176,140 @@ class RealtimeDetector:
         
         if not self.cap or not self.cap.isOpened():
             print(f"[RealtimeDetector] ❌ 카메라를 열 수 없습니다: {self.camera_source}")
-            return
+            return False
         
         print("[RealtimeDetector] ✅ 카메라 열림 성공")
         
+        # 새 소스 (또는 재연결) - 이전 소스의 트랙 폐기
+        if self.tracker is not None:
+            self.tracker.reset()
+        return True
+    
+    def start_capture(self):
+        """캡처 전용 스레드 시작 (open_capture() 이후 호출)"""
+        # 비디오 파일은 원래 FPS로 재생 (최신 프레임 슬롯에서 프레임이 모두 버려지지 않도록)
+        pace_fps = None
+        source_type = self.camera_source_type
+        if source_type is None and CAMERA_UTILS_AVAILABLE:
+            source_type = CameraSourceManager.detect_source_type(self.camera_source)
+        if source_type in ('file', 'image_sequence'):
+            pace_fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        else:
+            # 드라이버 버퍼 최소화 (지원하지 않는 백엔드는 무시됨)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        self.grabber = FrameGrabber(
+            self.cap, name=str(self.camera_source), pace_fps=pace_fps,
+            buffer_pool=self.frame_pool, stats=self.pipeline_stats, clock=self.clock
+        )
+        self.last_frame_seq = 0
+        self.frames_dropped = 0
+        self.grabber.start()
+    
+    def read_frame(self, timeout=1.0):
+        """
+        다음 처리할 프레임 가져오기
+        
+        캡처 스레드 사용 시 최신 프레임 슬롯에서 가져오고, 건너뛴 프레임 수를 집계한다.
+        
+        Returns:
+            PooledFrame 또는 None (카메라 종료/읽기 실패) - 호출자가 release
+        """
+        if self.grabber is None:
+            with self.pipeline_stats.measure('capture'):
+                buffer = self.frame_pool.read_from(self.cap)
+            if buffer is not None:
+                self.last_frame_seq += 1
+                buffer.info = FrameInfo(self.last_frame_seq, self.clock.frame_timestamp(self.cap))
+            return buffer
+        
         while self.running:
-            # 원본 프레임 읽기
-            ret, original_frame = self.cap.read()
-            if not ret or original_frame is None:
+            item = self.grabber.slot.get(self.last_frame_seq, timeout=timeout)
+            if item is None:
+                if self.grabber.slot.closed:
+                    return None
+                continue  # 타임아웃 - 새 프레임 대기 계속
+            
+            seq, _, frame = item
+            if self.last_frame_seq:
+                self.frames_dropped += seq - self.last_frame_seq - 1
+            self.last_frame_seq = seq
+            return frame
+        
+        return None
+    
+    def poll_frame(self):
+        """
+        캡처 슬롯에 새 프레임이 있으면 가져오기 (논블로킹, DetectorPool용)
+        
+        Returns:
+            PooledFrame 또는 None (새 프레임 없음) - 호출자가 release
+        """
+        item = self.grabber.slot.get(self.last_frame_seq, timeout=0)
+        if item is None:
+            return None
+        
+        seq, _, frame = item
+        if self.last_frame_seq:
+            self.frames_dropped += seq - self.last_frame_seq - 1
+        self.last_frame_seq = seq
+        return frame
+    
+    def run(self):
+        """백그라운드 검출 루프"""
+        print("[RealtimeDetector] 검출 시작")
+        
+        if not self.open_capture():
+            return
+        
+        if self.use_capture_thread:
+            self.start_capture()
+        
+        if self.async_inference:
+            self.inference_worker = InferenceWorker(self.run_detection, name=str(self.camera_source))
+            self.inference_worker.start()
+        
+        while self.running:
+            # 원본 프레임 읽기 (캡처 스레드 사용 시 최신 프레임)
+            original_frame = self.read_frame()
+            if original_frame is None:
                 print("[RealtimeDetector] 프레임 읽기 실패")
                 break
             
             # 프레임 처리 (검출 및 시각화)
             annotated_frame = self.process_frame(original_frame)
             
-            if annotated_frame is None:
-                continue
-            
-            # 시각화된 프레임 큐에 전송 (UI 표시용)
-            try:
-                self.frame_queue.put_nowait(annotated_frame)
-            except queue.Full:
-                # 큐가 가득 차면 오래된 프레임 제거 후 새 프레임 추가
-                try:
-                    self.frame_queue.get_nowait()
-                    self.frame_queue.put_nowait(annotated_frame)
-                except:
-                    pass
-            
-            # 원본 프레임 큐에 전송 (테스트 API 전송용 - 순수 카메라 이미지)
-            try:
-                self.original_frame_queue.put_nowait(original_frame.copy())
-            except queue.Full:
-                # 큐가 가득 차면 오래된 프레임 제거 후 새 프레임 추가
-                try:
-                    self.original_frame_queue.get_nowait()
-                    self.original_frame_queue.put_nowait(original_frame.copy())
-                except:
-                    pass
+            # 원본은 스냅샷용으로 항상 전송 (시각화 프레임은 뷰어가 있을 때만)
+            self.publish_frames(original_frame, annotated_frame)
         
-        self.cap.release()
+        if self.inference_worker:
+            self.inference_worker.stop()
+            self.inference_worker = None
+        
+        self.close_capture()
         print("[RealtimeDetector] 검출 종료")
     
+    def close_capture(self):
+        """캡처 스레드 중지 및 카메라 해제 (캡처 슬롯/UI 큐에 남은 프레임 버퍼는 풀에 반환)"""
+        if self.grabber:
+            self.grabber.stop()
+            print(f"[RealtimeDetector] 캡처 {self.grabber.frames_captured} 프레임, 건너뜀 {self.frames_dropped} 프레임")
+            self.grabber = None
+        
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+        
+        self._drain_frame_queue(self.frame_queue)
+        self._drain_frame_queue(self.original_frame_queue)
+    
     def start(self):
         """백그라운드 스레드 시작"""
         if not self.running:
+            # 중지 후 다시 시작하는 경우 반납했던 얼굴 분석기를 다시 대여
+            if (self.enable_face_analysis and self.face_analyzer is None
+                    and self.face_contexts is None and self.face_workers is None):
+                self.acquire_face_analyzer()
             self.running = True
             self.thread = threading.Thread(target=self.run, daemon=True)
             self.thread.start()
@@ -646,23 +1320,119 @@ class RealtimeDetector:
         self.running = False
         if self.thread:
             self.thread.join(timeout=2)
+        
+        # 검출 스레드가 끝났을 때만 얼굴 분석기 반납 (아직 사용 중이면 반납하지 않음)
+        if self.thread is None or not self.thread.is_alive():
+            self.release_face_analyzer()
         print("[RealtimeDetector] 중지됨")
     
+    def acquire_face_analyzer(self):
+        """
+        모델 레지스트리에서 FaceAnalyzer 대여 (실패 시 얼굴 분석 비활성화)
+        
+        워커 프로세스 사용 시(face_workers > 0)에는 레지스트리의 공유 워커 풀을 대여한다
+        (워커마다 트랙별 분석기를 face_track_contexts개까지 유지, 카메라가 여러 대여도 풀은 1개).
+        모자이크 분석은 타일 수만큼 얼굴을 찾는 정지 이미지 모드 분석기 1개를 사용한다
+        (트래킹이 켜져 있어도 트랙별 컨텍스트 대신 사용되며, EAR/MAR 평균만 트랙별로 유지).
+        트래킹 사용 시에는 트랙별 컨텍스트 풀을 만들고, 첫 트랙의 분석기를 미리 대여했다가
+        풀에 돌려놓는다 (MediaPipe 초기화 실패를 시작 시점에 확인).
+        """
+        try:
+            if self.face_worker_count > 0:
+                self.face_workers = model_registry.acquire_face_worker_pool(
+                    num_workers=self.face_worker_count,
+                    max_crop_size=self.face_worker_max_crop,
+                    contexts_per_worker=self.face_track_contexts
+                )
+                self.face_worker_owner = self.face_workers.register()
+                return
+            if self.face_mosaic:
+                tiles = self.face_mosaic_grid ** 2
+                if self.tracker is not None:
+                    print("[RealtimeDetector] ⚠️  face_mosaic 사용 - 트랙별 FaceMesh 컨텍스트(face_track_contexts) 대신 "
+                          "모자이크 FaceMesh(정지 이미지 모드)로 분석 (EAR/MAR 평균은 트랙별 유지)")
+                self.face_analyzer = model_registry.acquire_face_analyzer(max_num_faces=tiles, static_image_mode=True)
+                print(f"[RealtimeDetector] ✅ FaceAnalyzer 초기화 완료 (모자이크 {self.face_mosaic_grid}x{self.face_mosaic_grid})")
+                return
+            if self.tracker is not None:
+                self.face_contexts = FaceContextPool(max_contexts=self.face_track_contexts)
+                model_registry.release_face_analyzer(model_registry.acquire_face_analyzer(max_num_faces=1))
+                print(f"[RealtimeDetector] ✅ 트랙별 FaceAnalyzer 풀 준비 완료 (최대 {self.face_contexts.max_contexts}개)")
+                return
+            self.face_analyzer = model_registry.acquire_face_analyzer()
+            print("[RealtimeDetector] ✅ FaceAnalyzer 초기화 완료")
+        except Exception as e:
+            print(f"[RealtimeDetector] ⚠️  FaceAnalyzer 초기화 실패: {e}")
+            self.face_contexts = None
+            self.face_workers = None
+            self.enable_face_analysis = False
+    
+    def release_face_analyzer(self):
+        """FaceAnalyzer를 모델 레지스트리에 반납 (다음 검출기가 재사용)"""
+        if self.face_workers is not None:
+            self.face_workers.unregister(self.face_worker_owner)
+            model_registry.release_face_worker_pool(self.face_workers)
+            while self.face_worker_frames:
+                _, submitted_frame = self.face_worker_frames.popitem()
+                submitted_frame.release()
+            self.face_workers = None
+            self.face_worker_owner = None
+        if self.face_contexts is not None:
+            self.face_contexts.release_all()
+            self.face_contexts = None
+        if self.face_analyzer is not None:
+            model_registry.release_face_analyzer(self.face_analyzer)
+            self.face_analyzer = None
+    
     def get_latest_frame(self, original=False):
         """
         최신 프레임 가져오기 (논블로킹)
         
+        시각화 프레임 요청은 뷰어 활동으로 기록된다 (render_on_demand: 뷰어가 없으면 그리기 생략).
+        
         Args:
             original: True면 원본 프레임 (ROI/라벨 없음), False면 시각화된 프레임
+        
+        Returns:
+            PooledFrame 또는 None - 큐의 풀 버퍼 참조를 그대로 넘김 (복사 없음)
+            호출자는 다 쓴 뒤 반드시 release()해야 하고, array는 풀에서 재사용되는 버퍼이므로
+            수정하면 안 된다 (release 이후에도 보관하려면 직접 복사).
         """
+        if not original:
+            self.last_viewer_time = time.time()
+        
         try:
             if original:
                 return self.original_frame_queue.get_nowait()
-            else:
-                return self.frame_queue.get_nowait()
+            return self.frame_queue.get_nowait()
         except queue.Empty:
             return None
     
+    def get_pipeline_stats(self):
+        """
+        파이프라인 성능 통계
+        
+        Returns:
+            dict: {'stages': 단계별 p50/p95/p99 (ms), 'alert_latency': 이벤트 타입.구간별 캡처→알림 지연 (ms),
+                   'fps', 'frames_captured', 'frames_dropped', 'inferences_run',
+                   'frames_rendered', 'frames_render_skipped', 'frame_buffers', 'face_contexts', 'face_workers',
+                   'face_scheduler'}
+        """
+        return {
+            'stages': self.pipeline_stats.get_summary(),
+            'alert_latency': self.alert_latency.get_summary(),
+            'fps': self.fps,
+            'frames_captured': self.grabber.frames_captured if self.grabber else None,
+            'frames_dropped': self.frames_dropped,
+            'inferences_run': self.inferences_run,
+            'frames_rendered': self.frames_rendered,
+            'frames_render_skipped': self.frames_render_skipped,
+            'frame_buffers': self.frame_pool.get_stats(),
+            'face_contexts': self.face_contexts.get_stats() if self.face_contexts is not None else None,
+            'face_workers': self.face_workers.get_stats() if self.face_workers is not None else None,
+            'face_scheduler': self.face_scheduler.get_stats() if self.face_scheduler is not None else None
+        }
+    
     def get_latest_stats(self):
         """최신 통계 가져오기 (논블로킹)"""
         stats = []
@@ -0,0 +1,217 @@
+"""
+ROI 오버레이 렌더러 (정적 레이어 캐시)
+- ROI마다 반투명 채우기 / 테두리 / 라벨을 ROI 사각형 크기의 uint8 레이어로 한 번만 래스터화
+- ROI 상태(색상/상태/카운트)가 바뀐 ROI만 재생성 (재생성 비용은 해당 ROI 크기에 비례)
+- 매 프레임은 ROI 순서대로 사각형 안에서만 합성 (겹친 ROI 영역도 ROI마다 차례로 블렌딩한 것과 동일)
+"""
+
+import cv2
+import numpy as np
+
+from roi_utils import get_roi_geometry_key
+
+
+# ROI 상태별 색상 (BGR)
+ROI_COLOR_PRESENT = (0, 255, 0)
+ROI_COLOR_EMPTY = (0, 0, 255)
+
+
+class ROIOverlayCache:
+    """
+    ROI 오버레이 캐시
+    
+    ROI마다 full-frame overlay 복사 + fillPoly + addWeighted + 테두리/라벨을 그리던 기존 방식은
+    ROI 하나에 대해 픽셀마다 out = A * frame + B 형태의 아핀 변환이다
+    (채우기는 A = 0.8, 테두리/라벨은 A = 0, 라벨 안티에일리어싱 가장자리는 커버리지만큼 A가 줄어듦).
+    재생성 시 ROI 사각형 크기의 검정/흰색 uint8 캔버스에 기존 순서 그대로 그려 A, B를 복원해 두고,
+    프레임마다 ROI 순서대로 A가 같은 픽셀끼리 묶어 scaleAdd + 마스크 복사로 적용한다.
+    """
+    
+    FILL_ALPHA = 0.2
+    
+    # 같은 A 단계 픽셀이 이보다 적으면 좌표 목록으로 블렌딩 (안티에일리어싱 가장자리 등)
+    MIN_LEVEL_PIXELS = 256
+    
+    # ROI 사각형 여백 (테두리 두께 / 라벨 외곽선)
+    RECT_MARGIN = 4
+    
+    def __init__(self):
+        self._geometry_key = None
+        
+        # ROI ID → (스타일, 스프라이트) - 스타일이 바뀐 ROI만 재생성
+        self.sprites = {}
+        
+        self.rebuild_count = 0
+    
+    @staticmethod
+    def _roi_style(roi, state):
+        """ROI 하나의 표시 스타일 (색상, 상태 텍스트, 카운트)"""
+        color = ROI_COLOR_PRESENT if state['person_detected'] else ROI_COLOR_EMPTY
+        return (
+            roi['id'],
+            color,
+            f"{state['last_status_sent'] or 'None'}",
+            f"Count: {state['detection_count']}"
+        )
+    
+    @staticmethod
+    def _labels(points, style):
+        """ROI 라벨 목록 [(텍스트, 위치, 글자 크기, 색상, 두께), ...] (그리는 순서)"""
+        roi_id, color, status_text, count_text = style
+        M = cv2.moments(points)
+        if M["m00"] == 0:
+            return []
+        
+        cx = int(M["m10"] / M["m00"])
+        cy = int(M["m01"] / M["m00"])
+        return [
+            (roi_id, (cx - 30, cy - 20), 0.7, (255, 255, 255), 3),
+            (roi_id, (cx - 30, cy - 20), 0.7, color, 2),
+            (status_text, (cx - 30, cy + 10), 0.5, (255, 255, 255), 2),
+            (count_text, (cx - 30, cy + 30), 0.4, (255, 255, 255), 2)
+        ]
+    
+    def _sprite_rect(self, frame_shape, points, labels):
+        """채우기/테두리/라벨을 모두 포함하는 ROI 사각형 (프레임 안으로 제한)"""
+        x, y, w, h = cv2.boundingRect(points)
+        x1, y1, x2, y2 = x, y, x + w, y + h
+        for text, (tx, ty), font_scale, _, thickness in labels:
+            (text_width, text_height), baseline = cv2.getTextSize(
+                text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness
+            )
+            x1 = min(x1, tx - thickness)
+            y1 = min(y1, ty - text_height - thickness)
+            x2 = max(x2, tx + text_width + thickness)
+            y2 = max(y2, ty + baseline + thickness)
+        
+        frame_height, frame_width = frame_shape[:2]
+        margin = self.RECT_MARGIN
+        return (
+            max(0, x1 - margin), max(0, y1 - margin),
+            min(frame_width, x2 + margin), min(frame_height, y2 + margin)
+        )
+    
+    def _draw_roi(self, canvas, points, color, labels):
+        """기존 방식 그대로 ROI 하나 그리기 (points/labels는 캔버스 좌표)"""
+        # 반투명 채우기
+        overlay = canvas.copy()
+        cv2.fillPoly(overlay, [points], color)
+        cv2.addWeighted(overlay, self.FILL_ALPHA, canvas, 1.0 - self.FILL_ALPHA, 0, canvas)
+        
+        # 테두리
+        cv2.polylines(canvas, [points], True, color, 2)
+        
+        # ROI ID / 상태 / 카운트 라벨
+        for text, position, font_scale, text_color, thickness in labels:
+            cv2.putText(canvas, text, position, cv2.FONT_HERSHEY_SIMPLEX, font_scale, text_color, thickness)
+    
+    def _build_sprite(self, frame_shape, roi, style):
+        """ROI 하나의 아핀 변환 (A, B) 복원 후 A 단계별 레이어 생성 (ROI 사각형 크기)"""
+        if roi.get('type') != 'polygon' or 'points' not in roi:
+            return None
+        
+        points = np.array(roi['points'], dtype=np.int32)
+        labels = self._labels(points, style)
+        x1, y1, x2, y2 = self._sprite_rect(frame_shape, points, labels)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        
+        # 사각형 좌표로 이동해서 그리기
+        local_points = points - np.array([x1, y1], dtype=np.int32)
+        local_labels = [
+            (text, (tx - x1, ty - y1), font_scale, text_color, thickness)
+            for text, (tx, ty), font_scale, text_color, thickness in labels
+        ]
+        black = np.zeros((y2 - y1, x2 - x1, 3), dtype=np.uint8)
+        white = np.full((y2 - y1, x2 - x1, 3), 255, dtype=np.uint8)
+        self._draw_roi(black, local_points, style[1], local_labels)
+        self._draw_roi(white, local_points, style[1], local_labels)
+        
+        # B = 검정 배경 결과, A = (흰 배경 - 검정 배경) / 255 (채널 공통이므로 최댓값 사용)
+        blue, green, red = cv2.split(cv2.subtract(white, black))
+        diff = cv2.max(cv2.max(blue, green), red)
+        
+        # 불투명 픽셀 (A = 0): 마스크 복사
+        opaque_mask = cv2.compare(diff, 0, cv2.CMP_EQ)
+        
+        # A 단계별 그룹 (변경 없는 A = 1 픽셀 제외), 적은 단계는 좌표 목록으로
+        counts = np.bincount(diff.ravel(), minlength=256)
+        levels = []
+        edge_lut = np.zeros(256, dtype=np.uint8)
+        for value in np.flatnonzero(counts[1:255]) + 1:
+            if counts[value] < self.MIN_LEVEL_PIXELS:
+                edge_lut[value] = 1
+                continue
+            levels.append((value / 255.0, cv2.compare(diff, int(value), cv2.CMP_EQ)))
+        edge = cv2.LUT(diff, edge_lut)
+        
+        edge_ys, edge_xs = np.nonzero(edge)
+        return {
+            'rect': (x1, y1, x2, y2),
+            'layer': black,
+            'opaque_mask': opaque_mask,
+            'levels': levels,
+            'buffer': np.empty_like(black),
+            'edge_ys': edge_ys,
+            'edge_xs': edge_xs,
+            'edge_offset': black[edge_ys, edge_xs].astype(np.float32),
+            'edge_scale': diff[edge_ys, edge_xs][:, None].astype(np.float32) / 255.0
+        }
+    
+    @staticmethod
+    def _apply_sprite(frame, sprite):
+        """ROI 하나 합성 (ROI 사각형 안에서만)"""
+        x1, y1, x2, y2 = sprite['rect']
+        region = frame[y1:y2, x1:x2]
+        layer = sprite['layer']
+        
+        # 부분 투명 픽셀은 원본 값이 필요하므로 다른 단계보다 먼저 계산
+        edge_ys, edge_xs = sprite['edge_ys'], sprite['edge_xs']
+        if len(edge_ys):
+            background = region[edge_ys, edge_xs]
+            edge_values = np.clip(
+                sprite['edge_offset'] + sprite['edge_scale'] * background + 0.5, 0, 255
+            ).astype(np.uint8)
+        
+        # A 단계별: A * frame + B
+        buffer = sprite['buffer']
+        for value, mask in sprite['levels']:
+            cv2.scaleAdd(region, value, layer, dst=buffer)
+            cv2.copyTo(buffer, mask, region)
+        
+        if len(edge_ys):
+            region[edge_ys, edge_xs] = edge_values
+        
+        # 테두리/라벨 (불투명)
+        cv2.copyTo(layer, sprite['opaque_mask'], region)
+    
+    def render(self, frame, roi_regions, roi_states):
+        """
+        프레임에 ROI 오버레이 합성 (in-place)
+        
+        Args:
+            frame: 대상 BGR 프레임 (직접 수정됨)
+            roi_regions: ROI 정보 리스트
+            roi_states: ROI ID별 상태 딕셔너리
+        
+        Returns:
+            frame: 오버레이가 합성된 프레임
+        """
+        # ROI 구성/해상도가 바뀌면 전체 재생성
+        geometry_key = (frame.shape, get_roi_geometry_key(roi_regions))
+        if geometry_key != self._geometry_key:
+            self.sprites = {}
+            self._geometry_key = geometry_key
+        
+        for roi in roi_regions:
+            style = self._roi_style(roi, roi_states[roi['id']])
+            cached = self.sprites.get(roi['id'])
+            if cached is None or cached[0] != style:
+                cached = (style, self._build_sprite(frame.shape, roi, style))
+                self.sprites[roi['id']] = cached
+                self.rebuild_count += 1
+            
+            if cached[1] is not None:
+                self._apply_sprite(frame, cached[1])
+        
+        return frame
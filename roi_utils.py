@@ -2,6 +2,7 @@
 ROI 유틸리티 함수
 - 4사분면 ROI 자동 생성
 - ROI 검증
+- ROI 라벨 맵 (박스 → ROI 벡터화 할당)
 """
 
 import numpy as np
@@ -174,6 +175,30 @@ def create_grid_rois(frame_width, frame_height, rows=2, cols=2, margin=20):
     return rois
 
 
+def normalize_roi_format(roi):
+    """
+    ROI 데이터를 polygon 형식으로 정규화
+    - rectangle 형식 (x, y, width, height) → polygon 형식 (points)
+    - 이미 polygon 형식이면 그대로 반환
+    """
+    if 'points' in roi:
+        # 이미 polygon 형식
+        return roi
+    
+    # rectangle 형식 → polygon 변환
+    if 'x' in roi and 'y' in roi and 'width' in roi and 'height' in roi:
+        x, y, w, h = roi['x'], roi['y'], roi['width'], roi['height']
+        roi['points'] = [
+            [x, y],           # 좌상단
+            [x + w, y],       # 우상단
+            [x + w, y + h],   # 우하단
+            [x, y + h]        # 좌하단
+        ]
+        roi['type'] = 'polygon'
+    
+    return roi
+
+
 def validate_roi(roi, frame_width, frame_height):
     """
     ROI 유효성 검증
@@ -259,6 +284,43 @@ def get_roi_bounds(roi):
     return None
 
 
+def get_roi_union_bounds(roi_regions, frame_width=None, frame_height=None, padding=0):
+    """
+    모든 ROI를 포함하는 합집합 경계 박스 계산
+    
+    Args:
+        roi_regions: ROI 정보 리스트
+        frame_width: 프레임 너비 (지정 시 프레임 범위로 클리핑)
+        frame_height: 프레임 높이 (지정 시 프레임 범위로 클리핑)
+        padding: 경계 박스 여백 (픽셀)
+    
+    Returns:
+        tuple: (min_x, min_y, max_x, max_y) 또는 None (polygon ROI 없음)
+    """
+    bounds = [get_roi_bounds(roi) for roi in roi_regions]
+    bounds = [b for b in bounds if b is not None]
+    
+    if not bounds:
+        return None
+    
+    min_x = int(min(b[0] for b in bounds)) - padding
+    min_y = int(min(b[1] for b in bounds)) - padding
+    max_x = int(max(b[2] for b in bounds)) + padding
+    max_y = int(max(b[3] for b in bounds)) + padding
+    
+    min_x = max(0, min_x)
+    min_y = max(0, min_y)
+    if frame_width is not None:
+        max_x = min(frame_width, max_x)
+    if frame_height is not None:
+        max_y = min(frame_height, max_y)
+    
+    if max_x <= min_x or max_y <= min_y:
+        return None
+    
+    return (min_x, min_y, max_x, max_y)
+
+
 def calculate_roi_area(roi):
     """
     ROI 면적 계산
@@ -278,6 +340,141 @@ def calculate_roi_area(roi):
     return 0.0
 
 
+def get_roi_geometry_key(roi_regions):
+    """
+    ROI 형상 식별 키 (ROI 추가/삭제/좌표 변경 감지용)
+    
+    Args:
+        roi_regions: ROI 정보 리스트
+    
+    Returns:
+        tuple: ROI별 (id, type, 좌표) 튜플
+    """
+    return tuple(
+        (roi.get('id'), roi.get('type'), tuple(tuple(p) for p in roi.get('points', [])))
+        for roi in roi_regions
+    )
+
+
+class ROILabelMap:
+    """
+    ROI 집합을 H×W 정수 라벨 래스터로 한 번만 컴파일하여 박스 → ROI 판정을 O(1)로 수행
+    
+    각 픽셀 값은 비트마스크이며 i번째 비트가 1이면 i번째 ROI 내부 (ROI 겹침 허용).
+    ROI가 64개를 넘으면 64개 단위로 래스터를 나누어 저장한다.
+    박스별 pointPolygonTest 대신 모든 앵커 점을 한 번의 NumPy gather로 할당한다.
+    """
+    
+    BITS_PER_PLANE = 64
+    
+    def __init__(self, roi_regions, frame_width, frame_height):
+        """
+        Args:
+            roi_regions: ROI 정보 리스트 (polygon 타입만 래스터화, 그 외는 항상 미포함)
+            frame_width: 프레임 너비
+            frame_height: 프레임 높이
+        """
+        self.roi_ids = [roi['id'] for roi in roi_regions]
+        self.frame_width = int(frame_width)
+        self.frame_height = int(frame_height)
+        self.geometry_key = get_roi_geometry_key(roi_regions)
+        self.planes = self._build(roi_regions)
+    
+    def _build(self, roi_regions):
+        """ROI별 비트를 채운 라벨 래스터 생성"""
+        import cv2
+        
+        num_rois = len(roi_regions)
+        if num_rois <= 8:
+            dtype = np.uint8
+        elif num_rois <= 16:
+            dtype = np.uint16
+        elif num_rois <= 32:
+            dtype = np.uint32
+        else:
+            dtype = np.uint64
+        
+        num_planes = max(1, -(-num_rois // self.BITS_PER_PLANE))
+        planes = [
+            np.zeros((self.frame_height, self.frame_width), dtype=dtype)
+            for _ in range(num_planes)
+        ]
+        
+        roi_mask = np.zeros((self.frame_height, self.frame_width), dtype=np.uint8)
+        for index, roi in enumerate(roi_regions):
+            if roi.get('type') != 'polygon' or 'points' not in roi:
+                continue
+            
+            roi_mask[:] = 0
+            points = np.array(roi['points'], dtype=np.int32)
+            cv2.fillPoly(roi_mask, [points], 1)
+            
+            plane = planes[index // self.BITS_PER_PLANE]
+            bit = dtype(1) << dtype(index % self.BITS_PER_PLANE)
+            plane[roi_mask.astype(bool)] |= bit
+        
+        return planes
+    
+    def matches(self, roi_regions, frame_width, frame_height):
+        """현재 라벨 맵이 주어진 ROI/해상도와 일치하는지 확인 (불일치 시 재생성 필요)"""
+        return (
+            self.frame_width == int(frame_width) and
+            self.frame_height == int(frame_height) and
+            self.geometry_key == get_roi_geometry_key(roi_regions)
+        )
+    
+    def assign_points(self, points):
+        """
+        점들을 ROI에 할당
+        
+        Args:
+            points: (N, 2) 배열 [x, y]
+        
+        Returns:
+            numpy.ndarray: (N, R) bool 행렬 - [i, j]가 True면 i번째 점이 j번째 ROI 내부
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        num_points = len(points)
+        num_rois = len(self.roi_ids)
+        membership = np.zeros((num_points, num_rois), dtype=bool)
+        
+        if num_points == 0 or num_rois == 0:
+            return membership
+        
+        xs = points[:, 0].astype(np.int64)
+        ys = points[:, 1].astype(np.int64)
+        inside = (xs >= 0) & (xs < self.frame_width) & (ys >= 0) & (ys < self.frame_height)
+        xs = np.clip(xs, 0, self.frame_width - 1)
+        ys = np.clip(ys, 0, self.frame_height - 1)
+        
+        for plane_index, plane in enumerate(self.planes):
+            first = plane_index * self.BITS_PER_PLANE
+            last = min(first + self.BITS_PER_PLANE, num_rois)
+            
+            labels = plane[ys, xs].astype(np.uint64)
+            bits = np.arange(last - first, dtype=np.uint64)
+            membership[:, first:last] = ((labels[:, None] >> bits[None, :]) & np.uint64(1)).astype(bool)
+        
+        membership &= inside[:, None]
+        return membership
+    
+    def assign_boxes(self, boxes):
+        """
+        박스 중심점(앵커)을 ROI에 할당
+        
+        Args:
+            boxes: (N, 4) 배열 [x1, y1, x2, y2]
+        
+        Returns:
+            numpy.ndarray: (N, R) bool 행렬
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        centers = np.empty((len(boxes), 2), dtype=np.float32)
+        centers[:, 0] = (boxes[:, 0] + boxes[:, 2]) / 2
+        centers[:, 1] = (boxes[:, 1] + boxes[:, 3]) / 2
+        return self.assign_points(centers)
+
+
 # 테스트 코드
 if __name__ == '__main__':
     print("=" * 60)
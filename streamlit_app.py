@@ -30,7 +30,7 @@ except ImportError:
 
 # 유틸리티 함수 임포트
 from camera_utils import detect_available_cameras, format_camera_list_for_ui, get_camera_frame
-from roi_utils import create_quadrant_rois, create_left_right_rois, validate_roi, get_roi_center
+from roi_utils import create_quadrant_rois, create_left_right_rois, validate_roi, get_roi_center, normalize_roi_format
 from realtime_detector import RealtimeDetector
 
 # 페이지 설정
@@ -143,30 +143,6 @@ def save_config(config):
         json.dump(config, f, indent=2, ensure_ascii=False)
 
 
-def normalize_roi_format(roi):
-    """
-    ROI 데이터를 polygon 형식으로 정규화
-    - rectangle 형식 (x, y, width, height) → polygon 형식 (points)
-    - 이미 polygon 형식이면 그대로 반환
-    """
-    if 'points' in roi:
-        # 이미 polygon 형식
-        return roi
-    
-    # rectangle 형식 → polygon 변환
-    if 'x' in roi and 'y' in roi and 'width' in roi and 'height' in roi:
-        x, y, w, h = roi['x'], roi['y'], roi['width'], roi['height']
-        roi['points'] = [
-            [x, y],           # 좌상단
-            [x + w, y],       # 우상단
-            [x + w, y + h],   # 우하단
-            [x, y + h]        # 좌하단
-        ]
-        roi['type'] = 'polygon'
-    
-    return roi
-
-
 def draw_polygon_on_frame(frame, points, color=(0, 255, 0), thickness=2):
     """프레임에 다각형 그리기"""
     if len(points) < 2:
@@ -779,11 +755,14 @@ with tab2:
                                     roi_id=test_roi_id,
                                     event_type='absent',
                                     reason='Manual test API call',
-                                    frame=current_frame
+                                    frame=current_frame.array if current_frame is not None else None
                                 )
                                 st.success(f"✅ 테스트 API 전송 완료! (ROI: {test_roi_id}, 원본 이미지)")
                             except Exception as e:
                                 st.error(f"❌ API 전송 실패: {e}")
+                            finally:
+                                if current_frame is not None:
+                                    current_frame.release()
                         else:
                             st.warning("⚠️ ROI 영역이 없습니다.")
                     else:
@@ -815,8 +794,9 @@ with tab2:
                 frame = st.session_state.detector.get_latest_frame()
                 
                 if frame is not None:
-                    # BGR -> RGB 변환
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    # BGR -> RGB 변환 (새 배열이므로 풀 버퍼는 바로 반환)
+                    frame_rgb = cv2.cvtColor(frame.array, cv2.COLOR_BGR2RGB)
+                    frame.release()
                     
                     # PIL Image로 변환 (미디어 파일 오류 방지)
                     pil_image = Image.fromarray(frame_rgb)
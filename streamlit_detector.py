@@ -4,15 +4,18 @@ Streamlit 백엔드 검출 엔진
 """
 
 import cv2
-import numpy as np
 import time
 import json
 import uuid
 import requests
 from datetime import datetime
-from ultralytics import YOLO
 import threading
 
+from roi_utils import ROILabelMap
+from roi_renderer import ROIOverlayCache
+from model_registry import model_registry
+from detection_utils import empty_detections, BBOX_COLUMNS, CONF_COLUMN
+
 
 class StreamlitDetector:
     def __init__(self, config, roi_regions, event_callback=None, stats_callback=None):
@@ -30,10 +33,9 @@ class StreamlitDetector:
         self.event_callback = event_callback
         self.stats_callback = stats_callback
         
-        # YOLO 모델 로드
-        model_name = config.get('yolo_model', 'yolov8n.pt')
-        print(f"[Detector] YOLO 모델 로딩: {model_name}")
-        self.model = YOLO(model_name)
+        # 추론 백엔드 (모델 레지스트리 - RealtimeDetector와 같은 인스턴스 공유)
+        print(f"[Detector] YOLO 모델 로딩: {config.get('yolo_model', 'yolov8n.pt')}")
+        self.backend = model_registry.get_backend(config)
         
         # 카메라 초기화
         self.camera_source = config.get('camera_source', 0)
@@ -63,26 +65,18 @@ class StreamlitDetector:
         self.confidence_threshold = config.get('confidence_threshold', 0.5)
         self.person_class_id = 0  # COCO dataset person class
         
+        # ROI 라벨 맵 (첫 프레임에서 생성, ROI/해상도 변경 시 재생성)
+        self.roi_label_map = None
+        
+        # ROI 오버레이 캐시 (ROI 상태가 바뀔 때만 재생성)
+        self.roi_overlay = ROIOverlayCache()
+        
         # 실행 제어
         self.running = False
         self.thread = None
         
         print("[Detector] 초기화 완료")
     
-    def is_person_in_polygon_roi(self, bbox, roi):
-        """사람이 ROI 내에 있는지 확인"""
-        x1, y1, x2, y2 = bbox
-        center_x = (x1 + x2) / 2
-        center_y = (y1 + y2) / 2
-        center_point = (int(center_x), int(center_y))
-        
-        if roi.get('type') == 'polygon' and 'points' in roi:
-            points = np.array(roi['points'], dtype=np.int32)
-            result = cv2.pointPolygonTest(points, center_point, False)
-            return result >= 0
-        
-        return False
-    
     def send_event_to_api(self, roi_id, object_type, status):
         """API 엔드포인트로 이벤트 전송"""
         try:
@@ -223,50 +217,13 @@ class StreamlitDetector:
         """프레임에 ROI와 검출 결과 그리기"""
         frame_copy = frame.copy()
         
-        # ROI 그리기
-        for roi in self.roi_regions:
-            roi_id = roi['id']
-            state = self.roi_states[roi_id]
-            
-            # 상태에 따른 색상
-            color = (0, 255, 0) if state['person_detected'] else (0, 0, 255)
-            
-            if roi.get('type') == 'polygon' and 'points' in roi:
-                points = np.array(roi['points'], dtype=np.int32)
-                
-                # 반투명 채우기
-                overlay = frame_copy.copy()
-                cv2.fillPoly(overlay, [points], color)
-                cv2.addWeighted(overlay, 0.2, frame_copy, 0.8, 0, frame_copy)
-                
-                # 테두리
-                cv2.polylines(frame_copy, [points], True, color, 2)
-                
-                # ROI ID
-                M = cv2.moments(points)
-                if M["m00"] != 0:
-                    cx = int(M["m10"] / M["m00"])
-                    cy = int(M["m01"] / M["m00"])
-                    
-                    cv2.putText(frame_copy, roi_id, (cx - 30, cy - 20),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 3)
-                    cv2.putText(frame_copy, roi_id, (cx - 30, cy - 20),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-                    
-                    # 상태 표시
-                    status_text = f"{state['last_status_sent'] or 'None'}"
-                    cv2.putText(frame_copy, status_text, (cx - 30, cy + 10),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-                    
-                    # 카운트
-                    count_text = f"Count: {state['detection_count']}"
-                    cv2.putText(frame_copy, count_text, (cx - 30, cy + 30),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 2)
+        # ROI 그리기 (캐시된 오버레이 레이어를 1회 블렌딩)
+        self.roi_overlay.render(frame_copy, self.roi_regions, self.roi_states)
         
         # 검출된 사람 바운딩 박스
         for detection in detections:
-            x1, y1, x2, y2 = map(int, detection['bbox'])
-            conf = detection['confidence']
+            x1, y1, x2, y2 = map(int, detection[BBOX_COLUMNS])
+            conf = float(detection[CONF_COLUMN])
             
             cv2.rectangle(frame_copy, (x1, y1), (x2, y2), (255, 0, 0), 2)
             cv2.putText(frame_copy, f'Person {conf:.2f}', (x1, y1 - 10),
@@ -278,35 +235,22 @@ class StreamlitDetector:
         """단일 프레임 처리"""
         ret, frame = self.cap.read()
         if not ret:
-            return None, []
+            return None, empty_detections()
         
-        # YOLO 추론
-        results = self.model(frame, verbose=False)
+        # YOLO 추론 (사람 클래스만, (N, 5) 배열 [x1, y1, x2, y2, conf])
+        detections = self.backend.detect_persons(
+            [frame], self.confidence_threshold, self.person_class_id
+        )[0]
         
-        # 검출된 사람들
-        detections = []
+        # 각 ROI 확인 (라벨 맵에서 모든 박스 중심점을 한 번에 조회)
+        frame_height, frame_width = frame.shape[:2]
+        if (self.roi_label_map is None or
+                not self.roi_label_map.matches(self.roi_regions, frame_width, frame_height)):
+            self.roi_label_map = ROILabelMap(self.roi_regions, frame_width, frame_height)
+        roi_membership = self.roi_label_map.assign_boxes(detections[:, BBOX_COLUMNS])
         
-        # 각 ROI 확인
-        for roi in self.roi_regions:
-            roi_id = roi['id']
-            person_in_roi = False
-            
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    cls = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    
-                    if cls == self.person_class_id and conf >= self.confidence_threshold:
-                        bbox = box.xyxy[0].cpu().numpy()
-                        
-                        detections.append({
-                            'bbox': bbox,
-                            'confidence': conf
-                        })
-                        
-                        if self.is_person_in_polygon_roi(bbox, roi):
-                            person_in_roi = True
+        for roi_index, roi_id in enumerate(self.roi_label_map.roi_ids):
+            person_in_roi = bool(roi_membership[:, roi_index].any())
             
             # ROI 상태 업데이트
             self.update_roi_state(roi_id, person_in_roi)
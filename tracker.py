@@ -0,0 +1,234 @@
+"""
+경량 다중 객체 트래커 (IoU 매칭 + 칼만 필터)
+- YOLO 추론 사이 프레임에서 박스 위치 예측
+- 사람별 고정 트랙 ID 부여
+"""
+
+import threading
+import numpy as np
+
+from detection_utils import box_iou, BBOX_COLUMNS, CONF_COLUMN, TRACK_ID_COLUMN
+
+
+class KalmanBoxTrack:
+    """
+    등속 모델 칼만 필터 기반 단일 트랙
+    
+    상태: [cx, cy, w, h, vx, vy, vw, vh] (속도는 초당 픽셀)
+    """
+    
+    def __init__(self, track_id, detection, current_time):
+        """
+        Args:
+            track_id: 트랙 ID
+            detection: [x1, y1, x2, y2, conf]
+            current_time: 검출 시각
+        """
+        self.track_id = track_id
+        self.confidence = float(detection[CONF_COLUMN])
+        
+        self.x = np.zeros(8, dtype=np.float64)
+        self.x[:4] = self._to_measurement(detection[BBOX_COLUMNS])
+        
+        # 초기 공분산: 위치는 측정값 신뢰, 속도는 불확실
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4, 1e4])
+        
+        self.last_time = current_time
+        self.hits = 1
+        self.missed = 0  # 연속으로 매칭되지 않은 추론 횟수
+    
+    @staticmethod
+    def _to_measurement(bbox):
+        """[x1, y1, x2, y2] → [cx, cy, w, h]"""
+        x1, y1, x2, y2 = bbox
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], dtype=np.float64)
+    
+    @staticmethod
+    def _transition(dt):
+        """dt초 등속 상태 전이 행렬"""
+        F = np.eye(8)
+        F[0, 4] = F[1, 5] = F[2, 6] = F[3, 7] = dt
+        return F
+    
+    @staticmethod
+    def _process_noise(dt, box_size):
+        """프로세스 노이즈 (박스 크기에 비례)"""
+        std_pos = 0.05 * box_size
+        std_vel = 0.1 * box_size
+        q = np.array([std_pos] * 4 + [std_vel] * 4) ** 2
+        return np.diag(q * max(dt, 1e-3))
+    
+    def predict_state(self, current_time):
+        """
+        current_time 시점의 상태 예측 (트랙 상태는 변경하지 않음)
+        
+        Returns:
+            tuple: (x, P)
+        """
+        dt = max(0.0, current_time - self.last_time)
+        F = self._transition(dt)
+        box_size = max(self.x[2], self.x[3], 1.0)
+        x = F @ self.x
+        P = F @ self.P @ F.T + self._process_noise(dt, box_size)
+        
+        # 폭/높이는 양수 유지
+        x[2] = max(x[2], 1.0)
+        x[3] = max(x[3], 1.0)
+        return x, P
+    
+    def predict_bbox(self, current_time):
+        """current_time 시점의 예측 박스 [x1, y1, x2, y2]"""
+        x, _ = self.predict_state(current_time)
+        return self._to_bbox(x)
+    
+    @staticmethod
+    def _to_bbox(x):
+        cx, cy, w, h = x[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dtype=np.float32)
+    
+    def update(self, detection, current_time):
+        """매칭된 검출로 상태 보정"""
+        x, P = self.predict_state(current_time)
+        
+        H = np.zeros((4, 8))
+        H[0, 0] = H[1, 1] = H[2, 2] = H[3, 3] = 1.0
+        box_size = max(x[2], x[3], 1.0)
+        R = np.diag([0.05 * box_size] * 4) ** 2
+        
+        z = self._to_measurement(detection[BBOX_COLUMNS])
+        S = H @ P @ H.T + R
+        K = P @ H.T @ np.linalg.inv(S)
+        
+        self.x = x + K @ (z - H @ x)
+        self.P = (np.eye(8) - K @ H) @ P
+        self.last_time = current_time
+        self.confidence = float(detection[CONF_COLUMN])
+        self.hits += 1
+        self.missed = 0
+    
+    def mark_missed(self, current_time):
+        """이번 추론에서 매칭 실패 (예측 상태로 전진)"""
+        self.x, self.P = self.predict_state(current_time)
+        self.last_time = current_time
+        self.missed += 1
+
+
+class IoUTracker:
+    """
+    IoU 그리디 매칭 + 칼만 예측 기반 다중 사람 트래커
+    
+    update()는 YOLO 추론 결과로 트랙을 갱신하고,
+    predict()는 추론이 없는 프레임에서 트랙 위치를 예측한다.
+    """
+    
+    def __init__(self, iou_threshold=0.3, max_missed=2, max_predict_seconds=2.0):
+        """
+        Args:
+            iou_threshold: 매칭 최소 IoU
+            max_missed: 연속 매칭 실패 허용 횟수 (초과 시 트랙 삭제)
+            max_predict_seconds: 마지막 매칭 후 예측을 계속할 최대 시간
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.max_predict_seconds = max_predict_seconds
+        
+        self.tracks = []
+        self.next_track_id = 1
+        self._lock = threading.Lock()
+    
+    def update(self, detections, current_time):
+        """
+        추론 결과로 트랙 갱신
+        
+        Args:
+            detections: (N, 5) 검출 배열 [x1, y1, x2, y2, conf]
+            current_time: 추론 시각
+        
+        Returns:
+            numpy.ndarray: (N, 6) 배열 [x1, y1, x2, y2, conf, track_id] (입력 검출 순서 유지)
+        """
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 5)
+        
+        with self._lock:
+            track_ids = np.zeros(len(detections), dtype=np.float32)
+            
+            # 기존 트랙 예측 위치와 검출 간 IoU
+            if self.tracks and len(detections):
+                predicted = np.stack([t.predict_bbox(current_time) for t in self.tracks])
+                iou = box_iou(predicted, detections[:, BBOX_COLUMNS])
+            else:
+                iou = np.zeros((len(self.tracks), len(detections)), dtype=np.float32)
+            
+            # IoU 높은 순서로 그리디 매칭
+            matched_tracks = set()
+            matched_detections = set()
+            if iou.size:
+                order = np.argsort(-iou, axis=None)
+                for flat_index in order:
+                    track_index, det_index = np.unravel_index(flat_index, iou.shape)
+                    if iou[track_index, det_index] < self.iou_threshold:
+                        break
+                    if track_index in matched_tracks or det_index in matched_detections:
+                        continue
+                    
+                    track = self.tracks[track_index]
+                    track.update(detections[det_index], current_time)
+                    track_ids[det_index] = track.track_id
+                    matched_tracks.add(track_index)
+                    matched_detections.add(det_index)
+            
+            # 매칭 실패 트랙
+            alive = []
+            for track_index, track in enumerate(self.tracks):
+                if track_index not in matched_tracks:
+                    track.mark_missed(current_time)
+                    if track.missed > self.max_missed:
+                        continue
+                alive.append(track)
+            
+            # 새 트랙 생성
+            for det_index in range(len(detections)):
+                if det_index not in matched_detections:
+                    track = KalmanBoxTrack(self.next_track_id, detections[det_index], current_time)
+                    self.next_track_id += 1
+                    track_ids[det_index] = track.track_id
+                    alive.append(track)
+            
+            self.tracks = alive
+        
+        tracked = np.empty((len(detections), 6), dtype=np.float32)
+        tracked[:, :5] = detections
+        tracked[:, TRACK_ID_COLUMN] = track_ids
+        return tracked
+    
+    def predict(self, current_time):
+        """
+        추론 없는 프레임의 트랙 위치 예측
+        
+        마지막 추론에서 매칭된 트랙만 반환한다 (사라진 사람의 박스를 계속 그리지 않음).
+        
+        Returns:
+            numpy.ndarray: (M, 6) 배열 [x1, y1, x2, y2, conf, track_id]
+        """
+        with self._lock:
+            tracks = [
+                t for t in self.tracks
+                if t.missed == 0 and current_time - t.last_time <= self.max_predict_seconds
+            ]
+            predicted = np.empty((len(tracks), 6), dtype=np.float32)
+            for index, track in enumerate(tracks):
+                predicted[index, BBOX_COLUMNS] = track.predict_bbox(current_time)
+                predicted[index, CONF_COLUMN] = track.confidence
+                predicted[index, TRACK_ID_COLUMN] = track.track_id
+        
+        return predicted
+    
+    def get_track_ids(self):
+        """현재 살아있는 트랙 ID 목록"""
+        with self._lock:
+            return [t.track_id for t in self.tracks]
+    
+    def reset(self):
+        """모든 트랙 삭제"""
+        with self._lock:
+            self.tracks = []